@@ -9,7 +9,7 @@ from pathlib import Path
 PACKAGE_ROOT = Path(__file__).parent
 
 # Ensure required directories exist
-for folder in ['uploads', 'models', 'logs']:
+for folder in ['uploads', 'models', 'logs', 'cache', 'features', 'checkpoints', 'gallery', 'queue']:
     (PACKAGE_ROOT / folder).mkdir(exist_ok=True)
 
 # Version information
@@ -11,16 +11,20 @@ from collections import defaultdict
 import json
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'cheating_detection_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
-        logging.StreamHandler()
-    ]
-)
+from services.logging_service import LoggingService
+
+# Configure logging; per-frame INFO lines go to their own logger, which alone
+# is rate limited per call site, and a background thread writes to disk so
+# I/O stays off the detection loop
+logging_service = LoggingService({
+    'log_dir': '.',
+    'log_file': f'cheating_detection_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log',
+    'async_log': True,
+    'rate_limit_per_second': 2,
+    'rate_limit_loggers': ('frames',)
+})
 logger = logging.getLogger(__name__)
+frame_logger = logging.getLogger("frames")
 
 app = Flask(__name__)
 CORS(app)
@@ -100,7 +104,7 @@ def analyze_single_frame(frame: np.ndarray, frame_number: int) -> Optional[Dict]
         # Dlib face detection
         faces_dlib = detector(frame, 1)
         
-        logger.info(f"Frame {frame_number} - OpenCV faces: {len(faces)}, Dlib faces: {len(faces_dlib)}")
+        frame_logger.info(f"Frame {frame_number} - OpenCV faces: {len(faces)}, Dlib faces: {len(faces_dlib)}")
         
         if len(faces) > 1 or len(faces_dlib) > 1:
             results['multiple_faces'] = True
@@ -121,7 +125,7 @@ def analyze_single_frame(frame: np.ndarray, frame_number: int) -> Optional[Dict]
             
             if eye_distance < 0.6 * nose_distance:
                 results['lookaway_count'] += 1
-                logger.info(f"Frame {frame_number} - Lookaway detected (eye distance: {eye_distance}, nose distance: {nose_distance})")
+                frame_logger.info(f"Frame {frame_number} - Lookaway detected (eye distance: {eye_distance}, nose distance: {nose_distance})")
                 
         logger.debug(f"Frame {frame_number} results: {results}")
         return results
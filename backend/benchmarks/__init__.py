@@ -0,0 +1,5 @@
+"""
+Benchmark scripts for cheating detection system.
+
+Run from the backend directory, e.g. ``python -m benchmarks.bench_gaze video.mp4``.
+"""
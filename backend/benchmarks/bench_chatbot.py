@@ -0,0 +1,78 @@
+"""
+Intent matching throughput: indexed matcher versus the original linear scan.
+
+Usage: python -m benchmarks.bench_chatbot [--queries N]
+"""
+import argparse
+import random
+import time
+
+from chatbot.core.chatbot import Chatbot
+
+
+def linear_scan(intents, query):
+    """Original Chatbot.get_response matching rule."""
+    query = query.lower().strip()
+    for intent in intents:
+        if any(p.lower() in query for p in intent["patterns"]):
+            return intent
+    return None
+
+
+def make_queries(intents, count, seed=0):
+    rng = random.Random(seed)
+    patterns = [p for intent in intents for p in intent["patterns"]]
+    filler = ["please", "tell me", "quick question", "hey", "so", "um"]
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        pattern = rng.choice(patterns)
+        if kind < 0.5:
+            queries.append(f"{rng.choice(filler)} {pattern}")
+        elif kind < 0.8:
+            chars = list(pattern)
+            if len(chars) > 3:
+                del chars[rng.randrange(len(chars))]
+            queries.append("".join(chars))
+        else:
+            queries.append(" ".join(rng.choice(filler) for _ in range(6)))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args()
+
+    chatbot = Chatbot(watch=False)
+    intents = chatbot.intents["intents"]
+    queries = make_queries(intents, args.queries)
+
+    start = time.perf_counter()
+    baseline = [linear_scan(intents, q) for q in queries]
+    scan_time = time.perf_counter() - start
+
+    automaton = chatbot.matcher._automaton
+    start = time.perf_counter()
+    for q in queries:
+        automaton.min_match(q.lower().strip(), stop_at=0)
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [chatbot.matcher.match(q) for q in queries]
+    index_time = time.perf_counter() - start
+
+    exact_agree = sum(1 for b, (i, score) in zip(baseline, indexed) if b is not None and i is b and score == 1.0)
+    exact_total = sum(1 for b in baseline if b is not None)
+    fuzzy_hits = sum(1 for b, (i, _) in zip(baseline, indexed) if b is None and i is not None)
+
+    print(f"Queries:              {len(queries)}")
+    print(f"Linear scan:          {len(queries) / scan_time:,.0f} queries/s")
+    print(f"Automaton only:       {len(queries) / exact_time:,.0f} queries/s")
+    print(f"Matcher with fuzzy:   {len(queries) / index_time:,.0f} queries/s")
+    print(f"Exact-match parity:   {exact_agree}/{exact_total}")
+    print(f"Recovered by fuzzy:   {fuzzy_hits}/{len(queries) - exact_total}")
+
+
+if __name__ == '__main__':
+    main()
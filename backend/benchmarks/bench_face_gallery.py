@@ -0,0 +1,58 @@
+"""
+Enrollment and nearest-neighbour query cost of the face gallery.
+
+Usage: python -m benchmarks.bench_face_gallery [--students N] [--queries N] [--k N]
+
+Random unit-scale descriptors are enrolled one student at a time into a
+temporary gallery, then queried with noisy copies of enrolled faces.
+Recall@1 checks that the exact search returns the enrolled student.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from services.face_gallery import FaceGallery, DESCRIPTOR_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    descriptors = rng.normal(0, 0.1, (args.students, DESCRIPTOR_SIZE)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as root:
+        gallery = FaceGallery(root)
+        start = time.perf_counter()
+        for index, descriptor in enumerate(descriptors):
+            gallery.enroll(f"student{index}", [descriptor])
+        enroll_elapsed = time.perf_counter() - start
+
+        targets = rng.integers(0, args.students, args.queries)
+        queries = descriptors[targets] + rng.normal(0, 0.01, (args.queries, DESCRIPTOR_SIZE))
+        latencies = []
+        hits = 0
+        for target, query in zip(targets, queries):
+            start = time.perf_counter()
+            matches = gallery.search(query, args.k)
+            latencies.append(time.perf_counter() - start)
+            hits += matches[0][0] == f"student{target}"
+
+        reopen_start = time.perf_counter()
+        FaceGallery(root)
+        reopen_elapsed = time.perf_counter() - reopen_start
+
+    latencies = np.asarray(latencies) * 1e3
+    print(f"{args.students} students: enroll {enroll_elapsed / args.students * 1e3:.3f} ms/student, "
+          f"reopen {reopen_elapsed * 1e3:.1f} ms")
+    print(f"query k={args.k}: median {np.median(latencies):.2f} ms, "
+          f"p95 {np.percentile(latencies, 95):.2f} ms, recall@1 {hits / args.queries:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Per-frame allocation of the decode/convert loop with and without reusable buffers.
+
+Usage: python -m benchmarks.bench_frame_buffers <video_path> [--interval N] [--warmup N]
+
+Allocation is measured with tracemalloc as the peak traced memory above
+the level before each keyframe, after a warm-up that fills the buffers.
+NumPy reports its array allocations to tracemalloc, including the
+arrays OpenCV returns.
+"""
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from utils.frame_utils import FrameBuffers, validate_and_convert_frame
+
+
+def allocating_loop(cap, interval):
+    """Original pattern: read every frame, convert into new arrays."""
+    frame_counter = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_counter += 1
+        if frame_counter % interval == 0:
+            rgb = validate_and_convert_frame(frame)
+            gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+            yield gray
+
+
+def buffered_loop(cap, interval):
+    """Grab skipped frames, retrieve keyframes and convert into owned buffers."""
+    buffers = FrameBuffers()
+    frame_counter = 0
+    frame = None
+    while cap.grab():
+        frame_counter += 1
+        if frame_counter % interval == 0:
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                break
+            rgb = validate_and_convert_frame(frame, buffers.get('rgb', frame.shape))
+            gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY, dst=buffers.get('gray', frame.shape[:2]))
+            yield gray
+
+
+def measure(loop, video_path, interval, warmup):
+    cap = cv2.VideoCapture(video_path)
+    per_frame = []
+    frames = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for gray in loop(cap, interval):
+        current, peak = tracemalloc.get_traced_memory()
+        frames += 1
+        if frames > warmup:
+            per_frame.append(peak - baseline)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    cap.release()
+    return frames, elapsed, np.asarray(per_frame, dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('video_path')
+    parser.add_argument('--interval', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=2)
+    args = parser.parse_args()
+
+    for name, loop in (('allocating', allocating_loop), ('buffered', buffered_loop)):
+        frames, elapsed, allocated = measure(loop, args.video_path, args.interval, args.warmup)
+        if frames == 0:
+            print("No keyframes decoded")
+            return
+        steady = allocated.mean() if len(allocated) else 0.0
+        print(f"{name:>10}: {frames} keyframes, {elapsed / frames * 1e3:7.2f} ms/keyframe, "
+              f"steady-state allocation {steady / 1024:9.1f} KiB/keyframe")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Frame throughput between a decoder and a detector process: pickling
+frames through a multiprocessing.Queue versus shared-memory ring slots.
+
+Usage: python -m benchmarks.bench_frame_transport [video_path] [--frames N]
+                                                  [--width W] [--height H] [--slots N]
+
+Without a video, synthetic frames of the given size are written by the
+producer, so the numbers isolate transport cost. With a video, the
+producer decodes it: into a fresh array for the queue, straight into the
+ring slot for shared memory. The consumer touches every frame with a
+light reduction in both cases.
+"""
+import argparse
+import multiprocessing
+import time
+
+import cv2
+import numpy as np
+
+from core.frame_transport import FrameRing, decode_to_ring
+
+
+def consume(frame):
+    return float(frame[::16, ::16].mean())
+
+
+def queue_producer(frames_queue, video_path, count, shape):
+    if video_path:
+        cap = cv2.VideoCapture(video_path)
+        frame_number = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frame_number += 1
+            frames_queue.put((frame_number, frame))
+        cap.release()
+    else:
+        frame = np.empty(shape, dtype=np.uint8)
+        for frame_number in range(count):
+            frame.fill(frame_number % 256)
+            frames_queue.put((frame_number, frame))
+    frames_queue.put(None)
+
+
+def queue_consumer(frames_queue, done):
+    frames = 0
+    while True:
+        item = frames_queue.get()
+        if item is None:
+            break
+        consume(item[1])
+        frames += 1
+    done.put(frames)
+
+
+def ring_producer(ring, video_path, count, shape):
+    if video_path:
+        decode_to_ring(video_path, ring)
+        return
+    for frame_number in range(count):
+        slot, view = ring.acquire(shape)
+        view.fill(frame_number % 256)
+        ring.publish(slot, frame_number, shape)
+    ring.finish()
+
+
+def ring_consumer(ring, done):
+    frames = 0
+    for frame_number, view in ring.frames():
+        consume(view)
+        frames += 1
+        # A view left referenced keeps the shared block mapped at close()
+        del view
+    ring.close()
+    done.put(frames)
+
+
+def run(name, producer, consumer, producer_args, consumer_args, done):
+    start = time.perf_counter()
+    processes = [
+        multiprocessing.Process(target=producer, args=producer_args),
+        multiprocessing.Process(target=consumer, args=consumer_args)
+    ]
+    for process in processes:
+        process.start()
+    frames = done.get()
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+    return frames, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('video_path', nargs='?')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--slots', type=int, default=4)
+    args = parser.parse_args()
+
+    shape = (args.height, args.width, 3)
+    if args.video_path:
+        cap = cv2.VideoCapture(args.video_path)
+        shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        cap.release()
+    frame_mb = np.prod(shape) / 1024 ** 2
+
+    done = multiprocessing.Queue()
+    # Bounded like the ring, so neither side can run ahead unboundedly
+    frames_queue = multiprocessing.Queue(maxsize=args.slots)
+    queue_result = run('queue', queue_producer, queue_consumer,
+                       (frames_queue, args.video_path, args.frames, shape), (frames_queue, done), done)
+
+    ring = FrameRing(args.slots, shape)
+    try:
+        ring_result = run('shared memory', ring_producer, ring_consumer,
+                          (ring, args.video_path, args.frames, shape), (ring, done), done)
+    finally:
+        ring.close()
+
+    print(f"{shape[1]}x{shape[0]} frames ({frame_mb:.1f} MiB), {args.slots} slots")
+    for name, (frames, elapsed) in (('queue', queue_result), ('shared memory', ring_result)):
+        print(f"{name:>14}: {frames} frames in {elapsed:6.2f} s, "
+              f"{frames / elapsed:8.1f} frames/s, {frames * frame_mb / elapsed:8.1f} MiB/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Per-face cost of the gaze estimator versus the 68-point landmark pass.
+
+Usage: python -m benchmarks.bench_gaze <video_path> [--interval N]
+"""
+import argparse
+import time
+
+import cv2
+import dlib
+
+from config import Config
+from core.gaze import GazeEstimator
+from utils.video_utils import extract_keyframes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('video_path')
+    parser.add_argument('--interval', type=int, default=30)
+    args = parser.parse_args()
+
+    config = Config()
+    detector = dlib.get_frontal_face_detector()
+    predictor = dlib.shape_predictor(config.LANDMARK_PREDICTOR_PATH)
+    gaze = GazeEstimator()
+
+    frames, _ = extract_keyframes(args.video_path, args.interval)
+    samples = []
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        for face in detector(frame, 1):
+            samples.append((frame, gray, face))
+    if not samples:
+        print("No faces found")
+        return
+
+    start = time.perf_counter()
+    for frame, _, face in samples:
+        shape = predictor(frame, face)
+        abs(shape.part(36).x - shape.part(45).x) / max(1, abs(shape.part(31).x - shape.part(35).x))
+    landmark_time = (time.perf_counter() - start) / len(samples)
+
+    start = time.perf_counter()
+    for _, gray, face in samples:
+        gaze.estimate(gray, (face.left(), face.top(), face.width(), face.height()))
+    gaze_time = (time.perf_counter() - start) / len(samples)
+
+    print(f"Faces: {len(samples)}")
+    print(f"68-point landmarks: {landmark_time * 1e6:.1f} us/face")
+    print(f"Gaze estimator:     {gaze_time * 1e6:.1f} us/face")
+    print(f"Speedup:            {landmark_time / gaze_time:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-face latency and memory footprint of the 68-point versus 5-point landmark models.
+
+Usage: python -m benchmarks.bench_landmarks <video_path> [--interval N] [--repeat N]
+
+Both model files are expected in models/; a missing one is skipped.
+Config.LANDMARK_MODEL must name a model that is present.
+"""
+import argparse
+import gc
+import os
+import time
+
+import dlib
+
+from config import Config
+from core.landmarks import LANDMARK_SCHEMES
+from utils.video_utils import extract_keyframes
+
+
+def rss_bytes():
+    """Resident set size of this process, or 0 where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('video_path')
+    parser.add_argument('--interval', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    config = Config()
+    detector = dlib.get_frontal_face_detector()
+
+    frames, _ = extract_keyframes(args.video_path, args.interval)
+    samples = [(frame, face) for frame in frames for face in detector(frame, 1)]
+    if not samples:
+        print("No faces found")
+        return
+    print(f"Faces: {len(samples)}")
+
+    timings = {}
+    for name, filename in config.LANDMARK_MODEL_FILES.items():
+        path = str(config.MODEL_FOLDER / filename)
+        if not os.path.exists(path):
+            print(f"{name}-point model not found at {path}, skipping")
+            continue
+
+        gc.collect()
+        before = rss_bytes()
+        predictor = dlib.shape_predictor(path)
+        loaded = rss_bytes() - before
+        scheme = LANDMARK_SCHEMES[name]
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for frame, face in samples:
+                scheme.measure(predictor(frame, face))
+        per_face = (time.perf_counter() - start) / (args.repeat * len(samples))
+        timings[name] = per_face
+
+        print(f"{name:>2}-point: {per_face * 1e6:8.1f} us/face, "
+              f"file {os.path.getsize(path) / 1e6:6.1f} MB, "
+              f"resident +{loaded / 1e6:6.1f} MB")
+        del predictor
+
+    if len(timings) == 2:
+        print(f"Speedup: {timings['68'] / timings['5']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
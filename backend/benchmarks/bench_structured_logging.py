@@ -0,0 +1,73 @@
+"""
+Structured log formatting throughput: original formatter versus the cached one.
+
+Usage: python -m benchmarks.bench_structured_logging [--records N]
+"""
+import argparse
+import json
+import logging
+import time
+
+from services import logging_service
+from services.logging_service import StructuredFormatter
+
+
+class BaselineFormatter(logging.Formatter):
+    """StructuredFormatter as originally written, for comparison."""
+    def format(self, record):
+        log_record = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno
+        }
+        if record.exc_info:
+            log_record['exception'] = self.formatException(record.exc_info)
+        if hasattr(record, 'context'):
+            log_record.update(record.context)
+        return json.dumps(log_record)
+
+
+def make_records(count, with_context):
+    logger = logging.getLogger('bench')
+    records = []
+    for i in range(count):
+        record = logger.makeRecord('bench', logging.INFO, __file__, 40 + i % 4, "Frame %d analyzed", (i,), None,
+                                   func='process_video')
+        if with_context:
+            record.context = {
+                'video_id': 'a3f9c2', 'frame_number': i,
+                'faces': [{'box': [10, 20, 60, 60], 'gaze': 0.12}], 'lookaway': i % 5 == 0
+            }
+        records.append(record)
+    return records
+
+
+def throughput(formatter, records):
+    start = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return len(records) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100000)
+    args = parser.parse_args()
+
+    encoder = 'orjson' if logging_service.orjson is not None else 'json'
+    print(f"Context encoder: {encoder}")
+    for with_context in (False, True):
+        records = make_records(args.records, with_context)
+        baseline = BaselineFormatter()
+        fast = StructuredFormatter()
+        same = all(json.loads(baseline.format(r)) == json.loads(fast.format(r)) for r in records[:100])
+        label = 'with context' if with_context else 'no context'
+        print(f"{label:13s} baseline {throughput(baseline, records):>10,.0f} rec/s   "
+              f"cached {throughput(fast, records):>10,.0f} rec/s   same output: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,27 @@
-import json
 import random
 import logging
 from pathlib import Path
+from .intent_store import IntentStore
 
 class Chatbot:
-    def __init__(self, intents_path="intents/intents.json"):
-        self.intents = self._load_intents(intents_path)
+    def __init__(self, intents_path="intents/intents.json", watch=True,
+                 poll_interval=2.0, cache_size=1024):
         self._setup_logger()
+        self.store = IntentStore(
+            Path(__file__).parent.parent / intents_path,
+            poll_interval=poll_interval,
+            cache_size=cache_size
+        )
+        if watch:
+            self.store.start()
+
+    @property
+    def intents(self):
+        return self.store.intents
+
+    @property
+    def matcher(self):
+        return self.store.matcher
 
     def _setup_logger(self):
         self.logger = logging.getLogger(__name__)
@@ -15,20 +30,18 @@ class Chatbot:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
 
-    def _load_intents(self, path):
-        with open(Path(__file__).parent.parent / path) as f:
-            return json.load(f)
-
     def get_response(self, query):
-        query = query.lower().strip()
-        for intent in self.intents["intents"]:
-            if any(p.lower() in query for p in intent["patterns"]):
-                return {
-                    "response": random.choice(intent["responses"]),
-                    "tag": intent["tag"]
-                }
+        intent = self.store.match(query)
+        if intent is not None:
+            return {
+                "response": random.choice(intent["responses"]),
+                "tag": intent["tag"]
+            }
         return {
             "response": "I can help with app settings and account issues",
             "tag": "unknown"
         }
+
+    def get_stats(self):
+        return self.store.get_stats()
         
\ No newline at end of file
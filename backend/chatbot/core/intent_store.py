@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+import logging
+from collections import OrderedDict
+from .matcher import IntentMatcher
+
+_MISS = object()
+
+
+class _Snapshot:
+    """Immutable view of one loaded version of the intents file."""
+
+    def __init__(self, intents, matcher, signature, version):
+        self.intents = intents
+        self.matcher = matcher
+        self.signature = signature
+        self.version = version
+        self.by_tag = {}
+        for intent in intents["intents"]:
+            self.by_tag.setdefault(intent["tag"], intent)
+
+
+class IntentStore:
+    """
+    Intents file plus match index, reloaded in the background on change.
+
+    A watcher thread polls the file's mtime and size. When they change the
+    file is parsed and a new IntentMatcher is built off the request path,
+    then the current snapshot is replaced with a single reference swap, so
+    readers always see either the old or the new index. Normalized
+    queries are memoized to intent tags in an LRU cache that is cleared on
+    every swap.
+    """
+
+    def __init__(self, path, poll_interval=2.0, cache_size=1024, fuzzy_threshold=0.6):
+        self.path = str(path)
+        self.poll_interval = poll_interval
+        self.cache_size = cache_size
+        self.fuzzy_threshold = fuzzy_threshold
+        self.logger = logging.getLogger(__name__)
+
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._last_reload = None
+        self._failed_signature = None
+        self._stop = threading.Event()
+        self._watcher = None
+
+        self._snapshot = self._load(self._signature(), version=1)
+
+    @property
+    def intents(self):
+        return self._snapshot.intents
+
+    @property
+    def matcher(self):
+        return self._snapshot.matcher
+
+    def start(self):
+        """Start the background file watcher."""
+        if self._watcher is None or not self._watcher.is_alive():
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="intent-store-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        """Stop the background file watcher."""
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def match(self, query):
+        """
+        Find the intent for a query, answering repeated queries from cache.
+
+        Args:
+            query: Raw user message
+
+        Returns:
+            Matching intent dictionary or None
+        """
+        key = query.lower().strip()
+
+        with self._cache_lock:
+            snapshot = self._snapshot
+            tag = self._cache.get(key, _MISS)
+            if tag is not _MISS:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return snapshot.by_tag.get(tag) if tag is not None else None
+            self._misses += 1
+
+        intent, _ = snapshot.matcher.match(query)
+        tag = intent["tag"] if intent is not None else None
+
+        with self._cache_lock:
+            # Do not cache answers computed against a snapshot already replaced
+            if snapshot is self._snapshot:
+                self._cache[key] = tag
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return intent
+
+    def reload(self):
+        """
+        Reload the intents file if it changed.
+
+        Returns:
+            True if a new version was swapped in
+        """
+        signature = self._signature()
+        if signature is None or signature in (self._snapshot.signature, self._failed_signature):
+            return False
+
+        try:
+            snapshot = self._load(signature, self._snapshot.version + 1)
+        except (OSError, ValueError, KeyError) as e:
+            self._failed_signature = signature
+            self.logger.error(f"Intent reload failed, keeping version {self._snapshot.version}: {str(e)}")
+            return False
+
+        with self._cache_lock:
+            self._snapshot = snapshot
+            self._cache.clear()
+            self._reloads += 1
+            self._last_reload = time.time()
+        self.logger.info(f"Loaded intents version {snapshot.version} from {self.path}")
+        return True
+
+    def get_stats(self):
+        """Return cache and reload statistics."""
+        with self._cache_lock:
+            lookups = self._hits + self._misses
+            return {
+                "version": self._snapshot.version,
+                "intents": len(self._snapshot.intents["intents"]),
+                "reloads": self._reloads,
+                "last_reload": self._last_reload,
+                "cache_size": len(self._cache),
+                "cache_capacity": self.cache_size,
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "cache_hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                self.logger.error(f"Intent watcher error: {str(e)}")
+
+    def _load(self, signature, version):
+        with open(self.path) as f:
+            intents = json.load(f)
+        matcher = IntentMatcher(intents["intents"], fuzzy_threshold=self.fuzzy_threshold)
+        return _Snapshot(intents, matcher, signature, version)
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
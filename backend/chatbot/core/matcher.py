@@ -0,0 +1,213 @@
+import math
+import re
+from collections import defaultdict, deque
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring automaton; scanning is linear in the text length.
+
+    Each pattern carries an integer value and a scan reports the smallest
+    value among all patterns found in the text.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._best = [None]
+        self._delta = None
+
+    def add(self, pattern, value):
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._best.append(None)
+            node = nxt
+        if self._best[node] is None or value < self._best[node]:
+            self._best[node] = value
+
+    def build(self):
+        """
+        Resolve failure links into a transition table.
+
+        Must be called after the last add(). Missing transitions lead back
+        to the root, so scanning is one dictionary lookup per character.
+        """
+        fail = [0] * len(self._goto)
+        delta = [None] * len(self._goto)
+        delta[0] = dict(self._goto[0])
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            delta[node] = {**delta[fail[node]], **self._goto[node]}
+            inherited = self._best[fail[node]]
+            if inherited is not None and (self._best[node] is None or inherited < self._best[node]):
+                self._best[node] = inherited
+            for char, nxt in self._goto[node].items():
+                fail[nxt] = delta[fail[node]].get(char, 0)
+                queue.append(nxt)
+        self._delta = delta
+
+    def min_match(self, text, stop_at=None):
+        """
+        Smallest value of any pattern occurring in text.
+
+        Args:
+            text: Text to scan
+            stop_at: Value that cannot be beaten; scanning stops when seen
+
+        Returns:
+            Smallest matched value or None
+        """
+        delta = self._delta
+        best_values = self._best
+        node = 0
+        best = None
+        for char in text:
+            node = delta[node].get(char, 0)
+            value = best_values[node]
+            if value is not None and (best is None or value < best):
+                best = value
+                if best == stop_at:
+                    break
+        return best
+
+
+class TfidfMatcher:
+    """Cosine similarity over character-trigram TF-IDF vectors of patterns."""
+
+    def __init__(self, ngram=3):
+        self.ngram = ngram
+        self._postings = defaultdict(list)
+        self._idf = {}
+        self._values = []
+
+    def fit(self, patterns):
+        """
+        Index (text, value) pairs.
+
+        Args:
+            patterns: Iterable of (normalized pattern text, value) pairs
+        """
+        counts = []
+        doc_freq = defaultdict(int)
+        for text, value in patterns:
+            grams = self._ngrams(text)
+            if not grams:
+                continue
+            counts.append(grams)
+            self._values.append(value)
+            for gram in grams:
+                doc_freq[gram] += 1
+
+        n_docs = len(counts)
+        self._idf = {g: math.log((1 + n_docs) / (1 + df)) + 1 for g, df in doc_freq.items()}
+        for doc_id, grams in enumerate(counts):
+            weights = {g: tf * self._idf[g] for g, tf in grams.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values()))
+            for gram, weight in weights.items():
+                self._postings[gram].append((doc_id, weight / norm))
+
+    def best_match(self, text, min_score=0.0):
+        """
+        Find the indexed value most similar to text.
+
+        Args:
+            text: Normalized query text
+            min_score: Minimum cosine similarity to accept
+
+        Returns:
+            Tuple: (value, score) or (None, 0.0) if nothing scores high enough
+        """
+        grams = self._ngrams(text)
+        weights = {g: tf * self._idf[g] for g, tf in grams.items() if g in self._idf}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        if not norm:
+            return None, 0.0
+
+        scores = defaultdict(float)
+        for gram, weight in weights.items():
+            for doc_id, doc_weight in self._postings[gram]:
+                scores[doc_id] += weight * doc_weight
+        doc_id, score = max(scores.items(), key=lambda item: item[1])
+        score /= norm
+        if score < min_score:
+            return None, score
+        return self._values[doc_id], score
+
+    def _ngrams(self, text):
+        grams = defaultdict(int)
+        for word in text.split():
+            padded = f" {word} "
+            for i in range(max(1, len(padded) - self.ngram + 1)):
+                grams[padded[i:i + self.ngram]] += 1
+        return grams
+
+
+class IntentMatcher:
+    """Precompiled intent index used by Chatbot.get_response."""
+
+    def __init__(self, intents, fuzzy_threshold=0.6):
+        """
+        Build the exact and fuzzy indexes.
+
+        Exact matching keeps the original rule: the first intent, in file
+        order, with a pattern contained in the lowercased query wins.
+
+        Args:
+            intents: List of intent dictionaries from intents.json
+            fuzzy_threshold: Minimum cosine similarity for the fuzzy fallback
+        """
+        self.intents = intents
+        self.fuzzy_threshold = fuzzy_threshold
+        self._automaton = AhoCorasick()
+        self._always_match = None
+        fuzzy_patterns = []
+
+        for index, intent in enumerate(intents):
+            for pattern in intent["patterns"]:
+                lowered = pattern.lower()
+                if not lowered:
+                    if self._always_match is None:
+                        self._always_match = index
+                    continue
+                self._automaton.add(lowered, index)
+                fuzzy_patterns.append((normalize(pattern), index))
+        self._automaton.build()
+
+        self._fuzzy = TfidfMatcher()
+        self._fuzzy.fit(fuzzy_patterns)
+
+    def match(self, query):
+        """
+        Find the intent for a query.
+
+        Args:
+            query: Raw user message
+
+        Returns:
+            Tuple: (intent, score) where score is 1.0 for an exact match and
+            the cosine similarity for a fuzzy one; (None, 0.0) if unmatched
+        """
+        lowered = query.lower().strip()
+        best = self._automaton.min_match(lowered, stop_at=0)
+        if self._always_match is not None and (best is None or self._always_match < best):
+            best = self._always_match
+        if best is not None:
+            return self.intents[best], 1.0
+
+        index, score = self._fuzzy.best_match(normalize(query), self.fuzzy_threshold)
+        if index is None:
+            return None, 0.0
+        return self.intents[index], score
+
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize(text):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
@@ -7,6 +7,11 @@ class Config:
     UPLOAD_FOLDER = "uploads"
     MODEL_FOLDER = "models"
     LOG_FOLDER = "logs"
+    CACHE_FOLDER = "cache"
+    FEATURE_FOLDER = "features"
+    CHECKPOINT_FOLDER = "checkpoints"
+    GALLERY_FOLDER = "gallery"
+    JOB_QUEUE_FOLDER = "queue"
     
     # Initialize paths (will be set in __init__)
     FACE_CASCADE_PATH = ""
@@ -16,6 +21,146 @@ class Config:
     KEYFRAME_INTERVAL = 60
     LOOKAWAY_THRESHOLD = 0.6
     FACE_DETECTION_THRESHOLD = 0.3
+    
+    # Lookaway detection: "landmarks" (shape predictor) or "gaze" (eye crops)
+    LOOKAWAY_METHOD = "landmarks"
+    GAZE_OFFSET_THRESHOLD = 0.35
+    
+    # Landmark model: "68" (full iBUG model) or "5" (eye corners and nose, ~10x smaller)
+    LANDMARK_MODEL = "68"
+    LANDMARK_MODEL_FILES = {
+        "68": "shape_predictor_68_face_landmarks.dat",
+        "5": "shape_predictor_5_face_landmarks.dat"
+    }
+    NOSE_SYMMETRY_THRESHOLD = 0.5
+    
+    # Identity continuity from dlib's ResNet face descriptors; skipped with a
+    # warning when the model file is not in models/
+    IDENTITY_CHECK_ENABLED = True
+    FACE_RECOGNITION_MODEL_FILE = "dlib_face_recognition_resnet_model_v1.dat"
+    IDENTITY_DISTANCE_THRESHOLD = 0.6
+    IDENTITY_REFERENCE_FRAMES = 5
+    IDENTITY_MIN_CHANGE_FRAMES = 3
+    
+    # Phone and second-screen detection with an OpenCV DNN model in models/
+    # (e.g. SSD MobileNet v3 on COCO), run only on keyframes where one of
+    # OBJECT_TRIGGERS fires: "lookaway", "hands", "motion", "no_face", "periodic".
+    # Skipped with a warning when the model files are missing
+    OBJECT_DETECTION_ENABLED = True
+    OBJECT_MODEL_FILE = "ssd_mobilenet_v3_large_coco.pb"
+    OBJECT_MODEL_CONFIG_FILE = "ssd_mobilenet_v3_large_coco.pbtxt"
+    OBJECT_LABELS_FILE = "coco_labels.txt"
+    OBJECT_CLASSES = ("cell phone", "laptop", "tv")
+    OBJECT_CONFIDENCE = 0.5
+    OBJECT_INPUT_SIZE = 320
+    OBJECT_TRIGGERS = ("lookaway", "hands", "motion")
+    OBJECT_MOTION_FACTOR = 3.0
+    OBJECT_HAND_SKIN_FRACTION = 0.15
+    OBJECT_PERIODIC_INTERVAL = 0
+    MIN_OBJECT_FRAMES = 2
+    
+    # Frame sampling by presentation time for VFR or miscounted files: "auto", "always" or "never"
+    TIMED_SAMPLING = "auto"
+    
+    # Near-duplicate keyframe skipping, off by default: a reused result can
+    # hide a change between keyframes. Set a block similarity (e.g. 0.98,
+    # at most 5 grey levels of change in any 1/16 x 1/16 block) to enable
+    DEDUP_SIMILARITY_THRESHOLD = None
+    
+    # Pre-detection quality gate: keyframes that are too dark, bright,
+    # clipped or blurred skip the detectors and the face detection rate
+    QUALITY_GATE_ENABLED = True
+    QUALITY_MIN_SHARPNESS = 15.0
+    QUALITY_MIN_BRIGHTNESS = 35.0
+    QUALITY_MAX_BRIGHTNESS = 225.0
+    QUALITY_MAX_CLIPPED_FRACTION = 0.6
+    MAX_UNUSABLE_FRAME_RATIO = 0.5
+    
+    # Candidate region cropping: learn from the first face detections,
+    # rescan the full frame every ROI_REVALIDATE_INTERVAL analyzed keyframes
+    ROI_CROPPING_ENABLED = True
+    ROI_WARMUP_FRAMES = 5
+    ROI_MARGIN = 0.5
+    ROI_REVALIDATE_INTERVAL = 10
+    
+    # Save analysis progress every N processed keyframes for crash recovery
+    CHECKPOINT_INTERVAL = 100
+    
+    # Audio analysis (requires ffmpeg on PATH); results are only reported in
+    # the details unless AUDIO_AFFECTS_VERDICT is set, as the talking and
+    # speaker thresholds are not validated on exam recordings yet
+    AUDIO_ANALYSIS_ENABLED = False
+    AUDIO_AFFECTS_VERDICT = False
+    FFMPEG_PATH = "ffmpeg"
+    FFPROBE_PATH = "ffprobe"
+    AUDIO_SPEECH_RATIO_THRESHOLD = 0.2
+    
+    # Logging: background writer, and an optional per-call-site rate limit
+    # for INFO and below (0 disables; it would also drop operational lines)
+    LOG_ASYNC = True
+    LOG_RATE_LIMIT_PER_SECOND = 0
+    
+    # Content-addressed upload storage; least recently uploaded files are evicted beyond this
+    UPLOAD_QUOTA_BYTES = 20 * 1024 ** 3
+    
+    # Background transcode of each upload into a small short-GOP proxy used
+    # for later analyses and thumbnails (requires ffmpeg on PATH); keyframes
+    # are forced on the frames the KEYFRAME_INTERVAL sampler takes, so every
+    # sampled frame is an I-frame. Transcodes running longer are abandoned.
+    PROXY_TRANSCODE_ENABLED = True
+    PROXY_MAX_DIMENSION = 640
+    PROXY_CRF = 28
+    PROXY_WORKERS = 1
+    PROXY_TIMEOUT_SECONDS = 3600
+    
+    # Resumable chunked uploads; up to UPLOAD_TAIL_WORKERS of them are
+    # analyzed while they arrive, outside SCHEDULER_CPU_BUDGET, the others
+    # are scheduled like any upload once complete
+    UPLOAD_TAIL_WORKERS = 2
+    UPLOAD_SESSION_MAX_IDLE_SECONDS = 24 * 3600
+    UPLOAD_SESSION_EXPIRY_INTERVAL = 300
+    # Analysis of an arriving upload is stopped after this long without a
+    # chunk and restarted when the client resumes
+    UPLOAD_STALL_SECONDS = 60
+    # Longest wait of /complete for the analysis before answering 202
+    UPLOAD_COMPLETE_TIMEOUT_SECONDS = 600
+    
+    # Analysis jobs run on SCHEDULER_CPU_BUDGET workers, shortest estimated
+    # job first (cost = keyframes x pixels / 640x480); each second waited and
+    # each priority level (0..SCHEDULER_MAX_PRIORITY) shortens the estimate,
+    # so no job starves; uploads are deferred with 429 and Retry-After once
+    # queued work exceeds SCHEDULER_MAX_BACKLOG_COST
+    SCHEDULER_CPU_BUDGET = 2
+    SCHEDULER_MAX_BACKLOG_COST = 20000
+    SCHEDULER_AGING_RATE = 1.0
+    SCHEDULER_MAX_PRIORITY = 3
+    SCHEDULER_PRIORITY_SECONDS = 300
+    
+    # Live proctoring: frames of all live sessions share LIVE_WORKERS detector
+    # threads; under overload sessions are cut back towards LIVE_MIN_FPS, and
+    # new sessions are refused once every session's minimum no longer fits
+    LIVE_WORKERS = 2
+    LIVE_TARGET_FPS = 2.0
+    LIVE_MIN_FPS = 0.5
+    LIVE_SESSION_MAX_IDLE_SECONDS = 300
+    
+    # Standalone workers (python worker.py) analyze uploads pulled from a job
+    # queue instead of the API process; the queue, uploads, features and
+    # checkpoints must then be on storage shared by all machines
+    JOB_QUEUE_ENABLED = False
+    JOB_BROKER = "sqlite"
+    JOB_LEASE_SECONDS = 60
+    JOB_MAX_ATTEMPTS = 3
+    JOB_RETRY_DELAY_SECONDS = 10
+    WORKER_POLL_SECONDS = 2
+    
+    # Keyframe cache, off by default: the first analysis of a video decodes
+    # and stores all its keyframes before analyzing any (no early exit), and
+    # analyses then run on keyframes downscaled to KEYFRAME_CACHE_MAX_DIMENSION,
+    # which the detector thresholds are not tuned for
+    KEYFRAME_CACHE_ENABLED = False
+    KEYFRAME_CACHE_MAX_BYTES = 2 * 1024 ** 3
+    KEYFRAME_CACHE_MAX_DIMENSION = 640
 
     def __init__(self):
         """Initialize configuration with proper absolute paths"""
@@ -26,10 +171,22 @@ class Config:
         self.UPLOAD_FOLDER = self._ensure_dir(self.UPLOAD_FOLDER)
         self.MODEL_FOLDER = self._ensure_dir(self.MODEL_FOLDER)
         self.LOG_FOLDER = self._ensure_dir(self.LOG_FOLDER)
+        self.CACHE_FOLDER = self._ensure_dir(self.CACHE_FOLDER)
+        self.FEATURE_FOLDER = self._ensure_dir(self.FEATURE_FOLDER)
+        self.CHECKPOINT_FOLDER = self._ensure_dir(self.CHECKPOINT_FOLDER)
+        self.GALLERY_FOLDER = self._ensure_dir(self.GALLERY_FOLDER)
+        self.JOB_QUEUE_FOLDER = self._ensure_dir(self.JOB_QUEUE_FOLDER)
+        self.JOB_QUEUE_PATH = str(self.JOB_QUEUE_FOLDER / "jobs.db")
         
         # Set model paths
         self.FACE_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        self.LANDMARK_PREDICTOR_PATH = str(self.MODEL_FOLDER / "shape_predictor_68_face_landmarks.dat")
+        if self.LANDMARK_MODEL not in self.LANDMARK_MODEL_FILES:
+            raise ValueError(f"Unknown landmark model: {self.LANDMARK_MODEL}")
+        self.LANDMARK_PREDICTOR_PATH = str(self.MODEL_FOLDER / self.LANDMARK_MODEL_FILES[self.LANDMARK_MODEL])
+        self.FACE_RECOGNITION_MODEL_PATH = str(self.MODEL_FOLDER / self.FACE_RECOGNITION_MODEL_FILE)
+        self.OBJECT_MODEL_PATH = str(self.MODEL_FOLDER / self.OBJECT_MODEL_FILE)
+        self.OBJECT_MODEL_CONFIG_PATH = str(self.MODEL_FOLDER / self.OBJECT_MODEL_CONFIG_FILE)
+        self.OBJECT_LABELS_PATH = str(self.MODEL_FOLDER / self.OBJECT_LABELS_FILE)
         
         # Validate paths
         self.validate_paths()
@@ -48,7 +205,7 @@ class Config:
         if not Path(self.LANDMARK_PREDICTOR_PATH).exists():
             raise FileNotFoundError(
                 f"Dlib shape predictor not found at {self.LANDMARK_PREDICTOR_PATH}\n"
-                "Please download from: http://dlib.net/files/shape_predictor_68_face_landmarks.dat.bz2\n"
+                f"Please download from: http://dlib.net/files/{Path(self.LANDMARK_PREDICTOR_PATH).name}.bz2\n"
                 "Extract and place in models/ directory"
             )
         return True
\ No newline at end of file
@@ -4,6 +4,15 @@ Core business logic components for cheating detection system.
 
 from .detection import CheatingDetector
 from .video_processor import VideoProcessor
+from .deduplication import FrameDeduplicator
+from .roi import ROITracker
+from .identity import IdentityTracker
+from .quality import FrameQualityGate
+from .objects import ObjectDetector, EscalationPolicy
+from .frame_transport import FrameRing, decode_to_ring
+from .gaze import GazeEstimator
+from .landmarks import LandmarkScheme, get_landmark_scheme
+from .audio_analyzer import AudioAnalyzer, collect_audio_results, merge_audio_results
 from .exceptions import (
     CheatingDetectionError,
     ModelLoadingError,
@@ -15,6 +24,20 @@ from .exceptions import (
 __all__ = [
     'CheatingDetector',
     'VideoProcessor',
+    'FrameDeduplicator',
+    'ROITracker',
+    'IdentityTracker',
+    'FrameQualityGate',
+    'ObjectDetector',
+    'EscalationPolicy',
+    'FrameRing',
+    'decode_to_ring',
+    'GazeEstimator',
+    'LandmarkScheme',
+    'get_landmark_scheme',
+    'AudioAnalyzer',
+    'collect_audio_results',
+    'merge_audio_results',
     'CheatingDetectionError',
     'ModelLoadingError',
     'VideoValidationError',
@@ -0,0 +1,228 @@
+import shutil
+import subprocess
+import threading
+import numpy as np
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AudioAnalyzer:
+    def __init__(self, ffmpeg_path: str = "ffmpeg", sample_rate: int = 16000,
+                 chunk_seconds: float = 2.0, frame_ms: int = 30,
+                 vad_margin_db: float = 10.0, min_speech_seconds: float = 0.2,
+                 max_gap_seconds: float = 0.3, speech_ratio_threshold: float = 0.2,
+                 speaker_spread_hz: float = 600.0):
+        """
+        Initialize streaming audio analyzer.
+
+        Audio is demuxed by an ffmpeg subprocess as mono 16-bit PCM and
+        consumed in fixed-size chunks, so memory use does not grow with the
+        recording length.
+
+        Args:
+            ffmpeg_path: ffmpeg executable
+            sample_rate: Resampling rate in Hz
+            chunk_seconds: Size of each chunk read from ffmpeg
+            frame_ms: Analysis frame length in milliseconds
+            vad_margin_db: Energy above the noise floor counted as voice
+            min_speech_seconds: Shortest voiced segment kept as an event
+            max_gap_seconds: Silence shorter than this joins two segments
+            speech_ratio_threshold: Voiced fraction flagged as talking
+            speaker_spread_hz: Spread of per-segment spectral centroids
+                above which multiple speakers are suspected
+        """
+        self.ffmpeg_path = ffmpeg_path
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.chunk_frames = max(1, int(chunk_seconds * 1000 / frame_ms))
+        self.frame_seconds = self.frame_size / sample_rate
+        self.vad_margin_db = vad_margin_db
+        self.min_speech_seconds = min_speech_seconds
+        self.max_gap_seconds = max_gap_seconds
+        self.speech_ratio_threshold = speech_ratio_threshold
+        self.speaker_spread_hz = speaker_spread_hz
+        self._freqs = np.fft.rfftfreq(self.frame_size, 1.0 / sample_rate).astype(np.float32)
+        self._window = np.hanning(self.frame_size).astype(np.float32)
+
+    def analyze(self, video_path: str) -> Dict:
+        """
+        Analyze the audio track of a video file.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            Dictionary with voice-activity statistics and speech events;
+            'available' is False when the file has no decodable audio
+        """
+        if shutil.which(self.ffmpeg_path) is None:
+            logger.warning("ffmpeg not found, skipping audio analysis")
+            return {'available': False, 'reason': 'ffmpeg not installed'}
+
+        command = [
+            self.ffmpeg_path, '-nostdin', '-v', 'error', '-i', video_path,
+            '-vn', '-ac', '1', '-ar', str(self.sample_rate), '-f', 's16le', '-'
+        ]
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            logger.error(f"Could not start ffmpeg: {str(e)}")
+            return {'available': False, 'reason': str(e)}
+
+        # Drained alongside stdout: a full stderr pipe would stall ffmpeg
+        stderr_chunks: List[bytes] = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.extend(iter(lambda: process.stderr.read(4096), b'')),
+            daemon=True)
+        stderr_reader.start()
+
+        energies = []
+        centroids = []
+        chunk_bytes = self.chunk_frames * self.frame_size * 2
+        remainder = np.empty(0, dtype=np.float32)
+        try:
+            while True:
+                data = process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                samples = np.frombuffer(data[:len(data) - len(data) % 2], dtype=np.int16)
+                samples = np.concatenate([remainder, samples.astype(np.float32) / 32768.0])
+                usable = len(samples) - len(samples) % self.frame_size
+                remainder = samples[usable:]
+                if usable:
+                    energy, centroid = self._frame_features(samples[:usable])
+                    energies.append(energy)
+                    centroids.append(centroid)
+        finally:
+            process.stdout.close()
+            process.wait()
+            stderr_reader.join()
+            process.stderr.close()
+        stderr = b''.join(stderr_chunks).decode(errors='replace')
+
+        if not energies:
+            logger.info(f"No audio track decoded from {video_path}")
+            return {'available': False, 'reason': stderr.strip() or 'No audio stream'}
+
+        return self._summarize(np.concatenate(energies), np.concatenate(centroids))
+
+    def _frame_features(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute per-frame energy and spectral centroid for a chunk.
+
+        Args:
+            samples: Float samples, length a multiple of frame_size
+
+        Returns:
+            Tuple: (energy_db, spectral_centroid_hz) arrays, one value per frame
+        """
+        frames = samples.reshape(-1, self.frame_size)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20.0 * np.log10(rms + 1e-10)
+
+        spectrum = np.abs(np.fft.rfft(frames * self._window, axis=1))
+        total = spectrum.sum(axis=1)
+        centroid = (spectrum @ self._freqs) / np.maximum(total, 1e-10)
+        return energy_db.astype(np.float32), centroid.astype(np.float32)
+
+    def _summarize(self, energy_db: np.ndarray, centroid: np.ndarray) -> Dict:
+        """Turn frame features into voice-activity events and statistics."""
+        # Noise floor estimated from the quietest tenth of the recording
+        noise_floor = float(np.percentile(energy_db, 10))
+        voiced = energy_db > noise_floor + self.vad_margin_db
+        segments = self._find_segments(voiced)
+
+        segment_centroids = [float(np.median(centroid[start:end][voiced[start:end]]))
+                             for start, end in segments]
+        spread = 0.0
+        if len(segment_centroids) >= 3:
+            spread = float(np.percentile(segment_centroids, 90) - np.percentile(segment_centroids, 10))
+
+        duration = len(energy_db) * self.frame_seconds
+        speech_seconds = sum(end - start for start, end in segments) * self.frame_seconds
+        speech_ratio = speech_seconds / duration if duration > 0 else 0.0
+
+        return {
+            'available': True,
+            'duration': duration,
+            'noise_floor_db': noise_floor,
+            'speech_seconds': speech_seconds,
+            'speech_ratio': speech_ratio,
+            'speech_segments': len(segments),
+            'centroid_spread_hz': spread,
+            'talking_detected': speech_ratio > self.speech_ratio_threshold,
+            'multiple_speakers_suspected': spread > self.speaker_spread_hz,
+            'events': [
+                {
+                    'type': 'speech',
+                    'start': start * self.frame_seconds,
+                    'end': end * self.frame_seconds,
+                    'spectral_centroid_hz': c
+                }
+                for (start, end), c in zip(segments, segment_centroids)
+            ]
+        }
+
+    def _find_segments(self, voiced: np.ndarray) -> List[Tuple[int, int]]:
+        """Group voiced frames into (start, end) frame ranges."""
+        padded = np.concatenate([[False], voiced, [False]]).astype(np.int8)
+        edges = np.diff(padded)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        max_gap = int(self.max_gap_seconds / self.frame_seconds)
+        min_length = int(self.min_speech_seconds / self.frame_seconds)
+        segments: List[Tuple[int, int]] = []
+        for start, end in zip(starts, ends):
+            if segments and start - segments[-1][1] <= max_gap:
+                segments[-1] = (segments[-1][0], int(end))
+            else:
+                segments.append((int(start), int(end)))
+        return [(s, e) for s, e in segments if e - s >= min_length]
+
+
+def collect_audio_results(audio_future: Optional[Future]) -> Optional[Dict]:
+    """Wait for a background AudioAnalyzer.analyze; None if it failed."""
+    if audio_future is None:
+        return None
+    try:
+        return audio_future.result()
+    except Exception as e:
+        # Audio only adds to the video analysis and must not fail it
+        logger.error(f"Audio analysis failed: {str(e)}")
+        return None
+
+
+def merge_audio_results(cheating_detected: bool, details: Dict,
+                        audio_results: Optional[Dict],
+                        affects_verdict: bool = False) -> Tuple[bool, Dict]:
+    """
+    Merge audio analysis into the video analysis result.
+
+    Args:
+        cheating_detected: Verdict from video analysis
+        details: Analysis details from compile_results
+        audio_results: Output of AudioAnalyzer.analyze, or None
+        affects_verdict: Let talking and multiple speakers flag the video;
+            otherwise the audio analysis is only reported in the details
+
+    Returns:
+        Tuple: (cheating_detected, analysis_details) including audio
+    """
+    if not audio_results:
+        return cheating_detected, details
+
+    details = {**details, 'audio': audio_results}
+    if not affects_verdict:
+        return cheating_detected, details
+    reasons = [r for r in details['reasons'] if r != "No cheating detected"]
+    if audio_results.get('talking_detected'):
+        cheating_detected = True
+        reasons.append(f"Talking detected ({audio_results['speech_ratio'] * 100:.1f}% of audio)")
+    if audio_results.get('multiple_speakers_suspected'):
+        cheating_detected = True
+        reasons.append("Multiple speakers suspected")
+    details['reasons'] = reasons if reasons else ["No cheating detected"]
+    return cheating_detected, details
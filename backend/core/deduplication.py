@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FrameDeduplicator:
+    def __init__(self, similarity_threshold: float = 0.98, signature_size: int = 16):
+        """
+        Initialize near-duplicate keyframe detector.
+
+        Frames are compared through a tiny grayscale thumbnail, block by
+        block: the most changed block decides, so a small change such as a
+        second face entering a corner is not averaged away by the rest of
+        the frame. Each frame is compared against the last frame that was
+        actually analyzed, so slow drift over many frames still triggers a
+        fresh analysis.
+
+        Args:
+            similarity_threshold: Minimum similarity (0-1) of every block to
+                treat as duplicate
+            signature_size: Side length of the comparison thumbnail
+        """
+        self.similarity_threshold = similarity_threshold
+        self.signature_size = signature_size
+        self._anchor_signature: Optional[np.ndarray] = None
+        self._anchor_result: Optional[Dict] = None
+        self.checked_frames = 0
+        self.duplicate_frames = 0
+
+    def compute_signature(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Compute low-resolution grayscale signature of a frame.
+
+        Args:
+            frame: Input frame (color or grayscale)
+
+        Returns:
+            float32 array of shape (signature_size, signature_size)
+        """
+        small = cv2.resize(frame, (self.signature_size, self.signature_size),
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = small.mean(axis=2)
+        return small.astype(np.float32)
+
+    def similarity(self, a: np.ndarray, b: np.ndarray) -> float:
+        """Similarity in [0, 1] from the largest absolute block difference of signatures."""
+        return 1.0 - float(np.max(np.abs(a - b))) / 255.0
+
+    def lookup(self, frame: np.ndarray, frame_number: int) -> Optional[Dict]:
+        """
+        Return a reusable analysis result if frame duplicates the anchor.
+
+        Args:
+            frame: Keyframe to check
+            frame_number: Frame number for the reused result
+
+        Returns:
+            Copy of the anchor result for this frame, or None if the frame
+            needs a full analysis
+        """
+        self.checked_frames += 1
+        signature = self.compute_signature(frame)
+        if (self._anchor_result is not None
+                and self.similarity(signature, self._anchor_signature) >= self.similarity_threshold):
+            self.duplicate_frames += 1
+            logger.debug(f"Frame {frame_number} duplicates frame {self._anchor_result['frame_number']}")
+            return {**self._anchor_result, 'frame_number': frame_number}
+
+        self._anchor_signature = signature
+        self._anchor_result = None
+        return None
+
+    def update(self, frame_result: Dict) -> None:
+        """Store the result of the frame last passed to lookup as the new anchor."""
+        self._anchor_result = frame_result
+
+    def get_state(self) -> Dict:
+        """Return counters for checkpointing; the anchor is not kept."""
+        return {'checked_frames': self.checked_frames, 'duplicate_frames': self.duplicate_frames}
+
+    def restore_state(self, state: Dict) -> None:
+        """Continue counting from a state returned by get_state."""
+        self.checked_frames = state['checked_frames']
+        self.duplicate_frames = state['duplicate_frames']
+
+    def get_stats(self) -> Dict:
+        """Return deduplication statistics."""
+        return {
+            'deduplicated_frames': self.duplicate_frames,
+            'dedup_ratio': self.duplicate_frames / self.checked_frames if self.checked_frames else 0.0,
+            'dedup_similarity_threshold': self.similarity_threshold
+        }
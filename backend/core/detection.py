@@ -1,33 +1,78 @@
 import cv2
 import dlib
 import numpy as np
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import logging
 from core.exceptions import FrameAnalysisError
+from core.landmarks import LandmarkScheme, LANDMARK_SCHEMES
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_THRESHOLDS = {
+    'lookaway_eye_nose_ratio': 0.6,
+    'min_face_detection_rate': 50,
+    'lookaway_ratio_threshold': 0.4,
+    'gaze_offset_threshold': 0.35,
+    'lookaway_nose_symmetry': 0.5,
+    'identity_distance_threshold': 0.6,
+    'max_unusable_frame_ratio': 0.5,
+    'min_object_frames': 2
+}
+
+LOOKAWAY_METHODS = ('landmarks', 'gaze')
+
 class CheatingDetector:
-    def __init__(self, face_cascade, detector, predictor):
+    def __init__(self, face_cascade, detector, predictor, thresholds: Optional[Dict] = None,
+                 gaze_estimator=None, lookaway_method: str = 'landmarks',
+                 landmark_scheme: Optional[LandmarkScheme] = None, face_encoder=None,
+                 object_detector=None):
         """
         Initialize cheating detector with required models.
         
         Args:
             face_cascade: OpenCV face cascade classifier
             detector: dlib face detector
-            predictor: dlib facial landmark predictor
+            predictor: dlib facial landmark predictor matching landmark_scheme
+            thresholds: Optional overrides for DEFAULT_THRESHOLDS
+            gaze_estimator: GazeEstimator, required for the 'gaze' method
+            lookaway_method: 'landmarks' (shape predictor) or 'gaze' (eye crops)
+            landmark_scheme: Lookaway rule for the predictor's point layout,
+                defaults to the 68-point scheme
+            face_encoder: Optional dlib face recognition model; a 128-d
+                descriptor is computed for every detected face
+            object_detector: Optional ObjectDetector for phones and screens,
+                run by the video processor on escalated keyframes only
         """
+        if lookaway_method not in LOOKAWAY_METHODS:
+            raise ValueError(f"Unknown lookaway method: {lookaway_method}")
+        if lookaway_method == 'gaze' and gaze_estimator is None:
+            raise ValueError("Gaze lookaway method requires a gaze estimator")
+        landmark_scheme = landmark_scheme or LANDMARK_SCHEMES['68']
+        num_parts = getattr(predictor, 'num_parts', landmark_scheme.num_points)
+        if lookaway_method == 'landmarks' and num_parts != landmark_scheme.num_points:
+            raise ValueError(
+                f"Predictor has {num_parts} points, landmark scheme '{landmark_scheme.name}' "
+                f"expects {landmark_scheme.num_points}")
+            
         self.face_cascade = face_cascade
         self.detector = detector
         self.predictor = predictor
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.gaze_estimator = gaze_estimator
+        self.lookaway_method = lookaway_method
+        self.landmark_scheme = landmark_scheme
+        self.face_encoder = face_encoder
+        self.object_detector = object_detector
 
-    def analyze_frame(self, frame: np.ndarray, frame_number: int) -> Dict:
+    def analyze_frame(self, frame: np.ndarray, frame_number: int, buffers=None) -> Dict:
         """
         Analyze a single frame for cheating indicators.
         
         Args:
-            frame: Video frame to analyze
+            frame: BGR video frame to analyze
             frame_number: Frame number for reference
+            buffers: Optional FrameBuffers owned by the calling loop; the
+                grayscale conversion is written into its 'gray' buffer
             
         Returns:
             Dictionary containing analysis results
@@ -36,12 +81,19 @@ class CheatingDetector:
             FrameAnalysisError: If frame analysis fails
         """
         try:
-            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+            gray_dst = buffers.get('gray', frame.shape[:2]) if buffers is not None else None
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_dst)
             results = {
                 'face_detections': 0,
                 'lookaway_count': 0,
                 'multiple_faces': False,
-                'frame_number': frame_number
+                'frame_number': frame_number,
+                'opencv_faces': 0,
+                'eye_nose_ratios': [],
+                'nose_symmetry_ratios': [],
+                'gaze_offsets': [],
+                'face_descriptors': [],
+                'face_boxes': []
             }
             
             # OpenCV face detection
@@ -56,27 +108,33 @@ class CheatingDetector:
             faces_dlib = self.detector(frame, 1)
             
             logger.debug(f"Frame {frame_number} - OpenCV faces: {len(faces)}, dlib faces: {len(faces_dlib)}")
+            results['opencv_faces'] = len(faces)
+            results['face_boxes'] = (
+                [(int(x), int(y), int(x + w), int(y + h)) for x, y, w, h in faces]
+                + [(f.left(), f.top(), f.right(), f.bottom()) for f in faces_dlib])
             
             # Check for multiple faces
             if len(faces) > 1 or len(faces_dlib) > 1:
                 results['multiple_faces'] = True
                 logger.warning(f"Multiple faces detected in frame {frame_number}")
                 
-            # Analyze each face
+            # Analyze each face; descriptors need RGB, converted once per frame
+            rgb = None
             for face in faces_dlib:
                 results['face_detections'] += 1
-                shape = self.predictor(frame, face)
-                
-                # Eye tracking for lookaway detection
-                left_eye = shape.part(36)
-                right_eye = shape.part(45)
-                nose_left = shape.part(31)
-                nose_right = shape.part(35)
-                
-                eye_distance = abs(left_eye.x - right_eye.x)
-                nose_distance = abs(nose_left.x - nose_right.x)
-                
-                if eye_distance < 0.6 * nose_distance:
+                shape = None
+                if self.lookaway_method == 'landmarks' or self.face_encoder is not None:
+                    shape = self.predictor(frame, face)
+                if self.lookaway_method == 'gaze':
+                    lookaway = self._check_gaze(gray, face, results)
+                else:
+                    lookaway = self._check_landmarks(shape, results)
+                if self.face_encoder is not None:
+                    if rgb is None:
+                        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    results['face_descriptors'].append(self._describe(rgb, shape))
+                    
+                if lookaway:
                     results['lookaway_count'] += 1
                     logger.debug(f"Lookaway detected in frame {frame_number}")
                     
@@ -86,16 +144,95 @@ class CheatingDetector:
             logger.error(f"Frame analysis failed: {str(e)}")
             raise FrameAnalysisError(frame_number, str(e))
 
-    def compile_results(self, raw_results: Dict) -> Tuple[bool, Dict]:
+    def detect_objects(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Run the object detection stage on a keyframe.
+        
+        Args:
+            frame: Full BGR keyframe
+            
+        Returns:
+            Detected phones and screens, empty without an object detector
+        """
+        if self.object_detector is None:
+            return []
+        try:
+            return self.object_detector.detect(frame)
+        except cv2.error as e:
+            logger.error(f"Object detection failed: {str(e)}")
+            return []
+
+    def describe_faces(self, frame: np.ndarray) -> List[List[float]]:
+        """
+        Compute descriptors of all faces in a BGR image, e.g. for enrollment.
+        
+        Args:
+            frame: BGR image
+            
+        Returns:
+            One 128-d descriptor per detected face
+            
+        Raises:
+            ValueError: If no face encoder is configured
+        """
+        if self.face_encoder is None:
+            raise ValueError("No face encoder configured")
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return [self._describe(rgb, self.predictor(frame, face)) for face in self.detector(frame, 1)]
+
+    def _describe(self, rgb: np.ndarray, shape) -> List[float]:
+        """128-d face descriptor of an RGB image; dlib needs a contiguous image, ROI crops may not be."""
+        return list(self.face_encoder.compute_face_descriptor(np.ascontiguousarray(rgb), shape))
+
+    def _check_landmarks(self, shape, results: Dict) -> bool:
+        """
+        Lookaway check from the predicted landmarks.
+        
+        Args:
+            shape: dlib landmarks of the face
+            results: Frame results receiving the measured ratio
+            
+        Returns:
+            True if the face is looking away
+        """
+        scheme = self.landmark_scheme
+        ratio = scheme.measure(shape)
+        results[scheme.feature_key].append(ratio)
+        return scheme.is_lookaway(ratio, self.thresholds)
+
+    def _check_gaze(self, gray: np.ndarray, face, results: Dict) -> bool:
+        """
+        Lookaway check from pupil position in the eye-region crops.
+        
+        Args:
+            gray: Grayscale frame
+            face: dlib rectangle of the face
+            results: Frame results receiving the measured gaze offset
+            
+        Returns:
+            True if the face is looking away
+        """
+        gaze = self.gaze_estimator.estimate(
+            gray, (face.left(), face.top(), face.width(), face.height()))
+        if gaze is None:
+            return False
+            
+        horizontal, _ = gaze
+        results['gaze_offsets'].append(horizontal)
+        return abs(horizontal) > self.thresholds['gaze_offset_threshold']
+
+    def compile_results(self, raw_results: Dict, thresholds: Optional[Dict] = None) -> Tuple[bool, Dict]:
         """
         Compile frame-level results into final analysis.
         
         Args:
             raw_results: Accumulated results from frame analysis
+            thresholds: Optional overrides for the detector thresholds
             
         Returns:
             Tuple: (cheating_detected, analysis_details)
         """
+        thresholds = {**self.thresholds, **(thresholds or {})}
         cheating_detected = False
         reasons = []
         
@@ -105,6 +242,9 @@ class CheatingDetector:
         processing_ratio = (processed_frames / total_frames) * 100 if total_frames > 0 else 0
         face_detection_rate = (raw_results['face_detections'] / processed_frames) * 100 if processed_frames > 0 else 0
         lookaway_ratio = (raw_results['lookaway_count'] / raw_results['face_detections']) if raw_results['face_detections'] > 0 else 0
+        # Frames rejected by the quality gate are left out of the rates above
+        unusable_frames = raw_results.get('quality_skipped_frames', 0)
+        unusable_ratio = unusable_frames / (processed_frames + unusable_frames) if unusable_frames else 0
         
         # Detection logic
         if raw_results.get('multiple_faces', False):
@@ -112,23 +252,71 @@ class CheatingDetector:
             reasons.append("Multiple faces detected")
             
         if processed_frames > 0:
-            if face_detection_rate < 50:
+            if face_detection_rate < thresholds['min_face_detection_rate']:
                 cheating_detected = True
                 reasons.append(f"Low face detection rate ({face_detection_rate:.1f}%)")
                 
-            if lookaway_ratio > 0.4:
+            if lookaway_ratio > thresholds['lookaway_ratio_threshold']:
                 cheating_detected = True
                 reasons.append(f"Excessive lookaways ({lookaway_ratio:.2f} ratio)")
         
+        # Keeps a covered camera from escaping the face detection rate check
+        if unusable_ratio > thresholds['max_unusable_frame_ratio']:
+            cheating_detected = True
+            reasons.append(f"Mostly unusable video ({unusable_ratio * 100:.1f}% of keyframes dark, blurred or covered)")
+            
+        object_frames = raw_results.get('object_frames', 0)
+        if object_frames >= thresholds['min_object_frames']:
+            cheating_detected = True
+            reasons.append(f"Phone or second screen detected in {object_frames} keyframes")
+            
+        if raw_results.get('identity_changes'):
+            cheating_detected = True
+            frames = ", ".join(str(n) for n in raw_results['identity_changes'])
+            reasons.append(f"Face identity changed (frame {frames})")
+        
+        statistics = {
+            'total_frames': total_frames,
+            'processed_frames': processed_frames,
+            'processing_ratio': f"{processing_ratio:.1f}%",
+            'face_detection_rate': f"{face_detection_rate:.1f}%",
+            'lookaway_ratio': f"{lookaway_ratio:.2f}",
+            'multiple_faces_detected': raw_results.get('multiple_faces', False)
+        }
+        if 'deduplicated_frames' in raw_results:
+            statistics['deduplicated_frames'] = raw_results['deduplicated_frames']
+            statistics['dedup_ratio'] = f"{raw_results['dedup_ratio'] * 100:.1f}%"
+            statistics['dedup_similarity_threshold'] = raw_results['dedup_similarity_threshold']
+        if 'resumed_from_frame' in raw_results:
+            statistics['resumed_from_frame'] = raw_results['resumed_from_frame']
+        if 'quality_skipped_frames' in raw_results:
+            statistics['unusable_frames'] = unusable_frames
+            statistics['unusable_frame_ratio'] = f"{unusable_ratio * 100:.1f}%"
+            if 'quality_skip_reasons' in raw_results:
+                statistics['unusable_frame_reasons'] = raw_results['quality_skip_reasons']
+                statistics['detector_seconds_saved'] = round(raw_results['quality_detector_seconds_saved'], 3)
+                statistics['quality_gate_seconds'] = round(raw_results['quality_gate_seconds'], 3)
+        if 'object_frames' in raw_results:
+            statistics['object_frames'] = object_frames
+        if 'object_escalated_frames' in raw_results:
+            statistics['object_escalated_frames'] = raw_results['object_escalated_frames']
+            statistics['object_escalation_ratio'] = f"{raw_results['object_escalation_ratio'] * 100:.1f}%"
+            statistics['object_trigger_counts'] = raw_results['object_trigger_counts']
+            statistics['object_counts'] = raw_results['object_counts']
+            statistics['object_detector_seconds'] = round(raw_results['object_detector_seconds'], 3)
+        if 'decoded_from' in raw_results:
+            statistics['decoded_from'] = raw_results['decoded_from']
+        if 'identity_checked_frames' in raw_results:
+            statistics['identity_checked_frames'] = raw_results['identity_checked_frames']
+            statistics['identity_changes'] = raw_results['identity_changes']
+            statistics['identity_max_distance'] = f"{raw_results['identity_max_distance']:.3f}"
+        if 'roi_pixel_savings' in raw_results:
+            statistics['roi_region'] = raw_results['roi_region']
+            statistics['roi_full_scans'] = raw_results['roi_full_scans']
+            statistics['roi_pixel_savings'] = f"{raw_results['roi_pixel_savings'] * 100:.1f}%"
+        
         return cheating_detected, {
             'reasons': reasons if reasons else ["No cheating detected"],
-            'statistics': {
-                'total_frames': total_frames,
-                'processed_frames': processed_frames,
-                'processing_ratio': f"{processing_ratio:.1f}%",
-                'face_detection_rate': f"{face_detection_rate:.1f}%",
-                'lookaway_ratio': f"{lookaway_ratio:.2f}",
-                'multiple_faces_detected': raw_results.get('multiple_faces', False)
-            },
+            'statistics': statistics,
             'raw_counts': raw_results
         }
\ No newline at end of file
@@ -34,6 +34,12 @@ class VideoProcessingError(CheatingDetectionError):
         
         
 
+class UploadStalledError(VideoProcessingError):
+    """Raised when an upload analyzed while it arrives stops receiving data"""
+    def __init__(self, video_path: str, frame_number: int, idle_seconds: float):
+        super().__init__(video_path, frame_number, f"Upload stalled for {idle_seconds:.0f}s")
+        self.error_code = 2002
+
 class FrameAnalysisError(CheatingDetectionError):
     """Raised when frame analysis fails"""
     def __init__(self, frame_number: int, details: str = ""):
@@ -150,4 +156,36 @@ class AnalysisServiceError(CheatingDetectionError):
             'stage': self.stage,
             'message': self.message,
             'details': self.details
-        }
\ No newline at end of file
+        }
+
+
+class AdmissionError(CheatingDetectionError):
+    """Raised when an analysis job is deferred because the backlog is full"""
+    def __init__(self, cost: float, backlog_cost: float, retry_after: float, message: str = ""):
+        """
+        Initialize admission error
+        
+        Args:
+            cost: Estimated cost of the rejected job
+            backlog_cost: Estimated cost of queued jobs
+            retry_after: Seconds after which the job is likely to be admitted
+            message: Optional message replacing the default
+        """
+        message = message or (f"Analysis backlog full ({backlog_cost:.0f} cost units queued), "
+                              f"retry in {retry_after:.0f}s")
+        super().__init__(message, error_code=4001)
+        
+        self.cost = cost
+        self.backlog_cost = backlog_cost
+        self.retry_after = retry_after
+
+    def to_dict(self) -> dict:
+        """Convert error to dictionary for API responses"""
+        return {
+            'error_type': 'AdmissionError',
+            'error_code': self.error_code,
+            'message': self.message,
+            'cost': round(self.cost, 1),
+            'backlog_cost': round(self.backlog_cost, 1),
+            'retry_after': int(self.retry_after + 0.999)
+        }
@@ -0,0 +1,226 @@
+import os
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRing:
+    """
+    Ring of frame slots in one shared memory block, for passing frames
+    between processes without pickling them.
+
+    The decoder takes a free slot, writes a frame straight into it and
+    publishes the slot number; a detector process maps the same slot as a
+    NumPy view and hands the slot back once it is done with the frame.
+    Only slot numbers and frame numbers travel through the queues. When
+    every slot is in use the writer blocks, which bounds memory and
+    throttles the decoder to the detectors' pace.
+
+    A ring is passed to child processes as a Process argument; the child
+    attaches to the shared block by name. The creating process owns the
+    block and unlinks it in close().
+    """
+
+    def __init__(self, slots: int, frame_shape: Tuple[int, ...], dtype=np.uint8,
+                 readers: int = 1, context=None):
+        """
+        Args:
+            slots: Number of frames in flight at most
+            frame_shape: Largest frame shape, e.g. (1080, 1920, 3)
+            dtype: Frame dtype
+            readers: Number of detector processes reading from the ring
+            context: multiprocessing context for the slot queues
+        """
+        context = context or multiprocessing.get_context()
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.readers = readers
+        self.slot_size = int(np.prod(self.frame_shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_size * self.dtype.itemsize)
+        self._owner_pid = os.getpid()
+        self._free = context.Queue()
+        self._ready = context.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+        self._map_slots()
+
+    def __getstate__(self):
+        return {
+            'name': self._shm.name,
+            'slots': self.slots,
+            'frame_shape': self.frame_shape,
+            'dtype': self.dtype.str,
+            'readers': self.readers,
+            'free': self._free,
+            'ready': self._ready
+        }
+
+    def __setstate__(self, state):
+        self.slots = state['slots']
+        self.frame_shape = state['frame_shape']
+        self.dtype = np.dtype(state['dtype'])
+        self.readers = state['readers']
+        self.slot_size = int(np.prod(self.frame_shape))
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._owner_pid = None
+        self._free = state['free']
+        self._ready = state['ready']
+        self._map_slots()
+
+    def _map_slots(self) -> None:
+        self._slots = np.ndarray((self.slots, self.slot_size), dtype=self.dtype, buffer=self._shm.buf)
+
+    def _view(self, slot: int, shape: Tuple[int, ...]) -> np.ndarray:
+        size = int(np.prod(shape))
+        if size > self.slot_size:
+            raise ValueError(f"Frame of shape {tuple(shape)} does not fit slots of {self.frame_shape}")
+        return self._slots[slot, :size].reshape(shape)
+
+    def acquire(self, shape: Optional[Tuple[int, ...]] = None,
+                timeout: Optional[float] = None) -> Tuple[int, np.ndarray]:
+        """
+        Take a free slot to write a frame into, waiting for one if needed.
+
+        Args:
+            shape: Shape of the frame to write (default: frame_shape)
+            timeout: Seconds to wait for a free slot
+
+        Returns:
+            Tuple: (slot, writable view of the slot)
+
+        Raises:
+            queue.Empty: If no slot became free within timeout
+        """
+        slot = self._free.get(timeout=timeout)
+        return slot, self._view(slot, shape or self.frame_shape)
+
+    def publish(self, slot: int, frame_number: int, shape: Optional[Tuple[int, ...]] = None) -> None:
+        """Hand a written slot to the readers."""
+        self._ready.put((slot, frame_number, tuple(shape or self.frame_shape)))
+
+    def put(self, frame_number: int, frame: np.ndarray, timeout: Optional[float] = None) -> None:
+        """Copy a frame into a free slot and publish it."""
+        slot, view = self.acquire(frame.shape, timeout)
+        np.copyto(view, frame)
+        self.publish(slot, frame_number, frame.shape)
+
+    def finish(self) -> None:
+        """Tell every reader that no more frames follow."""
+        for _ in range(self.readers):
+            self._ready.put(None)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[int, int, np.ndarray]]:
+        """
+        Take the next published frame.
+
+        The view stays valid until the slot is released; copy the frame
+        to keep it longer.
+
+        Args:
+            timeout: Seconds to wait for a frame
+
+        Returns:
+            Tuple: (slot, frame_number, read-only view), or None once the
+            writer finished
+
+        Raises:
+            queue.Empty: If no frame arrived within timeout
+        """
+        message = self._ready.get(timeout=timeout)
+        if message is None:
+            return None
+        slot, frame_number, shape = message
+        view = self._view(slot, shape)
+        view.flags.writeable = False
+        return slot, frame_number, view
+
+    def release(self, slot: int) -> None:
+        """Return a slot to the writer."""
+        self._free.put(slot)
+
+    def frames(self, timeout: Optional[float] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield (frame_number, view) until the writer finishes.
+
+        Each slot is released when the next frame is requested, so a view
+        must not be used after advancing the iterator.
+        """
+        slot = None
+        try:
+            while True:
+                item = self.get(timeout)
+                if slot is not None:
+                    self.release(slot)
+                    slot = None
+                if item is None:
+                    return
+                slot, frame_number, view = item
+                yield frame_number, view
+        finally:
+            if slot is not None:
+                self.release(slot)
+
+    def close(self) -> None:
+        """Unmap the shared block; the creating process also frees it."""
+        self._slots = None
+        try:
+            self._shm.close()
+        except BufferError:
+            logger.warning("Frame views still referenced, shared memory left mapped")
+        # Forked children inherit the object, so ownership follows the pid
+        if self._owner_pid == os.getpid():
+            self._shm.unlink()
+            self._owner_pid = None
+
+
+def decode_to_ring(video_path: str, ring: FrameRing, interval: int = 1) -> int:
+    """
+    Decode every interval-th frame of a video directly into ring slots.
+
+    Skipped frames are only grabbed; each kept frame is retrieved straight
+    into its shared slot, so the decoded frame is never copied. Calls
+    ring.finish() when the video ends.
+
+    Args:
+        video_path: Path to video file
+        ring: FrameRing sized for the video's frames
+        interval: Keep every Nth frame
+
+    Returns:
+        Number of frames published
+    """
+    cap = cv2.VideoCapture(video_path)
+    published = 0
+    frame_counter = 0
+    shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+    try:
+        while cap.grab():
+            frame_counter += 1
+            if frame_counter % interval:
+                continue
+            slot, view = ring.acquire(shape)
+            ret, frame = cap.retrieve(view)
+            if not ret:
+                ring.release(slot)
+                break
+            if frame.shape != shape:
+                # Stream resolution differs from the container header
+                ring.release(slot)
+                shape = frame.shape
+                slot, view = ring.acquire(shape)
+                np.copyto(view, frame)
+            elif not np.shares_memory(frame, view):
+                np.copyto(view, frame)
+            ring.publish(slot, frame_counter, shape)
+            published += 1
+    finally:
+        cap.release()
+        ring.finish()
+    return published
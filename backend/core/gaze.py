@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+import logging
+from utils.frame_utils import extract_face_region
+
+logger = logging.getLogger(__name__)
+
+# Eye bands as fractions of the face box: (top, bottom, left, right)
+LEFT_EYE_BAND = (0.20, 0.50, 0.12, 0.45)
+RIGHT_EYE_BAND = (0.20, 0.50, 0.55, 0.88)
+
+class GazeEstimator:
+    def __init__(self, eye_size: Tuple[int, int] = (24, 12), dark_percentile: float = 15.0):
+        """
+        Initialize gaze estimator working on low-resolution eye crops.
+
+        Args:
+            eye_size: (width, height) each eye crop is resized to
+            dark_percentile: Intensity percentile below which pixels count as pupil
+        """
+        self.eye_size = eye_size
+        self.dark_percentile = dark_percentile
+        width, height = eye_size
+        # Normalized pixel coordinates in [-1, 1], shared by every estimate
+        self._xs = np.linspace(-1.0, 1.0, width, dtype=np.float32)
+        self._ys = np.linspace(-1.0, 1.0, height, dtype=np.float32)
+
+    def estimate(self, gray: np.ndarray, face_box: Tuple[int, int, int, int]) -> Optional[Tuple[float, float]]:
+        """
+        Estimate gaze direction for one face.
+
+        Args:
+            gray: Grayscale frame
+            face_box: (x, y, w, h) face coordinates
+
+        Returns:
+            Tuple: (horizontal, vertical) pupil offset in [-1, 1], 0 meaning
+            centred; None if the eye regions could not be extracted
+        """
+        face = extract_face_region(gray, face_box, padding=0)
+        if face is None or face.size == 0:
+            return None
+
+        eyes = self._crop_eyes(face)
+        if eyes is None:
+            return None
+
+        # Weight dark pixels by how far below the per-eye threshold they are
+        flat = eyes.reshape(len(eyes), -1)
+        k = int(flat.shape[1] * self.dark_percentile / 100.0)
+        cutoff = np.partition(flat, k, axis=1)[:, k].reshape(-1, 1, 1)
+        weights = np.clip(cutoff - eyes, 0, None) + 1e-3 * (eyes <= cutoff)
+        totals = weights.sum(axis=(1, 2))
+        if np.any(totals <= 0):
+            return None
+
+        horizontal = (weights.sum(axis=1) @ self._xs) / totals
+        vertical = (weights.sum(axis=2) @ self._ys) / totals
+        return float(horizontal.mean()), float(vertical.mean())
+
+    def _crop_eyes(self, face: np.ndarray) -> Optional[np.ndarray]:
+        """Crop and resize both eye bands into a (2, height, width) float array."""
+        height, width = face.shape[:2]
+        crops = []
+        for top, bottom, left, right in (LEFT_EYE_BAND, RIGHT_EYE_BAND):
+            region = face[int(top * height):int(bottom * height), int(left * width):int(right * width)]
+            if region.shape[0] < 2 or region.shape[1] < 2:
+                return None
+            crops.append(cv2.resize(region, self.eye_size, interpolation=cv2.INTER_AREA))
+        eyes = np.stack(crops).astype(np.float32)
+        # Equalize brightness between eyes so one cutoff rule fits both
+        eyes -= eyes.min(axis=(1, 2), keepdims=True)
+        return eyes
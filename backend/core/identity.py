@@ -0,0 +1,109 @@
+import numpy as np
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IdentityTracker:
+    def __init__(self, distance_threshold: float = 0.6, reference_frames: int = 5,
+                 min_change_frames: int = 3):
+        """
+        Initialize identity continuity tracker.
+
+        The mean descriptor of the first reference_frames single-face
+        keyframes is taken as the test taker's identity. A keyframe whose
+        face is farther than distance_threshold from it is a mismatch;
+        min_change_frames consecutive mismatches are reported as an
+        identity change, and the new face becomes the reference so a
+        later swap back is reported too. Keyframes with no face or several
+        faces are skipped.
+
+        Args:
+            distance_threshold: Euclidean descriptor distance separating
+                two people (0.6 for dlib's ResNet model)
+            reference_frames: Keyframes averaged into the reference
+            min_change_frames: Consecutive mismatches confirming a change
+        """
+        self.distance_threshold = distance_threshold
+        self.reference_frames = reference_frames
+        self.min_change_frames = min_change_frames
+        self._reference: Optional[np.ndarray] = None
+        self._pending: List[np.ndarray] = []
+        self._run: List[np.ndarray] = []
+        self._run_start: Optional[int] = None
+        self.checked_frames = 0
+        self.mismatch_frames = 0
+        self.max_distance = 0.0
+        self.changes: List[int] = []
+
+    def update(self, frame_result: Dict) -> None:
+        """
+        Compare the face of an analyzed keyframe with the reference identity.
+
+        Args:
+            frame_result: analyze_frame result carrying 'face_descriptors'
+        """
+        descriptors = frame_result.get('face_descriptors', [])
+        if len(descriptors) != 1:
+            return
+        descriptor = np.asarray(descriptors[0], dtype=np.float32)
+        self.checked_frames += 1
+
+        if self._reference is None:
+            self._pending.append(descriptor)
+            if len(self._pending) >= self.reference_frames:
+                self._reference = np.mean(self._pending, axis=0)
+                self._pending = []
+            return
+
+        distance = float(np.linalg.norm(descriptor - self._reference))
+        self.max_distance = max(self.max_distance, distance)
+        if distance <= self.distance_threshold:
+            self._run = []
+            self._run_start = None
+            return
+
+        self.mismatch_frames += 1
+        if not self._run:
+            self._run_start = frame_result['frame_number']
+        self._run.append(descriptor)
+        if len(self._run) >= self.min_change_frames:
+            self.changes.append(self._run_start)
+            logger.warning(f"Face identity changed at frame {self._run_start} (distance {distance:.3f})")
+            self._reference = np.mean(self._run, axis=0)
+            self._run = []
+            self._run_start = None
+
+    def get_state(self) -> Dict:
+        """Return tracker state for checkpointing."""
+        return {
+            'reference': self._reference.tolist() if self._reference is not None else None,
+            'pending': [d.tolist() for d in self._pending],
+            'run': [d.tolist() for d in self._run],
+            'run_start': self._run_start,
+            'checked_frames': self.checked_frames,
+            'mismatch_frames': self.mismatch_frames,
+            'max_distance': self.max_distance,
+            'changes': self.changes
+        }
+
+    def restore_state(self, state: Dict) -> None:
+        """Continue tracking from a state returned by get_state."""
+        if state['reference'] is not None:
+            self._reference = np.asarray(state['reference'], dtype=np.float32)
+        self._pending = [np.asarray(d, dtype=np.float32) for d in state['pending']]
+        self._run = [np.asarray(d, dtype=np.float32) for d in state['run']]
+        self._run_start = state['run_start']
+        self.checked_frames = state['checked_frames']
+        self.mismatch_frames = state['mismatch_frames']
+        self.max_distance = state['max_distance']
+        self.changes = list(state['changes'])
+
+    def get_stats(self) -> Dict:
+        """Return identity continuity statistics."""
+        return {
+            'identity_checked_frames': self.checked_frames,
+            'identity_mismatch_frames': self.mismatch_frames,
+            'identity_max_distance': self.max_distance,
+            'identity_changes': list(self.changes)
+        }
@@ -0,0 +1,92 @@
+import abc
+from typing import Dict
+
+class LandmarkScheme(abc.ABC):
+    """
+    Lookaway measurement for one dlib landmark model.
+
+    Each scheme reads the few points its rule needs from a predicted shape
+    and reduces them to a single ratio; the face counts as looking away
+    when the ratio falls below the scheme's threshold.
+    """
+    name = ""
+    num_points = 0
+    feature_key = ""
+    threshold_key = ""
+
+    @abc.abstractmethod
+    def measure(self, shape) -> float:
+        """
+        Compute the lookaway ratio of one predicted shape.
+
+        Args:
+            shape: dlib full_object_detection with num_points parts
+
+        Returns:
+            Ratio compared against the scheme threshold
+        """
+
+    def is_lookaway(self, ratio: float, thresholds: Dict) -> bool:
+        """Return True if the measured ratio indicates a lookaway."""
+        return ratio < thresholds[self.threshold_key]
+
+
+class SixtyEightPointScheme(LandmarkScheme):
+    """Outer eye-corner span relative to nostril width (iBUG 68-point layout)."""
+    name = "68"
+    num_points = 68
+    feature_key = 'eye_nose_ratios'
+    threshold_key = 'lookaway_eye_nose_ratio'
+
+    def measure(self, shape) -> float:
+        eye_distance = abs(shape.part(36).x - shape.part(45).x)
+        nose_distance = abs(shape.part(31).x - shape.part(35).x)
+        return eye_distance / nose_distance if nose_distance else float('inf')
+
+
+class FivePointScheme(LandmarkScheme):
+    """
+    Nose position between the outer eye corners (dlib 5-point layout).
+
+    The 5-point model has no nostril points, so the 68-point width ratio
+    cannot be computed. Instead the nose tip's horizontal distance to each
+    outer eye corner is compared: a frontal face gives about 1.0 and the
+    ratio falls towards 0 as the head turns.
+    """
+    name = "5"
+    num_points = 5
+    feature_key = 'nose_symmetry_ratios'
+    threshold_key = 'lookaway_nose_symmetry'
+
+    def measure(self, shape) -> float:
+        # Points 0-1 and 2-3 are the eye corners, 0 and 2 the outer ones; 4 is below the nose
+        nose_x = shape.part(4).x
+        left_span = nose_x - shape.part(2).x
+        right_span = shape.part(0).x - nose_x
+        if left_span <= 0 or right_span <= 0:
+            # Nose outside the eye corners: head fully turned
+            return 0.0
+        return min(left_span, right_span) / max(left_span, right_span)
+
+
+LANDMARK_SCHEMES = {
+    scheme.name: scheme for scheme in (SixtyEightPointScheme(), FivePointScheme())
+}
+
+def get_landmark_scheme(name: str) -> LandmarkScheme:
+    """
+    Look up a landmark scheme by model name.
+
+    Args:
+        name: Model name, '68' or '5'
+
+    Returns:
+        LandmarkScheme instance
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    try:
+        return LANDMARK_SCHEMES[str(name)]
+    except KeyError:
+        raise ValueError(f"Unknown landmark model: {name}")
@@ -0,0 +1,217 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+ESCALATION_TRIGGERS = ('lookaway', 'hands', 'motion', 'no_face', 'periodic')
+
+# YCrCb skin range; used as a cheap stand-in for hand detection
+SKIN_LOWER = np.array([0, 133, 77], dtype=np.uint8)
+SKIN_UPPER = np.array([255, 173, 127], dtype=np.uint8)
+
+class ObjectDetector:
+    def __init__(self, model_path: str, config_path: str = "", labels: Optional[Sequence[str]] = None,
+                 target_classes: Sequence[str] = ('cell phone', 'laptop', 'tv'),
+                 confidence: float = 0.5, input_size: int = 320,
+                 scale: float = 1.0 / 127.5, mean: float = 127.5, swap_rb: bool = True):
+        """
+        Initialize OpenCV DNN object detector for phones and screens.
+
+        Any detection network cv2.dnn_DetectionModel can parse works, e.g.
+        SSD MobileNet trained on COCO; the input parameters must match the
+        model.
+
+        Args:
+            model_path: Network weights, stored locally
+            config_path: Network description, if the format needs one
+            labels: Class names indexed by the class IDs the model outputs
+            target_classes: Names of classes to report
+            confidence: Minimum detection confidence
+            input_size: Square network input size
+            scale: Pixel scale factor of the network input
+            mean: Mean subtracted from each channel
+            swap_rb: Whether the network expects RGB input; frames are BGR
+        """
+        net = cv2.dnn.readNet(model_path, config_path)
+        self.model = cv2.dnn_DetectionModel(net)
+        self.model.setInputParams(size=(input_size, input_size), scale=scale,
+                                  mean=(mean, mean, mean), swapRB=swap_rb)
+        self.labels = list(labels or [])
+        self.target_classes = set(target_classes)
+        self.confidence = confidence
+
+    def detect(self, frame: np.ndarray) -> List[Dict]:
+        """
+        Detect target objects in a BGR frame.
+
+        Args:
+            frame: BGR frame
+
+        Returns:
+            List of {'label', 'confidence', 'box'} with box as (x1, y1, x2, y2)
+        """
+        class_ids, confidences, boxes = self.model.detect(frame, confThreshold=self.confidence)
+        detections = []
+        for class_id, confidence, (x, y, w, h) in zip(
+                np.ravel(class_ids), np.ravel(confidences), np.reshape(boxes, (-1, 4))):
+            label = self.labels[class_id] if 0 <= class_id < len(self.labels) else str(class_id)
+            if label in self.target_classes:
+                detections.append({
+                    'label': label,
+                    'confidence': round(float(confidence), 3),
+                    'box': (int(x), int(y), int(x + w), int(y + h))
+                })
+        return detections
+
+
+class EscalationPolicy:
+    def __init__(self, triggers: Sequence[str] = ('lookaway', 'hands', 'motion'),
+                 motion_factor: float = 3.0, min_motion: float = 6.0,
+                 skin_fraction: float = 0.15, periodic_interval: int = 0):
+        """
+        Initialize per-video policy choosing keyframes for object detection.
+
+        All triggers reuse the face analysis result or a thumbnail of the
+        frame, so deciding costs a fraction of a millisecond:
+        'lookaway' fires on keyframes with a lookaway, 'no_face' when no
+        face was found, 'hands' when skin-coloured pixels fill the band
+        beside and below the face, 'motion' when the difference to the
+        previous keyframe spikes above its running average, and 'periodic'
+        every periodic_interval analyzed keyframes. Once objects are found,
+        the following keyframes are escalated too ('follow_up') until a
+        detection comes back empty, so an object staying in view is
+        counted on every keyframe it appears in.
+
+        Args:
+            triggers: Enabled triggers, from ESCALATION_TRIGGERS
+            motion_factor: Motion spike relative to the running average
+            min_motion: Smallest mean absolute difference (0-255) counted as a spike
+            skin_fraction: Fraction of skin pixels around the face counted as hands
+            periodic_interval: Escalate every Nth analyzed keyframe (0 disables)
+        """
+        unknown = set(triggers) - set(ESCALATION_TRIGGERS)
+        if unknown:
+            raise ValueError(f"Unknown escalation triggers: {sorted(unknown)}")
+        self.triggers = tuple(triggers)
+        self.motion_factor = motion_factor
+        self.min_motion = min_motion
+        self.skin_fraction = skin_fraction
+        self.periodic_interval = periodic_interval
+        self._previous: Optional[np.ndarray] = None
+        self._motion_baseline: Optional[float] = None
+        self._follow_up = False
+        self.analyzed_frames = 0
+        self.escalated_frames = 0
+        self.trigger_counts: Dict[str, int] = {trigger: 0 for trigger in self.triggers + ('follow_up',)}
+        self.object_counts: Dict[str, int] = {}
+        self.detector_seconds = 0.0
+
+    def evaluate(self, frame: np.ndarray, frame_result: Dict) -> List[str]:
+        """
+        Return the triggers that fire for an analyzed keyframe.
+
+        Args:
+            frame: Full BGR keyframe
+            frame_result: analyze_frame result of the keyframe, with face
+                boxes in full-frame coordinates
+
+        Returns:
+            Names of the fired triggers; empty if the frame is not escalated
+        """
+        self.analyzed_frames += 1
+        small = cv2.resize(frame, (160, max(1, frame.shape[0] * 160 // frame.shape[1])),
+                           interpolation=cv2.INTER_AREA)
+        fired = []
+        if 'lookaway' in self.triggers and frame_result.get('lookaway_count', 0) > 0:
+            fired.append('lookaway')
+        if 'no_face' in self.triggers and frame_result.get('face_detections', 0) == 0:
+            fired.append('no_face')
+        if 'hands' in self.triggers and self._hands_near_face(small, frame.shape, frame_result):
+            fired.append('hands')
+        if 'motion' in self.triggers and self._motion_spike(small):
+            fired.append('motion')
+        if ('periodic' in self.triggers and self.periodic_interval > 0
+                and self.analyzed_frames % self.periodic_interval == 0):
+            fired.append('periodic')
+        if self._follow_up:
+            fired.append('follow_up')
+
+        for trigger in fired:
+            self.trigger_counts[trigger] += 1
+        if fired:
+            self.escalated_frames += 1
+        return fired
+
+    def record(self, detections: List[Dict], seconds: float) -> None:
+        """Count the objects found on an escalated keyframe."""
+        self.detector_seconds += seconds
+        self._follow_up = bool(detections)
+        for label in {d['label'] for d in detections}:
+            self.object_counts[label] = self.object_counts.get(label, 0) + 1
+
+    def _hands_near_face(self, small: np.ndarray, shape, frame_result: Dict) -> bool:
+        boxes = frame_result.get('face_boxes', [])
+        if not boxes:
+            return False
+        scale = small.shape[1] / shape[1]
+        x1, y1, x2, y2 = (int(v * scale) for v in boxes[-1])
+        w, h = x2 - x1, y2 - y1
+        if w <= 0 or h <= 0:
+            return False
+        # Band one face wide on each side and one face high below, face excluded
+        left, top = max(0, x1 - w), max(0, y1)
+        right, bottom = min(small.shape[1], x2 + w), min(small.shape[0], y2 + h)
+        region = small[top:bottom, left:right]
+        if region.size == 0:
+            return False
+        mask = cv2.inRange(cv2.cvtColor(region, cv2.COLOR_BGR2YCrCb), SKIN_LOWER, SKIN_UPPER)
+        mask[max(0, y1 - top):y2 - top, max(0, x1 - left):x2 - left] = 0
+        band_pixels = mask.size - max(0, min(x2, right) - max(x1, left)) * max(0, min(y2, bottom) - max(y1, top))
+        return band_pixels > 0 and np.count_nonzero(mask) > self.skin_fraction * band_pixels
+
+    def _motion_spike(self, small: np.ndarray) -> bool:
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+        previous, self._previous = self._previous, gray
+        if previous is None or previous.shape != gray.shape:
+            return False
+        motion = float(np.mean(np.abs(gray - previous)))
+        baseline = self._motion_baseline
+        self._motion_baseline = motion if baseline is None else 0.9 * baseline + 0.1 * motion
+        if baseline is None:
+            return False
+        return motion >= self.min_motion and motion > self.motion_factor * baseline
+
+    def get_state(self) -> Dict:
+        """Return counters for checkpointing; the previous thumbnail is not kept."""
+        return {
+            'motion_baseline': self._motion_baseline,
+            'follow_up': self._follow_up,
+            'analyzed_frames': self.analyzed_frames,
+            'escalated_frames': self.escalated_frames,
+            'trigger_counts': self.trigger_counts,
+            'object_counts': self.object_counts,
+            'detector_seconds': self.detector_seconds
+        }
+
+    def restore_state(self, state: Dict) -> None:
+        """Continue from a state returned by get_state."""
+        self._motion_baseline = state['motion_baseline']
+        self._follow_up = state['follow_up']
+        self.analyzed_frames = state['analyzed_frames']
+        self.escalated_frames = state['escalated_frames']
+        self.trigger_counts.update(state['trigger_counts'])
+        self.object_counts = dict(state['object_counts'])
+        self.detector_seconds = state['detector_seconds']
+
+    def get_stats(self) -> Dict:
+        """Return escalation statistics."""
+        return {
+            'object_escalated_frames': self.escalated_frames,
+            'object_escalation_ratio': (self.escalated_frames / self.analyzed_frames
+                                        if self.analyzed_frames else 0.0),
+            'object_trigger_counts': dict(self.trigger_counts),
+            'object_counts': dict(self.object_counts),
+            'object_detector_seconds': self.detector_seconds
+        }
@@ -0,0 +1,181 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]
+
+class ROITracker:
+    def __init__(self, warmup_frames: int = 5, margin: float = 0.5,
+                 revalidate_interval: int = 10):
+        """
+        Initialize candidate region-of-interest tracker.
+
+        The first analyzed keyframes are scanned in full and their face
+        boxes merged into one region, widened by a margin. Later keyframes
+        are cropped to that region before detection. Every
+        revalidate_interval-th analyzed keyframe, and the one after a crop
+        finds no face, is scanned in full again; faces found outside the
+        region widen it.
+
+        Args:
+            warmup_frames: Full-frame scans with a face needed before cropping
+            margin: Padding added on each side, as a fraction of the region size
+            revalidate_interval: Analyzed keyframes between full-frame scans
+        """
+        self.warmup_frames = warmup_frames
+        self.margin = margin
+        self.revalidate_interval = revalidate_interval
+        self._faces: Optional[Box] = None
+        self._region: Optional[Box] = None
+        self._warmup_seen = 0
+        self._since_full_scan = 0
+        self._force_full_scan = False
+        self._last_full_scan = True
+        self.full_scans = 0
+        self.cropped_frames = 0
+        self.region_expansions = 0
+        self.pixels_processed = 0
+        self.pixels_total = 0
+
+    @property
+    def region(self) -> Optional[Box]:
+        """Current (left, top, right, bottom) crop region, None while learning."""
+        return self._region
+
+    def crop(self, frame: np.ndarray, buffers=None) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Select the part of a keyframe to run detection on.
+
+        Args:
+            frame: Full keyframe
+            buffers: Optional FrameBuffers; the crop is copied into its
+                'roi' buffer instead of a new array
+
+        Returns:
+            Tuple: (image, (x_offset, y_offset)); the full frame with a zero
+            offset when a full scan is due
+        """
+        height, width = frame.shape[:2]
+        self.pixels_total += height * width
+
+        self._last_full_scan = self._full_scan_due()
+        if self._last_full_scan:
+            self.pixels_processed += height * width
+            return frame, (0, 0)
+
+        left, top, right, bottom = self._region
+        view = frame[top:bottom, left:right]
+        if buffers is not None:
+            crop = buffers.get('roi', view.shape, view.dtype)
+            np.copyto(crop, view)
+            view = crop
+        else:
+            view = np.ascontiguousarray(view)
+        self.pixels_processed += view.shape[0] * view.shape[1]
+        return view, (left, top)
+
+    def update(self, frame_result: Dict, frame_shape: Tuple[int, ...],
+               offset: Tuple[int, int]) -> None:
+        """
+        Learn from the analysis of the image returned by the last crop().
+
+        Face boxes in frame_result are shifted back to full-frame
+        coordinates in place.
+
+        Args:
+            frame_result: Result of analyze_frame on the cropped image
+            frame_shape: Shape of the full keyframe
+            offset: Offset returned by crop()
+        """
+        x_offset, y_offset = offset
+        boxes = [(int(l) + x_offset, int(t) + y_offset, int(r) + x_offset, int(b) + y_offset)
+                 for l, t, r, b in frame_result.get('face_boxes', [])]
+        frame_result['face_boxes'] = boxes
+        if not self._last_full_scan:
+            self.cropped_frames += 1
+            self._since_full_scan += 1
+            # The candidate may have moved out of the region
+            self._force_full_scan = not boxes
+            return
+
+        self.full_scans += 1
+        self._since_full_scan = 0
+        self._force_full_scan = False
+        if not boxes:
+            return
+
+        merged = self._union(boxes if self._faces is None else boxes + [self._faces])
+        if self._region is None:
+            self._faces = merged
+            self._warmup_seen += 1
+            if self._warmup_seen >= self.warmup_frames:
+                self._region = self._widen(merged, frame_shape)
+                logger.debug(f"Candidate region learned: {self._region}")
+        elif any(not self._contains(self._region, box) for box in boxes):
+            self._faces = merged
+            self._region = self._widen(merged, frame_shape)
+            self.region_expansions += 1
+            logger.info(f"Face outside candidate region, widened to {self._region}")
+
+    def get_state(self) -> Dict:
+        """Return learned region and counters for checkpointing."""
+        return {
+            'faces': self._faces,
+            'region': self._region,
+            'warmup_seen': self._warmup_seen,
+            'since_full_scan': self._since_full_scan,
+            'full_scans': self.full_scans,
+            'cropped_frames': self.cropped_frames,
+            'region_expansions': self.region_expansions,
+            'pixels_processed': self.pixels_processed,
+            'pixels_total': self.pixels_total
+        }
+
+    def restore_state(self, state: Dict) -> None:
+        """Continue from a state returned by get_state."""
+        self._faces = tuple(state['faces']) if state['faces'] else None
+        self._region = tuple(state['region']) if state['region'] else None
+        self._warmup_seen = state['warmup_seen']
+        self._since_full_scan = state['since_full_scan']
+        self.full_scans = state['full_scans']
+        self.cropped_frames = state['cropped_frames']
+        self.region_expansions = state['region_expansions']
+        self.pixels_processed = state['pixels_processed']
+        self.pixels_total = state['pixels_total']
+
+    def get_stats(self) -> Dict:
+        """Return cropping statistics."""
+        saved = 1.0 - self.pixels_processed / self.pixels_total if self.pixels_total else 0.0
+        return {
+            'roi_region': list(self._region) if self._region else None,
+            'roi_cropped_frames': self.cropped_frames,
+            'roi_full_scans': self.full_scans,
+            'roi_region_expansions': self.region_expansions,
+            'roi_pixels_processed': self.pixels_processed,
+            'roi_pixels_total': self.pixels_total,
+            'roi_pixel_savings': saved
+        }
+
+    def _full_scan_due(self) -> bool:
+        return (self._region is None or self._force_full_scan
+                or self._since_full_scan >= self.revalidate_interval)
+
+    def _widen(self, box: Box, frame_shape: Tuple[int, ...]) -> Box:
+        height, width = frame_shape[:2]
+        left, top, right, bottom = box
+        pad_x = int((right - left) * self.margin)
+        pad_y = int((bottom - top) * self.margin)
+        return (max(0, left - pad_x), max(0, top - pad_y),
+                min(width, right + pad_x), min(height, bottom + pad_y))
+
+    @staticmethod
+    def _union(boxes: List[Box]) -> Box:
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    @staticmethod
+    def _contains(outer: Box, inner: Box) -> bool:
+        return (outer[0] <= inner[0] and outer[1] <= inner[1]
+                and inner[2] <= outer[2] and inner[3] <= outer[3])
@@ -1,36 +1,92 @@
 import cv2
-from typing import Tuple, Dict, Optional
+import numpy as np
+from typing import Tuple, Dict, Optional, Iterator
 from collections import defaultdict
+import time
 import logging
-from .exceptions import VideoValidationError, VideoProcessingError
+from pathlib import Path
+from .exceptions import VideoValidationError, VideoProcessingError, UploadStalledError
+from .deduplication import FrameDeduplicator
+from .roi import ROITracker
+from .identity import IdentityTracker
+from .quality import FrameQualityGate
+from .objects import EscalationPolicy
+from utils.frame_utils import FrameBuffers
 
 logger = logging.getLogger(__name__)
 
+# Frame result keys summed into the video-level counts
+AGGREGATED_KEYS = ('face_detections', 'lookaway_count', 'multiple_faces')
+
+# How far before the last consumed frame a tail pass seeks by time; the
+# larger step is tried when the short one lands past the frame
+GROWING_SEEK_BACKOFF_MSEC = (250.0, 2000.0)
+
 class VideoProcessor:
-    def __init__(self, cheating_detector, config: Optional[Dict] = None):
+    def __init__(self, cheating_detector, config: Optional[Dict] = None,
+                 keyframe_cache=None, feature_store=None, checkpoint_store=None,
+                 video_index=None, proxy_service=None):
         """
         Initialize video processor with cheating detector.
         
         Args:
             cheating_detector: CheatingDetector instance
             config: Processing configuration
+            keyframe_cache: Optional KeyframeCache to read keyframes from
+            feature_store: Optional FeatureStore to persist per-frame features
+            checkpoint_store: Optional CheckpointStore to save progress to
+                and resume interrupted analyses from
+            video_index: Optional VideoIndexService providing frame
+                timestamps and keyframe positions for timestamp sampling
+            proxy_service: Optional ProxyService; stored uploads are decoded
+                from their low-resolution proxy once it is ready
         """
         self.detector = cheating_detector
+        self.keyframe_cache = keyframe_cache
+        self.feature_store = feature_store
+        self.checkpoint_store = checkpoint_store
+        self.video_index = video_index
+        self.proxy_service = proxy_service
         self.config = {
             'keyframe_interval': 30,
             'min_face_detection_rate': 50,
             'lookaway_ratio_threshold': 0.4,
-            'early_termination': True
+            'early_termination': True,
+            'dedup_similarity_threshold': None,
+            'roi_enabled': False,
+            'roi_warmup_frames': 5,
+            'roi_margin': 0.5,
+            'roi_revalidate_interval': 10,
+            'checkpoint_interval': 100,
+            'growing_min_bytes': 4 * 1024 * 1024,
+            'growing_poll_interval': 1.0,
+            'growing_stall_seconds': 60.0,
+            'quality_gate_enabled': False,
+            'quality_min_sharpness': 15.0,
+            'quality_min_brightness': 35.0,
+            'quality_max_brightness': 225.0,
+            'quality_max_clipped_fraction': 0.6,
+            'object_triggers': ('lookaway', 'hands', 'motion'),
+            'object_motion_factor': 3.0,
+            'object_skin_fraction': 0.15,
+            'object_periodic_interval': 0,
+            'identity_reference_frames': 5,
+            'identity_min_change_frames': 3,
+            'timed_sampling': 'auto',
+            'sample_interval_seconds': None
         }
         if config:
             self.config.update(config)
 
-    def process_video(self, video_path: str) -> Tuple[bool, Dict]:
+    def process_video(self, video_path: str, source=None) -> Tuple[bool, Dict]:
         """
         Process video and detect cheating indicators.
         
         Args:
             video_path: Path to video file
+            source: Optional UploadSession still writing video_path; the
+                file is then analyzed while it grows and the stored
+                features are named after the session's final video ID
             
         Returns:
             Tuple: (cheating_detected, analysis_details)
@@ -38,61 +94,522 @@ class VideoProcessor:
         Raises:
             VideoProcessingError: If processing fails
         """
+        if source is not None or self.checkpoint_store is None:
+            return self._process_video(video_path, source)
+        # Concurrent analyses of one video would overwrite each other's checkpoint
+        with self.checkpoint_store.lock(Path(video_path).stem):
+            return self._process_video(video_path, None)
+
+    def _process_video(self, video_path: str, source) -> Tuple[bool, Dict]:
+        """Run process_video while holding the video's checkpoint lock, if any."""
         try:
-            # Validate video first
-            self._validate_video(video_path)
+            video_id = Path(video_path).stem
             
-            cap = cv2.VideoCapture(video_path)
+            # Decode from the proxy when one is ready; features keep the upload's
+            # ID and checkpoints the upload's fingerprint, as the proxy may only
+            # appear between an interrupted run and its resumption
+            upload_path = video_path
+            if source is None and self.proxy_service is not None:
+                video_path = self.proxy_service.resolve(video_path)
+            
+            # Validate video first; a growing file is checked once it opens
+            reported_frames = self._validate_video(video_path) if source is None else 0
+            
+            checkpoints = self.checkpoint_store if source is None else None
             results = defaultdict(int)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            buffers = FrameBuffers()
             processed_frames = 0
             frame_counter = 0
+            recorder = self.feature_store.create_recorder() if self.feature_store is not None else None
+            deduplicator = None
+            if self.config['dedup_similarity_threshold'] is not None:
+                deduplicator = FrameDeduplicator(self.config['dedup_similarity_threshold'])
+            roi = None
+            if self.config['roi_enabled']:
+                roi = ROITracker(self.config['roi_warmup_frames'], self.config['roi_margin'],
+                                 self.config['roi_revalidate_interval'])
+            quality = None
+            if self.config['quality_gate_enabled']:
+                quality = FrameQualityGate(self.config['quality_min_sharpness'],
+                                           self.config['quality_min_brightness'],
+                                           self.config['quality_max_brightness'],
+                                           self.config['quality_max_clipped_fraction'])
+            detector_seconds = 0.0
+            detected_frames = 0
+            escalation = None
+            if getattr(self.detector, 'object_detector', None) is not None:
+                escalation = EscalationPolicy(self.config['object_triggers'],
+                                              motion_factor=self.config['object_motion_factor'],
+                                              skin_fraction=self.config['object_skin_fraction'],
+                                              periodic_interval=self.config['object_periodic_interval'])
+            identity = None
+            if getattr(self.detector, 'face_encoder', None) is not None:
+                identity = IdentityTracker(self.detector.thresholds['identity_distance_threshold'],
+                                           self.config['identity_reference_frames'],
+                                           self.config['identity_min_change_frames'])
             
-            # Process frames
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                    
-                frame_counter += 1
+            # Pick up an interrupted analysis of the same file
+            resume_from = 0
+            descriptors_saved = 0
+            state = self._load_checkpoint(video_id, upload_path) if checkpoints is not None else None
+            if state is not None:
+                resume_from = frame_counter = state['frame_counter']
+                if state.get('recorder'):
+                    descriptors_saved = state['recorder'].get('descriptor_count', 0)
+                processed_frames = state['processed_frames']
+                results.update(state['results'])
+                if recorder is not None and state.get('recorder'):
+                    recorder.restore(state['recorder'])
+                if deduplicator and state.get('deduplicator'):
+                    deduplicator.restore_state(state['deduplicator'])
+                if roi and state.get('roi'):
+                    roi.restore_state(state['roi'])
+                if identity and state.get('identity'):
+                    identity.restore_state(state['identity'])
+                if escalation and state.get('escalation'):
+                    escalation.restore_state(state['escalation'])
+                if quality and state.get('quality'):
+                    quality.restore_state(state['quality'])
+                    detector_seconds = state['detector_seconds']
+                    detected_frames = state['detected_frames']
+                logger.info(f"Resuming analysis of {video_id} after frame {resume_from}")
+            
+            cap = None
+            progress = {'frames': 0}
+            index = self._get_timed_index(video_path, reported_frames) if source is None else None
+            keyframes = None
+            if source is None and index is None and self.keyframe_cache is not None:
+                # None for videos whose keyframes exceed the cache budget
+                keyframes = self.keyframe_cache.get_or_build(video_path, self.config['keyframe_interval'])
+            if source is not None:
+                total_frames = None
+                frames = self._iter_growing_keyframes(video_path, source, progress)
+            elif index is not None:
+                cap = cv2.VideoCapture(video_path)
+                total_frames = index.frame_count
+                frames = self._iter_timed_keyframes(cap, index, resume_from, progress)
+            elif keyframes is not None:
+                total_frames = keyframes.index['total_frames']
+                frames = ((n, f) for n, f in keyframes if n > resume_from)
+            else:
+                cap = cv2.VideoCapture(video_path)
+                total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+                frames = self._iter_keyframes(cap, self._seek(cap, resume_from))
+            
+            # Process keyframes
+            for frame_counter, frame in frames:
+                # Reuse previous result for near-identical frames
+                frame_result = deduplicator.lookup(frame, frame_counter) if deduplicator else None
                 
-                # Only process keyframes
-                if frame_counter % self.config['keyframe_interval'] != 0:
+                # Skip blurred, dark or covered frames before running the detectors
+                if frame_result is None and quality and quality.check(frame) is not None:
+                    if recorder is not None:
+                        recorder.add_unusable()
                     continue
-                    
+                
                 # Analyze frame
-                frame_result = self.detector.analyze_frame(frame, frame_counter)
+                if frame_result is None:
+                    started = time.perf_counter()
+                    if roi:
+                        # Detect only inside the learned candidate region
+                        image, offset = roi.crop(frame, buffers)
+                        frame_result = self.detector.analyze_frame(image, frame_counter, buffers)
+                        roi.update(frame_result, frame.shape, offset)
+                    else:
+                        frame_result = self.detector.analyze_frame(frame, frame_counter, buffers)
+                    detector_seconds += time.perf_counter() - started
+                    detected_frames += 1
+                    # Object detection only where a cheap trigger fired
+                    if escalation and escalation.evaluate(frame, frame_result):
+                        started = time.perf_counter()
+                        frame_result['objects'] = self.detector.detect_objects(frame)
+                        escalation.record(frame_result['objects'], time.perf_counter() - started)
+                    if deduplicator:
+                        deduplicator.update(frame_result)
                 if frame_result:
-                    for k, v in frame_result.items():
-                        if k != 'frame_number':
-                            results[k] += v
+                    for k in AGGREGATED_KEYS:
+                        results[k] += frame_result.get(k, 0)
+                    if escalation:
+                        results['object_frames'] += bool(frame_result.get('objects'))
                     processed_frames += 1
+                    if recorder is not None:
+                        recorder.add(frame_result)
+                    if identity:
+                        identity.update(frame_result)
                     
                     # Early termination if cheating detected
                     if self.config['early_termination'] and results.get('multiple_faces', False):
                         break
-                        
-            cap.release()
+                    
+                    if (checkpoints is not None
+                            and processed_frames % self.config['checkpoint_interval'] == 0):
+                        if recorder is not None:
+                            # Descriptors only grow; write the new ones, not all of them
+                            frames_since, descriptors_since = recorder.descriptors_since(descriptors_saved)
+                            if len(frames_since):
+                                checkpoints.append_rows(video_id, 'descriptor_frames',
+                                                        frames_since, descriptors_saved)
+                                descriptors_saved = checkpoints.append_rows(
+                                    video_id, 'descriptors', descriptors_since, descriptors_saved)
+                        checkpoints.save(video_id, upload_path, {
+                            'config': self._checkpoint_config(),
+                            'frame_counter': frame_counter,
+                            'processed_frames': processed_frames,
+                            'results': dict(results),
+                            'recorder': (recorder.get_state(include_descriptors=False)
+                                         if recorder is not None else None),
+                            'deduplicator': deduplicator.get_state() if deduplicator else None,
+                            'roi': roi.get_state() if roi else None,
+                            'identity': identity.get_state() if identity else None,
+                            'escalation': escalation.get_state() if escalation else None,
+                            'quality': quality.get_state() if quality else None,
+                            'detector_seconds': detector_seconds,
+                            'detected_frames': detected_frames
+                        })
+            
+            if cap is not None:
+                cap.release()
+            if source is not None:
+                frames.close()
+                total_frames = progress['frames']
+                video_id = source.video_id or video_id
             
             # Compile final results
             results['total_frames'] = total_frames
             results['processed_frames'] = processed_frames
+            if deduplicator:
+                results.update(deduplicator.get_stats())
+            if roi:
+                results.update(roi.get_stats())
+            if identity:
+                results.update(identity.get_stats())
+            if escalation:
+                results.update(escalation.get_stats())
+            if quality:
+                results.update(quality.get_stats(
+                    detector_seconds / detected_frames if detected_frames else 0.0))
+            
+            if index is not None:
+                results['sampling'] = 'timestamp'
+                results['seeks'] = progress.get('seeks', 0)
+            if resume_from:
+                results['resumed_from_frame'] = resume_from
+            if video_path != upload_path:
+                results['decoded_from'] = 'proxy'
+            
+            if recorder is not None:
+                self.feature_store.save(video_id, recorder, total_frames)
+            if checkpoints is not None:
+                checkpoints.delete(video_id)
             
             return self.detector.compile_results(results)
             
-        except VideoValidationError:
+        except (VideoValidationError, UploadStalledError):
             raise
         except Exception as e:
             logger.error(f"Video processing failed: {str(e)}")
             raise VideoProcessingError(video_path, frame_counter, str(e))
 
-    def _validate_video(self, video_path: str) -> None:
+    def _iter_keyframes(self, cap: cv2.VideoCapture, start_frame: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Decode a capture and yield every Nth frame.
+        
+        Skipped frames are only grabbed, not converted to BGR. Keyframes are
+        retrieved into the same array each time, so a yielded frame is only
+        valid until the next one is requested.
+        
+        Args:
+            cap: Opened video capture
+            start_frame: Number of frames already consumed from the capture
+            
+        Yields:
+            Tuple: (frame_number, frame)
+        """
+        frame_counter = start_frame
+        frame = None
+        while cap.grab():
+            frame_counter += 1
+            
+            # Only process keyframes
+            if frame_counter % self.config['keyframe_interval'] == 0:
+                ret, frame = cap.retrieve(frame)
+                if not ret:
+                    break
+                yield frame_counter, frame
+
+    def _iter_growing_keyframes(self, video_path: str, source, progress: Dict) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield keyframes of a file that is still being uploaded.
+        
+        Each pass reopens the file, seeks past the frames consumed so far
+        by their presentation time (see _seek_time), so every frame is
+        decoded about once over the whole upload, and decodes until the
+        data runs out, then waits for the upload to
+        grow by growing_min_bytes. The last frame of a pass may be cut
+        short, so a keyframe is only yielded once a later frame decoded
+        or the upload is complete. If no chunk arrives for
+        growing_stall_seconds the analysis gives up, so a stalled client
+        does not hold a worker; it is restarted when data flows again.
+        
+        Args:
+            video_path: Partial file
+            source: UploadSession writing the file
+            progress: Receives the number of frames decoded under 'frames'
+            
+        Yields:
+            Tuple: (frame_number, frame)
+            
+        Raises:
+            VideoValidationError: If the complete file cannot be opened
+            VideoProcessingError: If the upload is aborted
+            UploadStalledError: If the upload stopped receiving data
+        """
+        interval = self.config['keyframe_interval']
+        consumed = 0
+        consumed_msec = None
+        frame = None
+        while True:
+            if source.is_aborted():
+                raise VideoProcessingError(video_path, consumed, "Upload aborted")
+            complete = source.is_complete()
+            size = source.offset
+            
+            cap = cv2.VideoCapture(video_path)
+            try:
+                if cap.isOpened():
+                    position = self._seek_time(cap, consumed, consumed_msec)
+                    pending = None
+                    msec = consumed_msec
+                    while cap.grab():
+                        position += 1
+                        previous_msec, msec = msec, cap.get(cv2.CAP_PROP_POS_MSEC)
+                        if pending is not None:
+                            yield pending
+                            pending = None
+                        if position - 1 > consumed:
+                            consumed, consumed_msec = position - 1, previous_msec
+                        if position % interval == 0:
+                            ret, frame = cap.retrieve(frame)
+                            if not ret:
+                                break
+                            pending = (position, frame)
+                    if complete:
+                        if pending is not None:
+                            yield pending
+                        consumed = max(consumed, position)
+                        consumed_msec = msec
+                elif complete:
+                    raise VideoValidationError(video_path, "Could not open video file")
+            finally:
+                cap.release()
+            
+            if complete:
+                if consumed == 0:
+                    raise VideoValidationError(video_path, "Video has no frames")
+                progress['frames'] = consumed
+                return
+            # Each pass costs a reopen and a seek, so only decode again once
+            # the upload grew by growing_min_bytes or ended
+            while not (source.is_complete() or source.is_aborted()
+                       or source.offset >= size + self.config['growing_min_bytes']):
+                source.wait_for_data(size, self.config['growing_min_bytes'],
+                                     self.config['growing_poll_interval'])
+                idle = source.idle_seconds()
+                if idle > self.config['growing_stall_seconds'] and not source.is_complete():
+                    raise UploadStalledError(video_path, consumed, idle)
+
+    def _get_timed_index(self, video_path: str, reported_frames: int):
+        """
+        Return the video index if this file should be sampled by timestamp.
+        
+        In 'auto' mode that is the case when the reported frame count is
+        missing or wrong, or the frame rate is variable, so frame-number
+        sampling would not be evenly spaced in time.
+        """
+        mode = self.config['timed_sampling']
+        if self.video_index is None or mode == 'never':
+            return None
+        if mode == 'auto' and reported_frames > 0 and not self.video_index.probe_available:
+            # Indexing would cost a full decoding pass; trust the container
+            return None
+        index = self.video_index.get(video_path)
+        if index.frame_count == 0:
+            return None
+        if mode == 'always':
+            return index
+        if (abs(reported_frames - index.frame_count) > max(1, 0.01 * index.frame_count)
+                or index.is_variable_frame_rate()):
+            logger.info(f"Sampling {Path(video_path).stem} by timestamp "
+                        f"(reported {reported_frames} frames, indexed {index.frame_count})")
+            return index
+        return None
+
+    def _iter_timed_keyframes(self, cap: cv2.VideoCapture, index, resume_from: int,
+                              progress: Dict) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield frames at evenly spaced presentation times.
+        
+        Samples are sample_interval_seconds apart, by default the time
+        keyframe_interval frames take at the average frame rate. Short
+        gaps are decoded forward with grab(); when a known keyframe lies
+        between the decoder position and the next sample, the capture
+        seeks to it instead, so whole GOPs are never decoded just to be
+        skipped. After a seek the position is resynchronized from the
+        timestamp of the frame actually reached.
+        
+        Args:
+            cap: Capture opened at the first frame
+            index: VideoIndex of the file
+            resume_from: Frame number already analyzed up to
+            progress: Receives the number of seeks under 'seeks'
+            
+        Yields:
+            Tuple: (frame_number, frame), frame numbers counting from 1
+        """
+        step = (self.config['sample_interval_seconds']
+                or self.config['keyframe_interval'] / index.average_fps)
+        position = 0
+        last = -1
+        frame = None
+        progress['seeks'] = 0
+        sample_time = index.start_time + step
+        while sample_time <= index.end_time + 1e-6:
+            target = index.frame_at(sample_time)
+            sample_time += step
+            if target <= last or target + 1 <= resume_from:
+                continue
+            
+            keyframe = index.keyframe_before(target)
+            if keyframe is not None and keyframe > position:
+                cap.set(cv2.CAP_PROP_POS_MSEC, index.timestamps[keyframe] * 1000.0)
+                progress['seeks'] += 1
+                if not cap.grab():
+                    return
+                position = index.nearest_frame(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0) + 1
+            
+            while position <= target:
+                if not cap.grab():
+                    return
+                position += 1
+            
+            ret, frame = cap.retrieve(frame)
+            if not ret:
+                return
+            last = position - 1
+            yield position, frame
+
+    def _seek(self, cap: cv2.VideoCapture, frame_counter: int) -> int:
+        """
+        Position a capture right after frame number frame_counter.
+        
+        Seeking is not frame-accurate for every container, so when the
+        reported position is off the capture is rewound and the frames
+        are grabbed without converting them to BGR.
+        
+        Args:
+            cap: Capture opened at the first frame
+            frame_counter: Frames to skip
+            
+        Returns:
+            Number of frames skipped
+        """
+        if frame_counter <= 0:
+            return 0
+        if cap.set(cv2.CAP_PROP_POS_FRAMES, frame_counter) \
+                and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_counter:
+            return frame_counter
+        
+        logger.debug(f"Inexact seek to frame {frame_counter}, skipping frames instead")
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        skipped = 0
+        while skipped < frame_counter and cap.grab():
+            skipped += 1
+        return skipped
+
+    def _seek_time(self, cap: cv2.VideoCapture, frame_counter: int, msec: Optional[float]) -> int:
+        """
+        Position a capture right after frame number frame_counter, shown at msec.
+        
+        Seeks by time to shortly before the frame and grabs forward to the
+        frame with that presentation time, which costs a few frames even
+        where frame-number seeks are inexact (VFR WebM, files without an
+        index). Falls back to _seek when the frame is not found.
+        
+        Args:
+            cap: Capture opened at the first frame
+            frame_counter: Frames to skip
+            msec: Presentation time of frame number frame_counter
+            
+        Returns:
+            Number of frames skipped
+        """
+        if frame_counter <= 0 or msec is None:
+            return self._seek(cap, frame_counter)
+        for backoff in GROWING_SEEK_BACKOFF_MSEC:
+            if not cap.set(cv2.CAP_PROP_POS_MSEC, max(0.0, msec - backoff)):
+                break
+            while cap.grab():
+                position_msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+                if abs(position_msec - msec) < 0.5:
+                    return frame_counter
+                if position_msec > msec:
+                    break
+        logger.debug(f"Frame {frame_counter} not found at {msec:.0f} ms, seeking by frame number")
+        return self._seek(cap, frame_counter)
+
+    def _checkpoint_config(self) -> Dict:
+        """Settings a checkpoint must match to be resumed."""
+        return {
+            'keyframe_interval': self.config['keyframe_interval'],
+            'dedup_similarity_threshold': self.config['dedup_similarity_threshold'],
+            'roi_enabled': self.config['roi_enabled'],
+            'quality_gate': ([self.config[k] for k in (
+                'quality_min_sharpness', 'quality_min_brightness',
+                'quality_max_brightness', 'quality_max_clipped_fraction')]
+                if self.config['quality_gate_enabled'] else None),
+            'identity_check': getattr(self.detector, 'face_encoder', None) is not None,
+            'object_triggers': (list(self.config['object_triggers'])
+                                if getattr(self.detector, 'object_detector', None) is not None else None),
+            'lookaway_method': getattr(self.detector, 'lookaway_method', None),
+            'landmark_model': getattr(getattr(self.detector, 'landmark_scheme', None), 'name', None),
+            'thresholds': getattr(self.detector, 'thresholds', None)
+        }
+
+    def _load_checkpoint(self, video_id: str, video_path: str) -> Optional[Dict]:
+        if self.checkpoint_store is None:
+            return None
+        state = self.checkpoint_store.load(video_id, video_path)
+        if state is not None and state.get('config') != self._checkpoint_config():
+            logger.info(f"Checkpoint for {video_id} was made with other settings, starting over")
+            self.checkpoint_store.delete(video_id)
+            return None
+        recorder_state = state.get('recorder') if state is not None else None
+        if recorder_state and recorder_state.get('descriptor_count'):
+            count = recorder_state['descriptor_count']
+            frames = self.checkpoint_store.load_rows(video_id, 'descriptor_frames', np.int32, count)
+            descriptors = self.checkpoint_store.load_rows(
+                video_id, 'descriptors', np.float32, count, recorder_state['descriptor_width'])
+            if frames is None or descriptors is None:
+                logger.warning(f"Checkpoint descriptors of {video_id} are incomplete, starting over")
+                self.checkpoint_store.delete(video_id)
+                return None
+            recorder_state['descriptor_frames'] = frames.tolist()
+            recorder_state['descriptors'] = descriptors.tolist()
+        return state
+
+    def _validate_video(self, video_path: str) -> int:
         """
         Validate video file can be processed.
         
+        Containers written by browsers often report no frame count, so a
+        zero count only fails validation if no frame can be decoded.
+        
         Args:
             video_path: Path to video file
             
+        Returns:
+            Frame count reported by the container (0 if unknown)
+            
         Raises:
             VideoValidationError: If video is invalid
         """
@@ -100,8 +617,10 @@ class VideoProcessor:
         if not cap.isOpened():
             raise VideoValidationError(video_path, "Could not open video file")
             
-        if int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 0:
+        frame_count = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        if frame_count == 0 and not cap.grab():
             cap.release()
             raise VideoValidationError(video_path, "Video has no frames")
             
-        cap.release()
\ No newline at end of file
+        cap.release()
+        return frame_count
@@ -1,60 +1,318 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import logging
 from datetime import datetime
 import os
+import threading
 from typing import Tuple, Dict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import cv2
 import dlib
+import numpy as np
 
 # Corrected imports without 'backend' prefix
 from core.detection import CheatingDetector
 from core.video_processor import VideoProcessor
+from core.gaze import GazeEstimator
+from core.objects import ObjectDetector
+from core.landmarks import get_landmark_scheme
+from core.audio_analyzer import AudioAnalyzer, collect_audio_results, merge_audio_results
 from services.file_service import FileService
+from services.logging_service import LoggingService
+from services.log_index import LogIndex
+from services.keyframe_cache import KeyframeCache
+from services.feature_store import FeatureStore
+from services.face_gallery import FaceGallery
+from services.checkpoint_store import CheckpointStore
+from services.video_index import VideoIndexService
+from services.proxy_service import ProxyService
+from services.upload_session_service import UploadSessionService, UploadOffsetError
+from services.rescoring_service import RescoringService
+from services.job_scheduler import JobScheduler
+from services.live_session_service import LiveSessionScheduler
+from services.job_queue import create_job_broker
+from utils.video_utils import generate_video_thumbnail, calculate_video_metrics
 from config import Config
 from core.exceptions import (
     ModelLoadingError,
     VideoValidationError,
     VideoProcessingError,
-    FileSystemError
+    UploadStalledError,
+    FileSystemError,
+    AnalysisServiceError,
+    AdmissionError
 )
 from chatbot.core.chatbot import Chatbot
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'logs/cheating_detection_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+def create_logging_service(config: Config, log_name: str = 'cheating_detection') -> LoggingService:
+    """
+    Send log records to the console and a new file in LOG_FOLDER.
+
+    Called by the API and worker entry points rather than at import, so
+    importing this module creates no log files and starts no threads.
+
+    Args:
+        config: Application configuration
+        log_name: Prefix of the log file name
+
+    Returns:
+        Configured logging service
+    """
+    return LoggingService({
+        'log_dir': str(config.LOG_FOLDER),
+        'log_file': f'{log_name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log',
+        'async_log': config.LOG_ASYNC,
+        'rate_limit_per_second': config.LOG_RATE_LIMIT_PER_SECOND
+    })
+
+def create_analysis_pipeline(config: Config) -> Dict:
+    """
+    Load the models and build the video analysis components.
+
+    Shared by the API process and standalone workers, so both analyze
+    videos with the same models and settings.
+
+    Args:
+        config: Application configuration
+
+    Returns:
+        Dictionary with the cheating detector, video processor and the
+        services they use
+    """
+    # Initialize ML models
+    face_cascade = cv2.CascadeClassifier(config.FACE_CASCADE_PATH)
+    detector = dlib.get_frontal_face_detector()
+    predictor = dlib.shape_predictor(config.LANDMARK_PREDICTOR_PATH)
+    face_encoder = None
+    if config.IDENTITY_CHECK_ENABLED:
+        if os.path.exists(config.FACE_RECOGNITION_MODEL_PATH):
+            face_encoder = dlib.face_recognition_model_v1(config.FACE_RECOGNITION_MODEL_PATH)
+        else:
+            logger.warning(f"Face recognition model not found at {config.FACE_RECOGNITION_MODEL_PATH}, "
+                           "identity checks disabled")
+    object_detector = None
+    if config.OBJECT_DETECTION_ENABLED:
+        if all(os.path.exists(p) for p in (config.OBJECT_MODEL_PATH, config.OBJECT_MODEL_CONFIG_PATH,
+                                           config.OBJECT_LABELS_PATH)):
+            with open(config.OBJECT_LABELS_PATH) as f:
+                labels = [line.strip() for line in f]
+            object_detector = ObjectDetector(
+                config.OBJECT_MODEL_PATH, config.OBJECT_MODEL_CONFIG_PATH, labels,
+                target_classes=config.OBJECT_CLASSES,
+                confidence=config.OBJECT_CONFIDENCE,
+                input_size=config.OBJECT_INPUT_SIZE
+            )
+        else:
+            logger.warning(f"Object detection model not found at {config.OBJECT_MODEL_PATH}, "
+                           "phone and screen detection disabled")
+    
+    # Create core components
+    cheating_detector = CheatingDetector(
+        face_cascade, detector, predictor,
+        thresholds={
+            'gaze_offset_threshold': config.GAZE_OFFSET_THRESHOLD,
+            'lookaway_nose_symmetry': config.NOSE_SYMMETRY_THRESHOLD,
+            'identity_distance_threshold': config.IDENTITY_DISTANCE_THRESHOLD,
+            'max_unusable_frame_ratio': config.MAX_UNUSABLE_FRAME_RATIO,
+            'min_object_frames': config.MIN_OBJECT_FRAMES
+        },
+        gaze_estimator=GazeEstimator(),
+        lookaway_method=config.LOOKAWAY_METHOD,
+        landmark_scheme=get_landmark_scheme(config.LANDMARK_MODEL),
+        face_encoder=face_encoder,
+        object_detector=object_detector
+    )
+    keyframe_cache = None
+    if config.KEYFRAME_CACHE_ENABLED:
+        keyframe_cache = KeyframeCache(
+            str(config.CACHE_FOLDER / "keyframes"),
+            max_bytes=config.KEYFRAME_CACHE_MAX_BYTES,
+            max_dimension=config.KEYFRAME_CACHE_MAX_DIMENSION
+        )
+    feature_store = FeatureStore(str(config.FEATURE_FOLDER))
+    file_service = FileService(config.UPLOAD_FOLDER, max_bytes=config.UPLOAD_QUOTA_BYTES)
+    proxy_service = None
+    if config.PROXY_TRANSCODE_ENABLED:
+        proxy_service = ProxyService(
+            file_service,
+            ffmpeg_path=config.FFMPEG_PATH,
+            max_dimension=config.PROXY_MAX_DIMENSION,
+            gop=config.KEYFRAME_INTERVAL,
+            crf=config.PROXY_CRF,
+            workers=config.PROXY_WORKERS,
+            timeout=config.PROXY_TIMEOUT_SECONDS
+        )
+    video_processor = VideoProcessor(cheating_detector, {
+        'keyframe_interval': config.KEYFRAME_INTERVAL,
+        'min_face_detection_rate': config.FACE_DETECTION_THRESHOLD,
+        'lookaway_ratio_threshold': config.LOOKAWAY_THRESHOLD,
+        'dedup_similarity_threshold': config.DEDUP_SIMILARITY_THRESHOLD,
+        'quality_gate_enabled': config.QUALITY_GATE_ENABLED,
+        'quality_min_sharpness': config.QUALITY_MIN_SHARPNESS,
+        'quality_min_brightness': config.QUALITY_MIN_BRIGHTNESS,
+        'quality_max_brightness': config.QUALITY_MAX_BRIGHTNESS,
+        'quality_max_clipped_fraction': config.QUALITY_MAX_CLIPPED_FRACTION,
+        'roi_enabled': config.ROI_CROPPING_ENABLED,
+        'roi_warmup_frames': config.ROI_WARMUP_FRAMES,
+        'roi_margin': config.ROI_MARGIN,
+        'roi_revalidate_interval': config.ROI_REVALIDATE_INTERVAL,
+        'checkpoint_interval': config.CHECKPOINT_INTERVAL,
+        'object_triggers': config.OBJECT_TRIGGERS,
+        'object_motion_factor': config.OBJECT_MOTION_FACTOR,
+        'object_skin_fraction': config.OBJECT_HAND_SKIN_FRACTION,
+        'object_periodic_interval': config.OBJECT_PERIODIC_INTERVAL,
+        'identity_reference_frames': config.IDENTITY_REFERENCE_FRAMES,
+        'identity_min_change_frames': config.IDENTITY_MIN_CHANGE_FRAMES,
+        'timed_sampling': config.TIMED_SAMPLING,
+        'growing_stall_seconds': config.UPLOAD_STALL_SECONDS
+    }, keyframe_cache=keyframe_cache, feature_store=feature_store,
+        checkpoint_store=CheckpointStore(str(config.CHECKPOINT_FOLDER)),
+        video_index=VideoIndexService(str(config.CACHE_FOLDER / "index"), config.FFPROBE_PATH),
+        proxy_service=proxy_service)
+    return {
+        'cheating_detector': cheating_detector,
+        'video_processor': video_processor,
+        'keyframe_cache': keyframe_cache,
+        'feature_store': feature_store,
+        'file_service': file_service,
+        'proxy_service': proxy_service
+    }
+
+def create_broker(config: Config):
+    """Open the job queue shared with standalone workers."""
+    return create_job_broker(
+        config.JOB_BROKER,
+        db_path=config.JOB_QUEUE_PATH,
+        max_attempts=config.JOB_MAX_ATTEMPTS,
+        retry_delay=config.JOB_RETRY_DELAY_SECONDS,
+        aging_rate=config.SCHEDULER_AGING_RATE,
+        priority_seconds=config.SCHEDULER_PRIORITY_SECONDS
+    )
+
 def create_app(config: Config) -> Flask:
+    logging_service = create_logging_service(config)
     app = Flask(__name__)
     CORS(app)
     chatbot = Chatbot()
     
     try:
-        # Initialize ML models
-        face_cascade = cv2.CascadeClassifier(config.FACE_CASCADE_PATH)
-        detector = dlib.get_frontal_face_detector()
-        predictor = dlib.shape_predictor(config.LANDMARK_PREDICTOR_PATH)
-        
-        # Create core components
-        cheating_detector = CheatingDetector(face_cascade, detector, predictor)
-        video_processor = VideoProcessor(cheating_detector, {
-            'keyframe_interval': config.KEYFRAME_INTERVAL,
-            'min_face_detection_rate': config.FACE_DETECTION_THRESHOLD,
-            'lookaway_ratio_threshold': config.LOOKAWAY_THRESHOLD
-        })
-        file_service = FileService(config.UPLOAD_FOLDER)
+        pipeline = create_analysis_pipeline(config)
+        cheating_detector = pipeline['cheating_detector']
+        video_processor = pipeline['video_processor']
+        keyframe_cache = pipeline['keyframe_cache']
+        feature_store = pipeline['feature_store']
+        file_service = pipeline['file_service']
+        proxy_service = pipeline['proxy_service']
+        rescoring_service = RescoringService(cheating_detector, feature_store,
+                                             config.IDENTITY_REFERENCE_FRAMES,
+                                             config.IDENTITY_MIN_CHANGE_FRAMES)
+        face_gallery = FaceGallery(str(config.GALLERY_FOLDER), config.IDENTITY_DISTANCE_THRESHOLD)
+        log_index = LogIndex([str(config.LOG_FOLDER), str(config.PACKAGE_ROOT)])
+        audio_analyzer = None
+        audio_executor = None
+        if config.AUDIO_ANALYSIS_ENABLED:
+            audio_analyzer = AudioAnalyzer(
+                ffmpeg_path=config.FFMPEG_PATH,
+                speech_ratio_threshold=config.AUDIO_SPEECH_RATIO_THRESHOLD
+            )
+            audio_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audio")
+        upload_sessions = UploadSessionService(
+            file_service, max_idle_seconds=config.UPLOAD_SESSION_MAX_IDLE_SECONDS,
+            expiry_interval=config.UPLOAD_SESSION_EXPIRY_INTERVAL)
+        scheduler = JobScheduler(
+            cpu_budget=config.SCHEDULER_CPU_BUDGET,
+            max_backlog_cost=config.SCHEDULER_MAX_BACKLOG_COST,
+            keyframe_interval=config.KEYFRAME_INTERVAL,
+            aging_rate=config.SCHEDULER_AGING_RATE,
+            priority_seconds=config.SCHEDULER_PRIORITY_SECONDS
+        )
+        # Chunked uploads analyzed while they arrive mostly wait for bytes,
+        # so they get their own few slots instead of the scheduler's CPU budget
+        upload_tail_slots = threading.BoundedSemaphore(config.UPLOAD_TAIL_WORKERS)
+        upload_tail_executor = ThreadPoolExecutor(
+            max_workers=config.UPLOAD_TAIL_WORKERS, thread_name_prefix="upload_analysis")
+        # Uploads go to standalone workers when the job queue is enabled
+        job_broker = None
+        if config.JOB_QUEUE_ENABLED:
+            job_broker = create_broker(config)
+            file_service.add_pin_source(job_broker.active_video_paths)
+        live_sessions = LiveSessionScheduler(
+            cheating_detector,
+            workers=config.LIVE_WORKERS,
+            target_fps=config.LIVE_TARGET_FPS,
+            min_fps=config.LIVE_MIN_FPS,
+            max_idle_seconds=config.LIVE_SESSION_MAX_IDLE_SECONDS
+        )
         
     except Exception as e:
         logger.critical(f"Failed to initialize services: {str(e)}")
         raise ModelLoadingError("Initialization failed", str(e))
 
+    analysis_lock = threading.Lock()
+
+    def stalled(analysis) -> bool:
+        return (analysis.done() and not analysis.cancelled()
+                and isinstance(analysis.exception(), UploadStalledError))
+
+    def start_analysis(session) -> None:
+        with analysis_lock:
+            if session is None:
+                return
+            # An analysis that gave up on a stalled upload restarts when data flows again
+            if session.analysis is not None and not stalled(session.analysis):
+                return
+            if session.is_complete():
+                # Scheduled like any upload, at the cost of the whole file
+                session.analysis = scheduler.submit(
+                    video_processor.process_video, session.path, source=session,
+                    cost=scheduler.estimate_cost(calculate_video_metrics(session.path), session.offset),
+                    priority=session.priority, name=session.session_id)
+            elif upload_tail_slots.acquire(blocking=False):
+                session.analysis = upload_tail_executor.submit(
+                    video_processor.process_video, session.path, source=session)
+                session.analysis.add_done_callback(lambda _: upload_tail_slots.release())
+            # Otherwise the upload is analyzed once complete
+
+    def parse_priority(value) -> int:
+        # Clients pick among the configured levels; anything else is rejected
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        if (not isinstance(value, int) or isinstance(value, bool)
+                or not 0 <= value <= config.SCHEDULER_MAX_PRIORITY):
+            raise ValueError(f"Priority must be an integer from 0 to {config.SCHEDULER_MAX_PRIORITY}")
+        return value
+
+    def enqueue_job(video_path: str, cost: float, priority: int):
+        stats = job_broker.get_stats()
+        backlog = stats['queued_cost']
+        if backlog > 0 and backlog + cost > config.SCHEDULER_MAX_BACKLOG_COST:
+            excess = backlog + cost - config.SCHEDULER_MAX_BACKLOG_COST
+            raise AdmissionError(cost, backlog, max(
+                1.0, excess * scheduler.seconds_per_cost / max(1, stats['busy_workers'])))
+        job_id = job_broker.enqueue(video_path, priority, cost)
+        if proxy_service is not None:
+            proxy_service.submit(video_path)
+        return jsonify({
+            "job_id": job_id,
+            "state": "queued",
+            "video_path": video_path,
+            "status_url": f"/api/jobs/{job_id}"
+        }), 202
+
+    def discard_upload(session_id: str) -> None:
+        # Remove the partial file and session of an upload whose analysis failed
+        try:
+            upload_sessions.abort(session_id)
+        except KeyError:
+            pass
+
+    def deferred(error: AdmissionError):
+        response = jsonify(error.to_dict())
+        response.headers["Retry-After"] = str(error.to_dict()["retry_after"])
+        return response, 429
+
     @app.route("/")
     def home() -> str:
         return "AI Cheating Detection API"
@@ -66,6 +324,10 @@ def create_app(config: Config) -> Flask:
              return jsonify({"error": "Message required"}), 400
      return jsonify(chatbot.get_response(data['message']))
 
+    @app.route('/api/chat/stats', methods=['GET'])
+    def chat_stats():
+        return jsonify(chatbot.get_stats())
+
     @app.route("/upload", methods=["POST"])
     def upload_video() -> Tuple[Dict, int]:
         if "video" not in request.files:
@@ -74,10 +336,44 @@ def create_app(config: Config) -> Flask:
         video_file = request.files["video"]
         if video_file.filename == "":
             return jsonify({"error": "Empty filename"}), 400
+        try:
+            priority = parse_priority(request.form.get("priority", 0))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if job_broker is not None and request.form.get("student_id"):
+            # Queued uploads return before analysis, so there is nothing to match yet
+            return jsonify({"error": "student_id is not supported while uploads are queued; "
+                                     "match with /api/videos/<video_id>/identity once the job is done"}), 400
 
+        video_path = None
         try:
-            video_path = file_service.save_uploaded_file(video_file)
-            cheating_detected, details = video_processor.process_video(video_path)
+            # Pinned against quota eviction until the analysis is done
+            video_path = file_service.save_uploaded_file(video_file, pin=True)
+            cost = scheduler.estimate_cost(calculate_video_metrics(video_path),
+                                           os.path.getsize(video_path))
+            if job_broker is not None:
+                return enqueue_job(video_path, cost, priority)
+            analysis = scheduler.submit(
+                video_processor.process_video, video_path, cost=cost,
+                priority=priority, name=file_service.get_file_id(video_path))
+            if proxy_service is not None:
+                proxy_service.submit(video_path)
+            
+            # Audio runs on its own worker while the video is analyzed
+            audio_future = None
+            if audio_executor is not None:
+                audio_future = audio_executor.submit(audio_analyzer.analyze, video_path)
+                
+            cheating_detected, details = analysis.result()
+            cheating_detected, details = merge_audio_results(
+                cheating_detected, details, collect_audio_results(audio_future),
+                config.AUDIO_AFFECTS_VERDICT)
+            
+            # Check the recorded faces against the enrolled student, if given
+            student_id = request.form.get("student_id")
+            cached = feature_store.load_descriptors(file_service.get_file_id(video_path))
+            if student_id and cached is not None:
+                details["identity_match"] = face_gallery.match_video(cached[1], student_id=student_id)
             
             return jsonify({
                 "cheating_detected": cheating_detected,
@@ -86,15 +382,283 @@ def create_app(config: Config) -> Flask:
                 "timestamp": datetime.now().isoformat()
             })
             
+        except AdmissionError as e:
+            return deferred(e)
         except VideoValidationError as e:
             return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": "Internal server error"}), 500
+        finally:
+            if video_path is not None:
+                file_service.unpin(video_path)
+
+    @app.route("/api/uploads", methods=["POST"])
+    def create_upload() -> Tuple[Dict, int]:
+        data = request.get_json(silent=True) or {}
+        if not data.get("filename"):
+            return jsonify({"error": "Filename required"}), 400
+        try:
+            priority = parse_priority(data.get("priority", 0))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            session = upload_sessions.create(data["filename"], data.get("size"), priority)
+        except FileSystemError as e:
+            return jsonify(e.to_dict()), 400
+        start_analysis(session)
+        return jsonify(session.to_dict()), 201
+
+    @app.route("/api/uploads/<session_id>", methods=["GET"])
+    def upload_status(session_id: str) -> Tuple[Dict, int]:
+        session = upload_sessions.get(session_id)
+        if session is None:
+            return jsonify({"error": "Upload not found"}), 404
+        return jsonify(session.to_dict())
+
+    @app.route("/api/uploads/<session_id>", methods=["PATCH"])
+    def append_upload(session_id: str) -> Tuple[Dict, int]:
+        offset = request.headers.get("Upload-Offset", type=int)
+        if offset is None:
+            return jsonify({"error": "Upload-Offset header required"}), 400
+
+        try:
+            new_offset = upload_sessions.append(session_id, offset, request.stream)
+        except KeyError:
+            return jsonify({"error": "Upload not found"}), 404
+        except UploadOffsetError as e:
+            return jsonify({"error": str(e), "offset": e.expected}), 409
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 409
+        except FileSystemError as e:
+            return jsonify(e.to_dict()), 500
+        # A session restored after a restart has no running analysis yet
+        start_analysis(upload_sessions.get(session_id))
+        return jsonify({"session_id": session_id, "offset": new_offset})
+
+    @app.route("/api/uploads/<session_id>/complete", methods=["POST"])
+    def complete_upload(session_id: str) -> Tuple[Dict, int]:
+        try:
+            session = upload_sessions.complete(session_id)
+        except KeyError:
+            return jsonify({"error": "Upload not found"}), 404
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 409
+
+        try:
+            start_analysis(session)
+            audio_future = None
+            if audio_executor is not None:
+                audio_future = audio_executor.submit(audio_analyzer.analyze, session.path)
+
+            cheating_detected, details = session.analysis.result(
+                timeout=config.UPLOAD_COMPLETE_TIMEOUT_SECONDS)
+            audio_results = collect_audio_results(audio_future)
+            video_path = upload_sessions.finalize(session_id)
+            if proxy_service is not None:
+                proxy_service.submit(video_path)
+            cheating_detected, details = merge_audio_results(
+                cheating_detected, details, audio_results, config.AUDIO_AFFECTS_VERDICT)
+
+            return jsonify({
+                "cheating_detected": cheating_detected,
+                "details": details,
+                "video_path": video_path,
+                "timestamp": datetime.now().isoformat()
+            })
+
+        except AdmissionError as e:
+            return deferred(e)
+        except FutureTimeoutError:
+            # The analysis keeps running; the client asks again later
+            response = jsonify({"session_id": session_id, "complete": True, "analysis": "running"})
+            response.headers["Retry-After"] = "30"
+            return response, 202
+        except VideoValidationError as e:
+            discard_upload(session_id)
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            logger.error(f"Chunked upload analysis failed: {str(e)}")
+            discard_upload(session_id)
+            return jsonify({"error": "Internal server error"}), 500
+
+    @app.route("/api/uploads/<session_id>", methods=["DELETE"])
+    def abort_upload(session_id: str) -> Tuple[Dict, int]:
+        try:
+            upload_sessions.abort(session_id)
+        except KeyError:
+            return jsonify({"error": "Upload not found"}), 404
+        return jsonify({"session_id": session_id, "aborted": True})
+
+    @app.route("/api/scheduler/stats", methods=["GET"])
+    def scheduler_stats():
+        stats = scheduler.get_stats()
+        if job_broker is not None:
+            stats['job_queue'] = job_broker.get_stats()
+        return jsonify(stats)
+
+    @app.route("/api/jobs/<job_id>", methods=["GET"])
+    def job_status(job_id: str) -> Tuple[Dict, int]:
+        job = job_broker.get(job_id) if job_broker is not None else None
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job.to_dict())
+
+    @app.route("/api/live/sessions", methods=["POST"])
+    def open_live_session() -> Tuple[Dict, int]:
+        data = request.get_json(silent=True) or {}
+        target_fps = data.get("target_fps")
+        if target_fps is not None and (not isinstance(target_fps, (int, float)) or target_fps <= 0):
+            return jsonify({"error": "target_fps must be a positive number"}), 400
+
+        try:
+            stats = live_sessions.open(target_fps)
+        except AdmissionError as e:
+            return deferred(e)
+        return jsonify(stats), 201
+
+    @app.route("/api/live/sessions/<session_id>", methods=["GET"])
+    def live_session_status(session_id: str) -> Tuple[Dict, int]:
+        stats = live_sessions.session_stats(session_id)
+        if stats is None:
+            return jsonify({"error": "Session not found"}), 404
+        return jsonify(stats)
+
+    @app.route("/api/live/sessions/<session_id>/frames", methods=["POST"])
+    def live_frame(session_id: str) -> Tuple[Dict, int]:
+        # A JPEG or PNG frame, as a "frame" file or as the request body
+        data = request.files["frame"].read() if "frame" in request.files else request.get_data()
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) if data else None
+        if image is None:
+            return jsonify({"error": "Could not decode frame"}), 400
+
+        try:
+            return jsonify(live_sessions.submit_frame(session_id, image))
+        except KeyError:
+            return jsonify({"error": "Session not found"}), 404
+
+    @app.route("/api/live/sessions/<session_id>", methods=["DELETE"])
+    def close_live_session(session_id: str) -> Tuple[Dict, int]:
+        try:
+            cheating_detected, details = live_sessions.close(session_id)
+        except KeyError:
+            return jsonify({"error": "Session not found"}), 404
+        return jsonify({
+            "cheating_detected": cheating_detected,
+            "details": details,
+            "timestamp": datetime.now().isoformat()
+        })
+
+    @app.route("/api/live/stats", methods=["GET"])
+    def live_stats():
+        return jsonify(live_sessions.get_stats())
+
+    @app.route("/api/rescore", methods=["POST"])
+    def rescore():
+        data = request.get_json(silent=True) or {}
+        thresholds = data.get("thresholds", {})
+        unknown = set(thresholds) - set(cheating_detector.thresholds)
+        if unknown:
+            return jsonify({"error": f"Unknown thresholds: {sorted(unknown)}"}), 400
+
+        try:
+            return jsonify(rescoring_service.rescore(thresholds, data.get("video_ids")))
+        except AnalysisServiceError as e:
+            return jsonify(e.to_dict()), 500
+
+    @app.route("/api/students/<student_id>/faces", methods=["POST"])
+    def enroll_student(student_id: str) -> Tuple[Dict, int]:
+        if cheating_detector.face_encoder is None:
+            return jsonify({"error": "Face recognition model not loaded"}), 503
+        if "image" not in request.files:
+            return jsonify({"error": "No image uploaded"}), 400
+
+        image = cv2.imdecode(np.frombuffer(request.files["image"].read(), np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return jsonify({"error": "Could not decode image"}), 400
+        descriptors = cheating_detector.describe_faces(image)
+        if len(descriptors) != 1:
+            return jsonify({"error": f"Expected one face, found {len(descriptors)}"}), 400
+
+        try:
+            count = face_gallery.enroll(student_id, descriptors)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except FileSystemError as e:
+            return jsonify(e.to_dict()), 500
+        return jsonify({"student_id": student_id, "descriptors": count}), 201
+
+    @app.route("/api/students/<student_id>/faces", methods=["DELETE"])
+    def remove_student(student_id: str) -> Tuple[Dict, int]:
+        try:
+            removed = face_gallery.remove(student_id)
+        except FileSystemError as e:
+            return jsonify(e.to_dict()), 500
+        if not removed:
+            return jsonify({"error": "Student not enrolled"}), 404
+        return jsonify({"student_id": student_id, "removed": removed})
+
+    @app.route("/api/videos/<video_id>/identity", methods=["GET"])
+    def video_identity(video_id: str) -> Tuple[Dict, int]:
+        # Matched from the descriptors stored at analysis time, without decoding
+        cached = feature_store.load_descriptors(video_id) if video_id.isalnum() else None
+        if cached is None:
+            return jsonify({"error": "No face descriptors stored for this video"}), 404
+
+        _, descriptors = cached
+        match = face_gallery.match_video(
+            descriptors,
+            student_id=request.args.get("student_id"),
+            k=min(request.args.get("k", default=3, type=int), 20)
+        )
+        return jsonify({"video_id": video_id, **match})
+
+    @app.route("/api/logs", methods=["GET"])
+    def query_logs():
+        try:
+            start = request.args.get("start")
+            end = request.args.get("end")
+            records = log_index.query(
+                start=datetime.fromisoformat(start) if start else None,
+                end=datetime.fromisoformat(end) if end else None,
+                level=request.args.get("level"),
+                video_id=request.args.get("video_id"),
+                limit=min(request.args.get("limit", default=100, type=int), 1000),
+                tail=request.args.get("tail", default="false").lower() == "true"
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except FileSystemError as e:
+            return jsonify(e.to_dict()), 500
+        return jsonify({"records": records, "index": log_index.get_stats(),
+                        "logging": logging_service.get_stats()})
+
+    @app.route("/api/videos/<video_id>/thumbnail", methods=["GET"])
+    def video_thumbnail(video_id: str):
+        video_path = file_service.find_file(video_id)
+        if video_path is None:
+            return jsonify({"error": "Video not found"}), 404
+        if proxy_service is not None:
+            video_path = proxy_service.resolve(video_path)
+
+        frame_time = request.args.get("t", default=1.0, type=float)
+        thumbnail = generate_video_thumbnail(
+            video_path,
+            frame_time=frame_time,
+            keyframe_cache=keyframe_cache,
+            interval=config.KEYFRAME_INTERVAL
+        )
+        if thumbnail is None:
+            return jsonify({"error": "Could not generate thumbnail"}), 500
+
+        ok, encoded = cv2.imencode(".jpg", cv2.cvtColor(thumbnail, cv2.COLOR_RGB2BGR))
+        if not ok:
+            return jsonify({"error": "Could not encode thumbnail"}), 500
+        return Response(encoded.tobytes(), mimetype="image/jpeg")
 
     return app
 
 if __name__ == "__main__":
     config = Config()
-    os.makedirs("logs", exist_ok=True)
     app = create_app(config)
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -5,10 +5,43 @@ Service layer components for cheating detection system.
 from .analysis_service import AnalysisService
 from .file_service import FileService
 from .logging_service import LoggingService, DEFAULT_LOGGING_CONFIG
+from .keyframe_cache import KeyframeCache, KeyframeSet
+from .feature_store import FeatureStore, FrameFeatureRecorder
+from .face_gallery import FaceGallery
+from .checkpoint_store import CheckpointStore
+from .video_index import VideoIndexService, VideoIndex
+from .proxy_service import ProxyService
+from .upload_session_service import UploadSessionService, UploadSession, UploadOffsetError
+from .rescoring_service import RescoringService
+from .job_scheduler import JobScheduler
+from .live_session_service import LiveSessionScheduler, LiveSession
+from .job_queue import JobBroker, SQLiteJobBroker, QueuedJob, create_job_broker
+from .log_index import LogIndex
 
 __all__ = [
     'AnalysisService',
     'FileService',
     'LoggingService',
-    'DEFAULT_LOGGING_CONFIG'
+    'DEFAULT_LOGGING_CONFIG',
+    'KeyframeCache',
+    'KeyframeSet',
+    'FeatureStore',
+    'FrameFeatureRecorder',
+    'FaceGallery',
+    'CheckpointStore',
+    'VideoIndexService',
+    'VideoIndex',
+    'ProxyService',
+    'UploadSessionService',
+    'UploadSession',
+    'UploadOffsetError',
+    'RescoringService',
+    'JobScheduler',
+    'LiveSessionScheduler',
+    'LiveSession',
+    'JobBroker',
+    'SQLiteJobBroker',
+    'QueuedJob',
+    'create_job_broker',
+    'LogIndex'
 ]
\ No newline at end of file
@@ -0,0 +1,225 @@
+import os
+import json
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks hold within one process only
+    fcntl = None
+
+from core.exceptions import FileSystemError
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_EXT = ".json"
+ROWS_EXT = ".rows"
+CHECKPOINT_VERSION = 2
+
+
+class CheckpointStore:
+    def __init__(self, store_root: str):
+        """
+        Initialize store of in-progress analysis checkpoints.
+
+        One small JSON file per video holds the aggregation state of an
+        unfinished analysis. Files are replaced atomically, so a crash
+        during a save leaves the previous checkpoint intact. State that
+        grows with the video, such as face descriptors, goes to
+        append-only row files instead, with only the row count kept in
+        the checkpoint, so each save writes just the new rows. Analyses
+        hold lock() of their video, so only one writes a checkpoint at a
+        time, also across processes sharing the store.
+
+        Args:
+            store_root: Directory for checkpoint files
+        """
+        self.store_root = Path(store_root)
+        self.store_root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @contextmanager
+    def lock(self, video_id: str) -> Iterator[None]:
+        """
+        Hold the analysis lock of a video, waiting for any other holder.
+
+        Raises:
+            FileSystemError: If the lock file cannot be opened
+        """
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(video_id, threading.Lock())
+        lock_path = self.store_root / f".{video_id}.lock"
+        with thread_lock:
+            try:
+                lock_file = open(lock_path, 'a')
+            except OSError as e:
+                raise FileSystemError(
+                    operation="checkpoint_lock",
+                    path=str(lock_path),
+                    message=str(e),
+                    error_code=5009
+                )
+            try:
+                if fcntl is not None:
+                    # Released when the file is closed
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                yield
+            finally:
+                lock_file.close()
+
+    def save(self, video_id: str, video_path: str, state: Dict) -> None:
+        """
+        Persist the analysis state of a video.
+
+        Args:
+            video_id: Video identifier
+            video_path: Analysed file, fingerprinted so a changed file is
+                not resumed from a stale checkpoint
+            state: JSON-serializable processing state
+
+        Raises:
+            FileSystemError: If the checkpoint cannot be written
+        """
+        path = self._get_path(video_id)
+        tmp_path = self.store_root / f".{video_id}{CHECKPOINT_EXT}.{uuid.uuid4().hex}.tmp"
+        checkpoint = {
+            'version': CHECKPOINT_VERSION,
+            'source': self._fingerprint(video_path),
+            'state': state
+        }
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(checkpoint, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Checkpoint save failed: {str(e)}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise FileSystemError(
+                operation="checkpoint_save",
+                path=str(path),
+                message=str(e),
+                error_code=5009
+            )
+        logger.debug(f"Checkpointed {video_id} at frame {state.get('frame_counter')}")
+
+    def load(self, video_id: str, video_path: str) -> Optional[Dict]:
+        """
+        Load the saved state of a video if it matches the file on disk.
+
+        Args:
+            video_id: Video identifier
+            video_path: File about to be analysed
+
+        Returns:
+            Saved state, or None if there is no usable checkpoint
+        """
+        path = self._get_path(video_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint for {video_id}: {str(e)}")
+            self.delete(video_id)
+            return None
+
+        if (checkpoint.get('version') != CHECKPOINT_VERSION
+                or checkpoint.get('source') != self._fingerprint(video_path)):
+            logger.info(f"Discarding stale checkpoint for {video_id}")
+            self.delete(video_id)
+            return None
+        return checkpoint['state']
+
+    def append_rows(self, video_id: str, name: str, rows: np.ndarray, offset: int) -> int:
+        """
+        Write rows to an append-only row file of a video's checkpoint.
+
+        Rows past offset, left by a crash after the last checkpoint, are
+        overwritten.
+
+        Args:
+            video_id: Video identifier
+            name: Row file name
+            rows: Array of rows, all of one dtype and row width
+            offset: Rows already covered by the last checkpoint
+
+        Returns:
+            Row count to store in the next checkpoint
+
+        Raises:
+            FileSystemError: If the rows cannot be written
+        """
+        path = self._get_rows_path(video_id, name)
+        rows = np.ascontiguousarray(rows)
+        row_bytes = rows.itemsize * (int(np.prod(rows.shape[1:])) if rows.ndim > 1 else 1)
+        try:
+            with open(path, 'r+b' if path.exists() else 'wb') as f:
+                f.seek(offset * row_bytes)
+                f.truncate()
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"Checkpoint rows save failed: {str(e)}")
+            raise FileSystemError(
+                operation="checkpoint_save",
+                path=str(path),
+                message=str(e),
+                error_code=5009
+            )
+        return offset + len(rows)
+
+    def load_rows(self, video_id: str, name: str, dtype, count: int,
+                  width: int = 1) -> Optional[np.ndarray]:
+        """
+        Read the first count rows of a row file written by append_rows.
+
+        Returns:
+            Array of shape (count,) or (count, width), or None if the file
+            holds fewer rows
+        """
+        try:
+            data = np.fromfile(self._get_rows_path(video_id, name), dtype=dtype, count=count * width)
+        except (OSError, ValueError):
+            return None
+        if len(data) < count * width:
+            return None
+        return data.reshape(count, width) if width > 1 else data
+
+    def delete(self, video_id: str) -> None:
+        """Remove the checkpoint of a video and its row files, if any."""
+        try:
+            self._get_path(video_id).unlink()
+        except FileNotFoundError:
+            pass
+        for path in self.store_root.glob(f"{video_id}.*{ROWS_EXT}"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def list_videos(self) -> List[str]:
+        """Return IDs of all videos with an unfinished analysis."""
+        return sorted(p.stem for p in self.store_root.glob(f"*{CHECKPOINT_EXT}"))
+
+    def _get_path(self, video_id: str) -> Path:
+        return self.store_root / f"{video_id}{CHECKPOINT_EXT}"
+
+    def _get_rows_path(self, video_id: str, name: str) -> Path:
+        return self.store_root / f"{video_id}.{name}{ROWS_EXT}"
+
+    @staticmethod
+    def _fingerprint(video_path: str) -> Dict:
+        stat = os.stat(video_path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
@@ -0,0 +1,241 @@
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.exceptions import FileSystemError
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTOR_SIZE = 128
+VECTORS_FILE = "descriptors.f32"
+IDS_FILE = "students.txt"
+
+
+class FaceGallery:
+    def __init__(self, gallery_root: str, match_threshold: float = 0.6):
+        """
+        Initialize on-disk gallery of enrolled student face descriptors.
+
+        Descriptors are appended as raw float32 rows to one file that is
+        read back with np.memmap, and student IDs are appended one per line
+        to a parallel text file. A nearest-neighbour query is one matrix
+        product over the memory-mapped rows with precomputed squared
+        norms: about 25 MB and a few milliseconds for 50,000 students,
+        without an index structure to build or keep in sync.
+
+        Args:
+            gallery_root: Directory for the gallery files
+            match_threshold: Descriptor distance below which two faces are
+                taken to be the same person
+        """
+        self.gallery_root = Path(gallery_root)
+        self.gallery_root.mkdir(parents=True, exist_ok=True)
+        self.match_threshold = match_threshold
+        self._lock = threading.Lock()
+        self._load()
+
+    def enroll(self, student_id: str, descriptors: Sequence[Sequence[float]]) -> int:
+        """
+        Add face descriptors of a student.
+
+        Args:
+            student_id: Student identifier, without line breaks
+            descriptors: One or more 128-d descriptors
+
+        Returns:
+            Number of descriptors now enrolled for the student
+
+        Raises:
+            ValueError: If the ID or descriptors are malformed
+            FileSystemError: If the gallery cannot be written
+        """
+        if not student_id or '\n' in student_id:
+            raise ValueError(f"Invalid student ID: {student_id!r}")
+        rows = np.asarray(descriptors, dtype=np.float32).reshape(-1, DESCRIPTOR_SIZE)
+        with self._lock:
+            try:
+                vectors_path = self.gallery_root / VECTORS_FILE
+                with open(vectors_path, 'r+b' if vectors_path.exists() else 'wb') as f:
+                    # Drop rows of an append whose IDs were never written
+                    f.truncate(len(self._ids) * DESCRIPTOR_SIZE * 4)
+                    f.seek(0, os.SEEK_END)
+                    f.write(rows.tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(self.gallery_root / IDS_FILE, 'a') as f:
+                    f.write(''.join(f"{student_id}\n" for _ in range(len(rows))))
+            except OSError as e:
+                raise FileSystemError(
+                    operation="gallery_enroll",
+                    path=str(self.gallery_root),
+                    message=str(e),
+                    error_code=5011
+                )
+            self._append(student_id, rows)
+            count = len(self._rows_by_student[student_id])
+        logger.info(f"Enrolled {len(rows)} face descriptors for student {student_id}")
+        return count
+
+    def remove(self, student_id: str) -> int:
+        """
+        Remove all descriptors of a student, rewriting the gallery files.
+
+        Returns:
+            Number of descriptors removed
+        """
+        with self._lock:
+            rows = self._rows_by_student.get(student_id, [])
+            if not rows:
+                return 0
+            keep = np.ones(len(self._ids), dtype=bool)
+            keep[rows] = False
+            vectors = np.array(self._vectors[keep])
+            ids = [i for i, k in zip(self._ids, keep) if k]
+            try:
+                self._replace(VECTORS_FILE, lambda f: f.write(vectors.tobytes()), 'wb')
+                self._replace(IDS_FILE, lambda f: f.write(''.join(f"{i}\n" for i in ids)), 'w')
+            except OSError as e:
+                raise FileSystemError(
+                    operation="gallery_remove",
+                    path=str(self.gallery_root),
+                    message=str(e),
+                    error_code=5011
+                )
+            self._load()
+        logger.info(f"Removed student {student_id} from face gallery")
+        return len(rows)
+
+    def search(self, descriptor: Sequence[float], k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Find the enrolled students closest to a face.
+
+        Args:
+            descriptor: 128-d query descriptor
+            k: Number of students to return
+
+        Returns:
+            List of (student_id, distance), nearest first, one entry per student
+        """
+        with self._lock:
+            vectors, norms, ids = self._vectors, self._norms, self._ids
+        if not ids:
+            return []
+        query = np.asarray(descriptor, dtype=np.float32)
+        distances = self._distances(vectors, norms, query)
+        # Students may have several rows; take enough candidates to fill k students
+        candidates = min(len(ids), k * 8)
+        nearest = np.argpartition(distances, candidates - 1)[:candidates]
+        matches: Dict[str, float] = {}
+        for row in nearest[np.argsort(distances[nearest])]:
+            matches.setdefault(ids[row], float(distances[row]))
+            if len(matches) == k:
+                break
+        return list(matches.items())
+
+    def verify(self, student_id: str, descriptors: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Distance of each face to a student's closest enrolled descriptor.
+
+        Args:
+            student_id: Enrolled student
+            descriptors: Array of shape (faces, 128)
+
+        Returns:
+            Distances, one per face, or None if the student is not enrolled
+        """
+        with self._lock:
+            rows = self._rows_by_student.get(student_id)
+            if not rows:
+                return None
+            enrolled = np.array(self._vectors[rows])
+        queries = np.asarray(descriptors, dtype=np.float32).reshape(-1, DESCRIPTOR_SIZE)
+        differences = queries[:, None, :] - enrolled[None, :, :]
+        return np.sqrt((differences * differences).sum(axis=2)).min(axis=1)
+
+    def match_video(self, descriptors: np.ndarray, student_id: Optional[str] = None,
+                    k: int = 3) -> Dict:
+        """
+        Match the faces recorded for a video against the gallery.
+
+        Args:
+            descriptors: Per-face descriptors of the video, shape (faces, 128)
+            student_id: Optional student the video is expected to show
+            k: Number of nearest students to report
+
+        Returns:
+            Dictionary with the nearest students to the video's mean face
+            and, for student_id, the fraction of faces matching the student
+        """
+        descriptors = np.asarray(descriptors, dtype=np.float32).reshape(-1, DESCRIPTOR_SIZE)
+        result = {'faces': len(descriptors), 'nearest_students': []}
+        if not len(descriptors):
+            return result
+        result['nearest_students'] = [
+            {'student_id': sid, 'distance': round(distance, 4)}
+            for sid, distance in self.search(descriptors.mean(axis=0), k)
+        ]
+        if student_id is not None:
+            distances = self.verify(student_id, descriptors)
+            if distances is None:
+                result['expected_student'] = {'student_id': student_id, 'enrolled': False}
+            else:
+                matching = float((distances <= self.match_threshold).mean())
+                result['expected_student'] = {
+                    'student_id': student_id,
+                    'enrolled': True,
+                    'median_distance': round(float(np.median(distances)), 4),
+                    'matching_faces': round(matching, 4),
+                    'verified': matching >= 0.5
+                }
+        return result
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'students': len(self._rows_by_student), 'descriptors': len(self._ids)}
+
+    @staticmethod
+    def _distances(vectors: np.ndarray, norms: np.ndarray, query: np.ndarray) -> np.ndarray:
+        squared = norms - 2.0 * (vectors @ query) + float(query @ query)
+        return np.sqrt(np.maximum(squared, 0.0))
+
+    def _load(self) -> None:
+        """Map the descriptor rows; a torn append is cut back to the shorter file."""
+        ids_path = self.gallery_root / IDS_FILE
+        vectors_path = self.gallery_root / VECTORS_FILE
+        ids = ids_path.read_text().splitlines() if ids_path.exists() else []
+        row_bytes = DESCRIPTOR_SIZE * 4
+        count = min(len(ids), vectors_path.stat().st_size // row_bytes if vectors_path.exists() else 0)
+        ids = ids[:count]
+        if count:
+            vectors = np.memmap(vectors_path, dtype=np.float32, mode='r', shape=(count, DESCRIPTOR_SIZE))
+        else:
+            vectors = np.empty((0, DESCRIPTOR_SIZE), dtype=np.float32)
+        rows_by_student: Dict[str, List[int]] = {}
+        for row, student_id in enumerate(ids):
+            rows_by_student.setdefault(student_id, []).append(row)
+        self._vectors = vectors
+        self._norms = np.einsum('ij,ij->i', vectors, vectors)
+        self._ids = ids
+        self._rows_by_student = rows_by_student
+
+    def _append(self, student_id: str, rows: np.ndarray) -> None:
+        """Extend the in-memory view by freshly appended rows without rereading the files."""
+        start = len(self._ids)
+        self._ids = self._ids + [student_id] * len(rows)
+        self._rows_by_student.setdefault(student_id, []).extend(range(start, len(self._ids)))
+        self._vectors = np.memmap(self.gallery_root / VECTORS_FILE, dtype=np.float32, mode='r',
+                                  shape=(len(self._ids), DESCRIPTOR_SIZE))
+        self._norms = np.concatenate([self._norms, np.einsum('ij,ij->i', rows, rows)])
+
+    def _replace(self, name: str, write, mode: str) -> None:
+        path = self.gallery_root / name
+        tmp_path = self.gallery_root / f".{name}.tmp"
+        with open(tmp_path, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,254 @@
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.exceptions import FileSystemError
+
+logger = logging.getLogger(__name__)
+
+FEATURE_EXT = ".npz"
+
+# Per-face measurements recorded from analyze_frame results
+FACE_FEATURES = ('eye_nose_ratios', 'nose_symmetry_ratios', 'gaze_offsets')
+
+
+class FrameFeatureRecorder:
+    """Accumulates per-keyframe features during a single video pass."""
+
+    def __init__(self):
+        self.frame_numbers: List[int] = []
+        self.dlib_faces: List[int] = []
+        self.opencv_faces: List[int] = []
+        self.face_features: Dict[str, List[float]] = {key: [] for key in FACE_FEATURES}
+        self.descriptor_frames: List[int] = []
+        self.descriptors: List[List[float]] = []
+        self.unusable_frames = 0
+        self.object_frames = 0
+
+    def add(self, frame_result: Dict) -> None:
+        """
+        Record features from one analyze_frame result.
+
+        Args:
+            frame_result: Dictionary returned by CheatingDetector.analyze_frame
+        """
+        self.frame_numbers.append(frame_result['frame_number'])
+        self.dlib_faces.append(frame_result['face_detections'])
+        self.opencv_faces.append(frame_result.get('opencv_faces', 0))
+        for key, values in self.face_features.items():
+            values.extend(frame_result.get(key, []))
+        for descriptor in frame_result.get('face_descriptors', []):
+            self.descriptor_frames.append(frame_result['frame_number'])
+            self.descriptors.append(descriptor)
+        if frame_result.get('objects'):
+            self.object_frames += 1
+
+    def add_unusable(self) -> None:
+        """Count a keyframe rejected by the quality gate."""
+        self.unusable_frames += 1
+
+    def get_state(self, include_descriptors: bool = True) -> Dict:
+        """
+        Return recorded features as JSON-serializable lists.
+
+        Args:
+            include_descriptors: Include the face descriptors; checkpoints
+                leave them out and append descriptors_since() to a row file
+        """
+        state = {
+            'frame_numbers': self.frame_numbers,
+            'dlib_faces': self.dlib_faces,
+            'opencv_faces': self.opencv_faces,
+            'face_features': self.face_features,
+            'descriptor_count': len(self.descriptors),
+            'descriptor_width': len(self.descriptors[0]) if self.descriptors else 0,
+            'unusable_frames': self.unusable_frames,
+            'object_frames': self.object_frames
+        }
+        if include_descriptors:
+            state['descriptor_frames'] = self.descriptor_frames
+            state['descriptors'] = self.descriptors
+        return state
+
+    def descriptors_since(self, start: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (frame numbers, descriptors) of the faces recorded after the first start."""
+        frames = np.asarray(self.descriptor_frames[start:], dtype=np.int32)
+        descriptors = np.asarray(self.descriptors[start:], dtype=np.float32).reshape(len(frames), -1)
+        return frames, descriptors
+
+    def restore(self, state: Dict) -> None:
+        """Continue recording from a state returned by get_state."""
+        self.frame_numbers = list(state['frame_numbers'])
+        self.dlib_faces = list(state['dlib_faces'])
+        self.opencv_faces = list(state['opencv_faces'])
+        for key in FACE_FEATURES:
+            self.face_features[key] = list(state['face_features'].get(key, []))
+        self.descriptor_frames = list(state.get('descriptor_frames', []))
+        self.descriptors = list(state.get('descriptors', []))
+        self.unusable_frames = state.get('unusable_frames', 0)
+        self.object_frames = state.get('object_frames', 0)
+
+    def to_arrays(self, total_frames: int) -> Dict[str, np.ndarray]:
+        """Convert recorded features to compact arrays."""
+        arrays = {
+            'total_frames': np.array(total_frames, dtype=np.int64),
+            'unusable_frames': np.array(self.unusable_frames, dtype=np.int64),
+            'object_frames': np.array(self.object_frames, dtype=np.int64),
+            'frame_numbers': np.asarray(self.frame_numbers, dtype=np.int32),
+            'dlib_faces': np.asarray(self.dlib_faces, dtype=np.uint8),
+            'opencv_faces': np.asarray(self.opencv_faces, dtype=np.uint8)
+        }
+        for key, values in self.face_features.items():
+            arrays[key] = np.asarray(values, dtype=np.float32)
+        if self.descriptors:
+            arrays['descriptor_frames'] = np.asarray(self.descriptor_frames, dtype=np.int32)
+            arrays['face_descriptors'] = np.asarray(self.descriptors, dtype=np.float32)
+        return arrays
+
+
+class FeatureStore:
+    def __init__(self, store_root: str):
+        """
+        Initialize per-frame feature store.
+
+        Features of each analysed video are kept in one compressed .npz
+        file. A concatenated snapshot of all videos is held in memory and
+        rebuilt only when the store changes.
+
+        Args:
+            store_root: Directory for feature files
+        """
+        self.store_root = Path(store_root)
+        self.store_root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict] = None
+
+    def create_recorder(self) -> FrameFeatureRecorder:
+        """Create a recorder for one analysis pass."""
+        return FrameFeatureRecorder()
+
+    def save(self, video_id: str, recorder: FrameFeatureRecorder, total_frames: int) -> None:
+        """
+        Persist features for a video, replacing any previous entry.
+
+        Args:
+            video_id: Video identifier
+            recorder: Recorder filled during analysis
+            total_frames: Total frames in the video
+
+        Raises:
+            FileSystemError: If the feature file cannot be written
+        """
+        path = self.store_root / f"{video_id}{FEATURE_EXT}"
+        tmp_path = self.store_root / f".{video_id}{FEATURE_EXT}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **recorder.to_arrays(total_frames))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Feature save failed: {str(e)}")
+            raise FileSystemError(
+                operation="feature_save",
+                path=str(path),
+                message=str(e),
+                error_code=5007
+            )
+        with self._lock:
+            self._snapshot = None
+        logger.debug(f"Stored {len(recorder.frame_numbers)} frame features for {video_id}")
+
+    def delete(self, video_id: str) -> None:
+        """Remove stored features for a video."""
+        path = self.store_root / f"{video_id}{FEATURE_EXT}"
+        if path.exists():
+            path.unlink()
+            with self._lock:
+                self._snapshot = None
+
+    def load_descriptors(self, video_id: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Load the face descriptors recorded for a video.
+
+        Args:
+            video_id: Video identifier
+
+        Returns:
+            Tuple: (frame numbers, descriptors of shape (faces, 128)), or
+            None if the video was analyzed without a face encoder
+        """
+        path = self.store_root / f"{video_id}{FEATURE_EXT}"
+        try:
+            with np.load(path) as data:
+                if 'face_descriptors' not in data.files:
+                    return None
+                return data['descriptor_frames'], data['face_descriptors']
+        except OSError:
+            return None
+
+    def list_videos(self) -> List[str]:
+        """Return IDs of all videos with stored features."""
+        return sorted(p.stem for p in self.store_root.glob(f"*{FEATURE_EXT}"))
+
+    def load_all(self) -> Dict:
+        """
+        Load features of every stored video as concatenated arrays.
+
+        Returns:
+            Dictionary with 'video_ids', per-video 'total_frames',
+            'unusable_frames' and 'object_frames', per-frame
+            arrays tagged by 'frame_video' index, and 'face_features'
+            mapping each FACE_FEATURES key to a (values, video index) pair
+        """
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._build_snapshot()
+            return self._snapshot
+
+    def _build_snapshot(self) -> Dict:
+        video_ids = []
+        total_frames = []
+        unusable_frames = []
+        object_frames = []
+        frame_parts = {'dlib_faces': [], 'opencv_faces': []}
+        frame_video = []
+        face_parts = {key: ([], []) for key in FACE_FEATURES}
+
+        for video_id in self.list_videos():
+            try:
+                with np.load(self.store_root / f"{video_id}{FEATURE_EXT}") as data:
+                    index = len(video_ids)
+                    video_ids.append(video_id)
+                    total_frames.append(int(data['total_frames']))
+                    unusable_frames.append(int(data['unusable_frames']) if 'unusable_frames' in data.files else 0)
+                    object_frames.append(int(data['object_frames']) if 'object_frames' in data.files else 0)
+                    frame_parts['dlib_faces'].append(data['dlib_faces'])
+                    frame_parts['opencv_faces'].append(data['opencv_faces'])
+                    frame_video.append(np.full(len(data['frame_numbers']), index, dtype=np.int32))
+                    for key, (values, videos) in face_parts.items():
+                        # Files written before a feature existed simply lack it
+                        if key in data.files:
+                            values.append(data[key])
+                            videos.append(np.full(len(data[key]), index, dtype=np.int32))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable feature file for {video_id}: {str(e)}")
+
+        def concat(parts, dtype):
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        return {
+            'video_ids': video_ids,
+            'total_frames': np.asarray(total_frames, dtype=np.int64),
+            'unusable_frames': np.asarray(unusable_frames, dtype=np.int64),
+            'object_frames': np.asarray(object_frames, dtype=np.int64),
+            'frame_video': concat(frame_video, np.int32),
+            'dlib_faces': concat(frame_parts['dlib_faces'], np.uint8),
+            'opencv_faces': concat(frame_parts['opencv_faces'], np.uint8),
+            'face_features': {
+                key: (concat(values, np.float32), concat(videos, np.int32))
+                for key, (values, videos) in face_parts.items()
+            }
+        }
@@ -1,30 +1,69 @@
 import os
+import json
+import time
 import uuid
+import hashlib
 import logging
-from typing import Optional, BinaryIO, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional, BinaryIO, Set, Tuple, Dict, List
 from pathlib import Path
-from datetime import datetime  
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks hold within one process only
+    fcntl = None
+
 from core.exceptions import FileSystemError
 
 logger = logging.getLogger(__name__)
 
+INDEX_FILE = ".index.json"
+INDEX_LOCK_FILE = ".index.lock"
+INCOMING_DIR = ".incoming"
+PROXY_SUFFIX = ".proxy.mp4"
+CHUNK_SIZE = 1024 * 1024
+
 class FileService:
-    def __init__(self, upload_root: str, allowed_extensions: Optional[set] = None):
+    def __init__(self, upload_root: str, allowed_extensions: Optional[set] = None,
+                 max_bytes: Optional[int] = None):
         """
         Initialize file service.
         
+        Uploads are stored under the SHA-256 of their content, so identical
+        files share one copy on disk and one file ID. A small JSON index
+        tracks size, age and reference count of each stored file; cleanup
+        and quota eviction work from the index without touching the files.
+        Files pinned by in-flight work (analysis, transcodes, queued jobs)
+        are never evicted, cleaned up or deleted.
+        
+        API and worker processes may share the upload directory: every
+        change reloads the index and saves it under a file lock, so no
+        process overwrites another's entries.
+        
         Args:
             upload_root: Root upload directory
             allowed_extensions: Set of allowed file extensions
+            max_bytes: Upload volume quota; least recently uploaded files
+                are evicted beyond it (None disables)
         """
         self.upload_root = upload_root
-        self.allowed_extensions = allowed_extensions or {'.mp4', '.avi', '.mov', '.mkv'}
+        self.allowed_extensions = allowed_extensions or {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._duplicate_uploads = 0
+        self._evicted_files = 0
+        self._pins: Dict[str, int] = {}
+        self._pin_sources: List[Callable[[], Iterable[str]]] = []
+        self._index: Dict[str, Dict] = {}
         self._ensure_upload_directory()
+        self._load_index()
 
     def _ensure_upload_directory(self) -> None:
         """Create upload directory if needed."""
         try:
             Path(self.upload_root).mkdir(parents=True, exist_ok=True)
+            Path(self.upload_root, INCOMING_DIR).mkdir(exist_ok=True)
             logger.info(f"Upload directory ready at {self.upload_root}")
         except Exception as e:
             logger.critical(f"Failed to create upload directory: {str(e)}")
@@ -35,13 +74,21 @@ class FileService:
                 error_code=5004
             )
 
-    def save_uploaded_file(self, file_obj: BinaryIO, original_filename: str = "") -> str:
+    def save_uploaded_file(self, file_obj: BinaryIO, original_filename: str = "",
+                           pin: bool = False) -> str:
         """
-        Save uploaded file with unique filename.
+        Save uploaded file under its content hash.
+        
+        The upload is streamed to a temporary file while it is hashed. If
+        the same content is already stored, the temporary file is dropped
+        and the stored file's reference count is increased; the same
+        content under another extension is hardlinked.
         
         Args:
             file_obj: File-like object to save
             original_filename: Original filename for extension
+            pin: Pin the stored file before quota eviction runs; the
+                caller releases it with unpin()
             
         Returns:
             Path to saved file
@@ -49,6 +96,7 @@ class FileService:
         Raises:
             FileSystemError: If save fails
         """
+        tmp_path = None
         try:
             ext = self._get_file_extension(original_filename or getattr(file_obj, 'filename', ''))
             if not ext:
@@ -67,16 +115,9 @@ class FileService:
                     error_code=5002
                 )
 
-            unique_id = uuid.uuid4().hex
-            filename = f"{unique_id}{ext}"
-            save_path = os.path.join(self.upload_root, filename)
-            
-            file_obj.seek(0)
-            with open(save_path, 'wb') as f:
-                f.write(file_obj.read())
-            
-            logger.info(f"Saved file to {save_path}")
-            return save_path
+            tmp_path = os.path.join(self.upload_root, INCOMING_DIR, f"{uuid.uuid4().hex}{ext}")
+            file_id, size = self._write_hashed(file_obj, tmp_path)
+            return self._store(tmp_path, ext, file_id, size, pin)
             
         except Exception as e:
             logger.error(f"File save failed: {str(e)}")
@@ -86,14 +127,144 @@ class FileService:
                 message=str(e),
                 error_code=5001
             )
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def adopt_file(self, path: str, original_filename: str, file_id: Optional[str] = None) -> str:
+        """
+        Move a fully written file, e.g. a finished chunked upload, into storage.
+        
+        Args:
+            path: File to adopt; must be on the upload volume and is moved
+            original_filename: Original filename for extension
+            file_id: SHA-256 hex of the content if already known
+            
+        Returns:
+            Path to stored file
+            
+        Raises:
+            FileSystemError: If the file cannot be stored
+        """
+        try:
+            ext = self._get_file_extension(original_filename)
+            if ext not in self.allowed_extensions:
+                raise FileSystemError(
+                    operation="file_adopt",
+                    path=original_filename,
+                    message=f"Extension {ext} not allowed",
+                    error_code=5002
+                )
+            if file_id is None:
+                digest = hashlib.sha256()
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                file_id = digest.hexdigest()
+            return self._store(path, ext, file_id, os.path.getsize(path))
+        except FileSystemError:
+            raise
+        except Exception as e:
+            logger.error(f"File adopt failed: {str(e)}")
+            raise FileSystemError(
+                operation="file_adopt",
+                path=path,
+                message=str(e),
+                error_code=5001
+            )
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def incoming_path(self, name: str) -> str:
+        """Path for a partial file on the upload volume, outside the stored files."""
+        return os.path.join(self.upload_root, INCOMING_DIR, name)
+
+    def proxy_path(self, file_path: str) -> str:
+        """Path of the analysis proxy stored next to a file."""
+        return os.path.join(self.upload_root, f"{self.get_file_id(file_path)}{PROXY_SUFFIX}")
+
+    def attach_proxy(self, file_path: str, tmp_path: str) -> Optional[str]:
+        """
+        Move a finished proxy next to its source file.
+        
+        The proxy is counted in the source's size, so quota eviction and
+        deletion of the source remove it as well; other files are evicted
+        if the proxy pushes the volume over the quota.
+        
+        Args:
+            file_path: Stored source file
+            tmp_path: Finished proxy on the upload volume; moved
+            
+        Returns:
+            Path to the proxy, or None if the source was deleted meanwhile
+        """
+        file_id = self.get_file_id(file_path)
+        proxy_path = self.proxy_path(file_path)
+        with self._index_transaction():
+            entry = self._index.get(file_id)
+            if entry is None or not os.path.exists(file_path):
+                os.remove(tmp_path)
+                return None
+            if os.path.exists(proxy_path):
+                entry['size'] -= os.path.getsize(proxy_path)
+            os.replace(tmp_path, proxy_path)
+            entry['size'] += os.path.getsize(proxy_path)
+            self._enforce_quota(keep=file_id)
+        return proxy_path
+
+    def pin(self, file_path: str) -> None:
+        """Protect a stored file from eviction and deletion until unpin() is called."""
+        file_id = self.get_file_id(file_path)
+        with self._lock:
+            self._pins[file_id] = self._pins.get(file_id, 0) + 1
+
+    def unpin(self, file_path: str) -> None:
+        """Release one pin taken with pin()."""
+        file_id = self.get_file_id(file_path)
+        with self._lock:
+            count = self._pins.get(file_id, 0) - 1
+            if count > 0:
+                self._pins[file_id] = count
+            else:
+                self._pins.pop(file_id, None)
+
+    def add_pin_source(self, source: Callable[[], Iterable[str]]) -> None:
+        """
+        Register work outside this process that needs stored files.
+        
+        Args:
+            source: Callable returning paths of files still in use, e.g.
+                the videos of queued jobs; called before files are removed
+        """
+        self._pin_sources.append(source)
 
     def get_file_id(self, file_path: str) -> str:
         """Extract unique file ID from path."""
         return os.path.splitext(os.path.basename(file_path))[0]
 
+    def find_file(self, file_id: str) -> Optional[str]:
+        """
+        Resolve a file ID back to its stored path.
+        
+        Args:
+            file_id: File ID as returned by get_file_id
+            
+        Returns:
+            Path to stored file or None if not found
+        """
+        for ext in self.allowed_extensions:
+            candidate = os.path.join(self.upload_root, f"{file_id}{ext}")
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
     def delete_file(self, file_path: str) -> None:
         """
-        Delete a file.
+        Release one reference to a file, deleting it when none remain.
+        
+        A pinned file is kept until cleanup_old_files or quota eviction
+        runs after its work is done.
         
         Args:
             file_path: Path to file to delete
@@ -102,9 +273,23 @@ class FileService:
             FileSystemError: If deletion fails
         """
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"Deleted file: {file_path}")
+            file_id = self.get_file_id(file_path)
+            with self._index_transaction():
+                pinned = self._pinned_ids()
+                in_use = pinned is None or file_id in pinned
+                entry = self._index.get(file_id)
+                if entry is None:
+                    if os.path.exists(file_path) and not in_use:
+                        os.remove(file_path)
+                        logger.info(f"Deleted file: {file_path}")
+                    return
+                entry['refcount'] = max(0, entry['refcount'] - 1)
+                if entry['refcount'] == 0:
+                    if in_use:
+                        logger.info(f"Keeping {file_path} until the work using it is done")
+                    else:
+                        self._remove_entry(file_id)
+                        logger.info(f"Deleted file: {file_path}")
         except Exception as e:
             logger.error(f"File deletion failed: {str(e)}")
             raise FileSystemError(
@@ -116,7 +301,11 @@ class FileService:
 
     def cleanup_old_files(self, max_age_days: int = 7) -> Tuple[int, int]:
         """
-        Clean up files older than specified days.
+        Clean up files not uploaded again for more than max_age_days.
+        
+        Ages come from the metadata index, so no file is listed or stat'ed.
+        Files without references left are removed regardless of age. Pinned
+        files are skipped, and nothing is removed while a pin source fails.
         
         Args:
             max_age_days: Maximum file age in days
@@ -125,25 +314,25 @@ class FileService:
             Tuple of (deleted_count, remaining_count)
         """
         deleted = 0
-        remaining = 0
         
         try:
-            for filename in os.listdir(self.upload_root):
-                filepath = os.path.join(self.upload_root, filename)
-                if os.path.isfile(filepath):
-                    file_age = (datetime.now() - datetime.fromtimestamp(
-                        os.path.getmtime(filepath))).days
-                    
-                    if file_age > max_age_days:
+            with self._index_transaction():
+                pinned = self._pinned_ids()
+                if pinned is None:
+                    return 0, len(self._index)
+                now = time.time()
+                for file_id, entry in list(self._index.items()):
+                    if file_id in pinned:
+                        continue
+                    if (entry['refcount'] <= 0
+                            or int((now - entry['last_used']) // 86400) > max_age_days):
                         try:
-                            os.remove(filepath)
+                            self._remove_entry(file_id)
                             deleted += 1
-                            logger.debug(f"Deleted old file: {filename}")
-                        except Exception as e:
-                            remaining += 1
-                            logger.warning(f"Could not delete {filename}: {str(e)}")
-                    else:
-                        remaining += 1
+                            logger.debug(f"Deleted old file: {file_id}")
+                        except OSError as e:
+                            logger.warning(f"Could not delete {file_id}: {str(e)}")
+                remaining = len(self._index)
                         
             logger.info(f"Cleaned up {deleted} old files, {remaining} remain")
             return deleted, remaining
@@ -157,6 +346,198 @@ class FileService:
                 error_code=5005
             )
 
+    def get_stats(self) -> Dict:
+        """Return stored file count, volume and deduplication statistics."""
+        with self._lock:
+            self._index = self._read_index() or self._index
+            return {
+                'files': len(self._index),
+                'total_bytes': sum(e['size'] for e in self._index.values()),
+                'max_bytes': self.max_bytes,
+                'references': sum(e['refcount'] for e in self._index.values()),
+                'duplicate_uploads': self._duplicate_uploads,
+                'evicted_files': self._evicted_files
+            }
+
+    def _store(self, tmp_path: str, ext: str, file_id: str, size: int, pin: bool = False) -> str:
+        """Move a hashed temporary file into storage or count it as a duplicate."""
+        save_path = os.path.join(self.upload_root, f"{file_id}{ext}")
+        with self._index_transaction():
+            now = time.time()
+            entry = self._index.get(file_id)
+            existing = self._existing_paths(file_id, entry)
+            if existing:
+                if save_path not in existing:
+                    self._link_or_move(existing[0], tmp_path, save_path, entry, size)
+                    entry['extensions'].append(ext)
+                entry['refcount'] += 1
+                entry['last_used'] = now
+                self._duplicate_uploads += 1
+                logger.info(f"Upload matches stored file {file_id}, reusing it")
+            else:
+                os.replace(tmp_path, save_path)
+                self._index[file_id] = {
+                    'extensions': [ext],
+                    'size': size,
+                    'created': now,
+                    'last_used': now,
+                    'refcount': 1
+                }
+                logger.info(f"Saved file to {save_path}")
+            if pin:
+                self._pins[file_id] = self._pins.get(file_id, 0) + 1
+            self._enforce_quota(keep=file_id)
+        return save_path
+
+    def _write_hashed(self, file_obj: BinaryIO, path: str) -> Tuple[str, int]:
+        """Stream file_obj to path in chunks and return (sha256 hex, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        file_obj.seek(0)
+        with open(path, 'wb') as f:
+            while True:
+                chunk = file_obj.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    def _existing_paths(self, file_id: str, entry: Optional[Dict]) -> List[str]:
+        if entry is None:
+            return []
+        paths = [os.path.join(self.upload_root, f"{file_id}{ext}") for ext in entry['extensions']]
+        existing = [p for p in paths if os.path.exists(p)]
+        if not existing:
+            # Removed behind the index's back
+            del self._index[file_id]
+        return existing
+
+    def _link_or_move(self, source: str, tmp_path: str, target: str, entry: Dict, size: int) -> None:
+        """Hardlink stored content to a new extension, keeping the upload if linking fails."""
+        try:
+            os.link(source, target)
+        except OSError as e:
+            logger.debug(f"Hardlink failed ({str(e)}), storing a second copy")
+            os.replace(tmp_path, target)
+            entry['size'] += size
+
+    def _remove_entry(self, file_id: str) -> None:
+        entry = self._index.pop(file_id)
+        for ext in entry['extensions']:
+            path = os.path.join(self.upload_root, f"{file_id}{ext}")
+            if os.path.exists(path):
+                os.remove(path)
+        proxy_path = os.path.join(self.upload_root, f"{file_id}{PROXY_SUFFIX}")
+        if os.path.exists(proxy_path):
+            os.remove(proxy_path)
+
+    def _enforce_quota(self, keep: str) -> None:
+        """Evict least recently uploaded unpinned files until the volume fits max_bytes."""
+        if self.max_bytes is None:
+            return
+        total = sum(e['size'] for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        pinned = self._pinned_ids()
+        if pinned is None:
+            return
+        pinned.add(keep)
+        for file_id, entry in sorted(self._index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if file_id in pinned:
+                continue
+            try:
+                self._remove_entry(file_id)
+            except OSError as e:
+                logger.warning(f"Could not evict {file_id}: {str(e)}")
+                continue
+            total -= entry['size']
+            self._evicted_files += 1
+            logger.info(f"Evicted {file_id} ({entry['size']} bytes) to stay within upload quota")
+        if total > self.max_bytes:
+            logger.warning(f"Upload volume {total} bytes exceeds quota of {self.max_bytes}")
+
+    def _pinned_ids(self) -> Optional[Set[str]]:
+        """IDs of files in use, or None if a pin source failed. Caller must hold the lock."""
+        pinned = set(self._pins)
+        for source in self._pin_sources:
+            try:
+                pinned.update(self.get_file_id(path) for path in source())
+            except Exception as e:
+                # Without knowing what is in use, nothing may be removed
+                logger.warning(f"Pinned files unknown, not removing files: {str(e)}")
+                return None
+        return pinned
+
+    @contextmanager
+    def _index_transaction(self) -> Iterator[None]:
+        """Reload the index under the cross-process lock and save it afterwards."""
+        with self._lock, open(os.path.join(self.upload_root, INDEX_LOCK_FILE), 'a') as lock_file:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            index = self._read_index()
+            if index is not None:
+                self._index = index
+            yield
+            self._save_index()
+
+    def _read_index(self) -> Optional[Dict[str, Dict]]:
+        try:
+            with open(os.path.join(self.upload_root, INDEX_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Upload index unreadable: {str(e)}")
+            return None
+
+    def _load_index(self) -> None:
+        """Read the metadata index, rebuilding it from the directory if missing."""
+        with self._index_transaction():
+            if not self._index:
+                self._index = self._scan_directory()
+
+    def _scan_directory(self) -> Dict[str, Dict]:
+        index = {}
+        proxies = []
+        for filename in os.listdir(self.upload_root):
+            filepath = os.path.join(self.upload_root, filename)
+            if filename.endswith(PROXY_SUFFIX):
+                proxies.append(filename)
+                continue
+            file_id, ext = os.path.splitext(filename)
+            if ext.lower() not in self.allowed_extensions or not os.path.isfile(filepath):
+                continue
+            stat = os.stat(filepath)
+            entry = index.setdefault(file_id, {
+                'extensions': [],
+                'size': 0,
+                'created': stat.st_mtime,
+                'last_used': stat.st_mtime,
+                'refcount': 1
+            })
+            entry['extensions'].append(ext.lower())
+            if stat.st_nlink == 1 or len(entry['extensions']) == 1:
+                entry['size'] += stat.st_size
+        for filename in proxies:
+            entry = index.get(filename[:-len(PROXY_SUFFIX)])
+            if entry is not None:
+                entry['size'] += os.path.getsize(os.path.join(self.upload_root, filename))
+        logger.info(f"Indexed {len(index)} existing uploads")
+        return index
+
+    def _save_index(self) -> None:
+        """Persist the index atomically. Caller must hold the index transaction."""
+        path = os.path.join(self.upload_root, INDEX_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+
     def _get_file_extension(self, filename: str) -> str:
         """Extract lowercase file extension."""
         return os.path.splitext(filename)[1].lower()
\ No newline at end of file
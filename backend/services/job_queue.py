@@ -0,0 +1,314 @@
+import abc
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+
+class QueuedJob:
+    """One analysis job as stored by a broker."""
+
+    def __init__(self, job_id: str, video_path: str, state: str = 'queued',
+                 priority: int = 0, cost: float = 0.0, attempts: int = 0,
+                 worker_id: Optional[str] = None, enqueued_at: float = 0.0,
+                 result: Optional[Dict] = None, error: Optional[str] = None):
+        self.job_id = job_id
+        self.video_path = video_path
+        self.state = state
+        self.priority = priority
+        self.cost = cost
+        self.attempts = attempts
+        self.worker_id = worker_id
+        self.enqueued_at = enqueued_at
+        self.result = result
+        self.error = error
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.job_id,
+            'video_path': self.video_path,
+            'state': self.state,
+            'priority': self.priority,
+            'cost': self.cost,
+            'attempts': self.attempts,
+            'worker_id': self.worker_id,
+            'enqueued_at': self.enqueued_at,
+            'result': self.result,
+            'error': self.error
+        }
+
+
+class JobBroker(abc.ABC):
+    """
+    Queue of analysis jobs shared by the API process and worker processes.
+
+    Workers claim a job under a lease and must renew it with heartbeats;
+    a job whose lease runs out is handed to the next worker that asks, so
+    a worker dying mid-job only delays it. Each claim counts as an
+    attempt, and a job is failed for good after max_attempts.
+    """
+
+    @abc.abstractmethod
+    def enqueue(self, video_path: str, priority: int = 0, cost: float = 0.0) -> str:
+        """Add a job and return its ID."""
+
+    @abc.abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[QueuedJob]:
+        """Lease the next job to a worker, or return None if none is ready."""
+
+    @abc.abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a lease; False if the worker no longer holds the job."""
+
+    @abc.abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        """Store the result of a job; False if the worker no longer holds it."""
+
+    @abc.abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        """Release a failed job for retry, or fail it for good."""
+
+    @abc.abstractmethod
+    def active_video_paths(self) -> List[str]:
+        """Return the videos of queued and running jobs."""
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        """Return a job by ID, or None if it does not exist."""
+
+    @abc.abstractmethod
+    def get_stats(self) -> Dict:
+        """Return job counts by state, queued cost and busy workers."""
+
+
+class SQLiteJobBroker(JobBroker):
+    def __init__(self, db_path: str, max_attempts: int = 3, retry_delay: float = 10.0,
+                 aging_rate: float = 1.0, seconds_per_cost: float = 0.05,
+                 priority_seconds: float = 300.0, busy_timeout: float = 30.0):
+        """
+        Initialize job queue in a SQLite file.
+
+        Any number of API and worker processes, on one machine or on
+        several machines sharing the file, may open the same database.
+        Claims run in an immediate transaction, so two workers can never
+        lease the same job. The rollback journal is used instead of WAL
+        because WAL needs shared memory, which network file systems lack.
+        The shared storage must support POSIX file locks (NFSv4, SMB);
+        otherwise, register a networked broker in JOB_BROKERS.
+
+        Ready jobs are claimed by shortest estimated run time, with
+        priority and aging as in JobScheduler. A released job waits
+        retry_delay seconds per attempt made before it is claimed again.
+
+        Args:
+            db_path: Database file on storage shared by all processes
+            max_attempts: Claims of a job before it is failed for good
+            retry_delay: Delay before a failed job is retried, per attempt
+            aging_rate: Estimated seconds forgiven per second of waiting
+            seconds_per_cost: Estimated run time of one cost unit
+            priority_seconds: Estimated seconds forgiven per priority level
+            busy_timeout: Seconds to wait for another process's lock
+        """
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.aging_rate = aging_rate
+        self.seconds_per_cost = seconds_per_cost
+        self.priority_seconds = priority_seconds
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    video_path TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    cost REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    available_at REAL NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    finished_at REAL,
+                    result TEXT,
+                    error TEXT
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, available_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=self.busy_timeout, isolation_level=None)
+            db.execute("PRAGMA journal_mode=DELETE")
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        return db
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def enqueue(self, video_path: str, priority: int = 0, cost: float = 0.0) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO jobs (job_id, video_path, state, priority, cost, available_at, enqueued_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, video_path, priority, cost, now, now))
+        logger.info(f"Enqueued job {job_id} for {video_path} (cost {cost:.0f}, priority {priority})")
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[QueuedJob]:
+        now = time.time()
+        with self._transaction() as db:
+            # Leases of dead workers ran out: their jobs are ready again
+            expired = db.execute(
+                "SELECT job_id, attempts, worker_id FROM jobs WHERE state = 'running' AND lease_expires < ?",
+                (now,)).fetchall()
+            for row in expired:
+                logger.warning(f"Lease of job {row['job_id']} held by {row['worker_id']} expired")
+                self._release(db, row['job_id'], row['attempts'], "Worker lease expired", True, now)
+
+            row = db.execute(
+                "SELECT * FROM jobs WHERE state = 'queued' AND available_at <= ? "
+                "ORDER BY cost * ? - ? * priority - ? * (? - enqueued_at) ASC LIMIT 1",
+                (now, self.seconds_per_cost, self.priority_seconds, self.aging_rate, now)).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET state = 'running', worker_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE job_id = ?",
+                (worker_id, now + lease_seconds, row['job_id']))
+        job = self._to_job(row)
+        job.state = 'running'
+        job.worker_id = worker_id
+        job.attempts += 1
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._transaction() as db:
+            updated = db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND worker_id = ? AND state = 'running'",
+                (time.time() + lease_seconds, job_id, worker_id)).rowcount
+        return updated == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Dict) -> bool:
+        encoded = json.dumps(result, default=_to_json)
+        with self._transaction() as db:
+            updated = db.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL, finished_at = ?, "
+                "lease_expires = NULL WHERE job_id = ? AND worker_id = ? AND state = 'running'",
+                (encoded, time.time(), job_id, worker_id)).rowcount
+        return updated == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT attempts FROM jobs WHERE job_id = ? AND worker_id = ? AND state = 'running'",
+                (job_id, worker_id)).fetchone()
+            if row is None:
+                return False
+            self._release(db, job_id, row['attempts'], error, retry, time.time())
+        return True
+
+    def _release(self, db, job_id: str, attempts: int, error: str, retry: bool, now: float) -> None:
+        if retry and attempts < self.max_attempts:
+            db.execute(
+                "UPDATE jobs SET state = 'queued', worker_id = NULL, lease_expires = NULL, "
+                "available_at = ?, error = ? WHERE job_id = ?",
+                (now + self.retry_delay * attempts, error, job_id))
+        else:
+            db.execute(
+                "UPDATE jobs SET state = 'failed', lease_expires = NULL, finished_at = ?, error = ? "
+                "WHERE job_id = ?",
+                (now, error, job_id))
+            logger.error(f"Job {job_id} failed after {attempts} attempts: {error}")
+
+    def active_video_paths(self) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT DISTINCT video_path FROM jobs WHERE state IN ('queued', 'running')").fetchall()
+        return [row['video_path'] for row in rows]
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row is not None else None
+
+    def get_stats(self) -> Dict:
+        rows = self._connection().execute(
+            "SELECT state, COUNT(*) AS jobs, COALESCE(SUM(cost), 0) AS cost FROM jobs GROUP BY state"
+        ).fetchall()
+        counts = {state: 0 for state in JOB_STATES}
+        queued_cost = 0.0
+        for row in rows:
+            counts[row['state']] = row['jobs']
+            if row['state'] == 'queued':
+                queued_cost = row['cost']
+        workers = self._connection().execute(
+            "SELECT COUNT(DISTINCT worker_id) FROM jobs WHERE state = 'running'").fetchone()[0]
+        return {**counts, 'queued_cost': queued_cost, 'busy_workers': workers}
+
+    @staticmethod
+    def _to_job(row) -> QueuedJob:
+        return QueuedJob(
+            row['job_id'], row['video_path'], row['state'], row['priority'], row['cost'],
+            row['attempts'], row['worker_id'], row['enqueued_at'],
+            json.loads(row['result']) if row['result'] else None, row['error'])
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error."""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+JOB_BROKERS = {'sqlite': SQLiteJobBroker}
+
+def create_job_broker(name: str, **kwargs) -> JobBroker:
+    """
+    Create a job broker by name.
+
+    Args:
+        name: Broker name, a key of JOB_BROKERS
+        **kwargs: Arguments of the broker class
+
+    Returns:
+        JobBroker instance
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    try:
+        broker_class = JOB_BROKERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown job broker: {name}")
+    return broker_class(**kwargs)
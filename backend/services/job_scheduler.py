@@ -0,0 +1,242 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from core.exceptions import AdmissionError
+
+logger = logging.getLogger(__name__)
+
+# Detector work scales with the pixels of each keyframe; 640x480 counts as 1
+REFERENCE_PIXELS = 640 * 480
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'kwargs', 'future', 'cost', 'priority', 'name', 'calibrate', 'submitted')
+
+    def __init__(self, fn: Callable, args, kwargs, cost: float, priority: int, name: str,
+                 calibrate: bool):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.cost = cost
+        self.priority = priority
+        self.name = name
+        self.calibrate = calibrate
+        self.submitted = time.monotonic()
+
+
+class JobScheduler:
+    def __init__(self, cpu_budget: int = 2, max_backlog_cost: float = 20000.0,
+                 keyframe_interval: int = 60, aging_rate: float = 1.0,
+                 seconds_per_cost: float = 0.05, cost_per_byte: float = 5e-6,
+                 priority_seconds: float = 300.0):
+        """
+        Initialize cost-aware admission control and scheduling of analysis jobs.
+
+        The cost of a job is estimated up front as its number of keyframes
+        times a resolution factor (pixels relative to 640x480). At most
+        cpu_budget jobs run at once; the rest wait and the next job is
+        picked by shortest estimated run time first. A waiting job's
+        estimate is reduced by priority_seconds per priority level and by
+        aging_rate seconds for every second it has waited, so long and
+        low-priority recordings are delayed but never starved. A job is
+        rejected with a retry delay when the queued work
+        would exceed max_backlog_cost; a job larger than the bound on its
+        own is only admitted into an empty queue. Running jobs are bounded
+        by cpu_budget and do not count towards the backlog, so one long
+        recording being analyzed does not lock out a burst of short ones.
+
+        Seconds per cost unit start at seconds_per_cost and follow the run
+        times of finished jobs, so retry delays track the actual machine.
+
+        Args:
+            cpu_budget: Jobs running concurrently
+            max_backlog_cost: Bound on the estimated cost of queued jobs
+            keyframe_interval: Analysis keyframe interval used for estimates
+            aging_rate: Estimated seconds forgiven per second of waiting
+            seconds_per_cost: Initial run time of one cost unit
+            cost_per_byte: Initial cost per file byte, for uploads whose
+                metadata is not known yet
+            priority_seconds: Estimated seconds forgiven per priority level
+        """
+        self.cpu_budget = cpu_budget
+        self.max_backlog_cost = max_backlog_cost
+        self.keyframe_interval = keyframe_interval
+        self.aging_rate = aging_rate
+        self.seconds_per_cost = seconds_per_cost
+        self.cost_per_byte = cost_per_byte
+        self.priority_seconds = priority_seconds
+        self._pending: List[_Job] = []
+        self._running_cost = 0.0
+        self._running = 0
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._stats = {'admitted': 0, 'rejected': 0, 'started': 0, 'completed': 0, 'failed': 0,
+                       'wait_seconds': 0.0}
+        self._workers = [
+            threading.Thread(target=self._work, name=f"analysis_{i}", daemon=True)
+            for i in range(cpu_budget)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def estimate_cost(self, metadata: Dict, file_size: Optional[int] = None) -> float:
+        """
+        Estimate the cost of analyzing a video from probed metadata.
+
+        Files that report no frame count, such as browser WebM recordings,
+        are estimated from their size instead.
+
+        Args:
+            metadata: Dictionary with 'frame_count', 'width' and 'height'
+            file_size: Size of the file in bytes, used to calibrate
+                estimate_cost_from_size
+
+        Returns:
+            Estimated cost in 640x480 keyframes
+        """
+        frame_count = metadata.get('frame_count', 0)
+        if frame_count <= 0:
+            return self.estimate_cost_from_size(file_size)
+        keyframes = frame_count / self.keyframe_interval
+        pixels = metadata.get('width', 0) * metadata.get('height', 0)
+        # The detectors have a fixed per-frame overhead even for tiny frames
+        cost = keyframes * max(0.25, pixels / REFERENCE_PIXELS if pixels else 1.0)
+        if file_size:
+            with self._condition:
+                self.cost_per_byte = 0.8 * self.cost_per_byte + 0.2 * cost / file_size
+        return cost
+
+    def estimate_cost_from_size(self, file_size: Optional[int]) -> float:
+        """Estimate the cost of a video whose metadata is not known yet."""
+        if not file_size:
+            return self.max_backlog_cost / (4 * self.cpu_budget)
+        return file_size * self.cost_per_byte
+
+    def submit(self, fn: Callable, *args, cost: float, priority: int = 0,
+               name: str = "", calibrate: bool = True, **kwargs) -> Future:
+        """
+        Admit a job and queue it for execution.
+
+        Args:
+            fn: Callable running the job
+            *args: Positional arguments of fn
+            cost: Estimated cost from estimate_cost
+            priority: Jobs with higher priority run earlier
+            name: Job name for logging
+            calibrate: Whether the run time reflects the job's cost; off for
+                jobs that wait on I/O, such as uploads still being received
+            **kwargs: Keyword arguments of fn
+
+        Returns:
+            Future resolving to the result of fn
+
+        Raises:
+            AdmissionError: If the backlog is full
+        """
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Scheduler is shut down")
+            backlog = self._queued_cost()
+            if backlog > 0 and backlog + cost > self.max_backlog_cost:
+                self._stats['rejected'] += 1
+                retry_after = self._retry_after(backlog, cost)
+                logger.warning(f"Rejected job {name or fn.__name__} (cost {cost:.0f}, "
+                               f"backlog {backlog:.0f}), retry after {retry_after:.0f}s")
+                raise AdmissionError(cost, backlog, retry_after)
+            job = _Job(fn, args, kwargs, cost, priority, name or fn.__name__, calibrate)
+            self._pending.append(job)
+            self._stats['admitted'] += 1
+            self._condition.notify()
+        logger.info(f"Queued job {job.name} (cost {cost:.0f}, priority {priority})")
+        return job.future
+
+    def get_stats(self) -> Dict:
+        with self._condition:
+            started = self._stats['started']
+            return {
+                'cpu_budget': self.cpu_budget,
+                'running': self._running,
+                'queued': len(self._pending),
+                'running_cost': self._running_cost,
+                'backlog_cost': self._queued_cost(),
+                'max_backlog_cost': self.max_backlog_cost,
+                'estimated_drain_seconds': ((self._running_cost + self._queued_cost())
+                                            * self.seconds_per_cost / self.cpu_budget),
+                'seconds_per_cost': self.seconds_per_cost,
+                'admitted': self._stats['admitted'],
+                'rejected': self._stats['rejected'],
+                'completed': self._stats['completed'],
+                'failed': self._stats['failed'],
+                'average_wait_seconds': self._stats['wait_seconds'] / started if started else 0.0
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers; queued jobs are cancelled."""
+        with self._condition:
+            self._shutdown = True
+            pending, self._pending = self._pending, []
+            self._condition.notify_all()
+        for job in pending:
+            job.future.cancel()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _queued_cost(self) -> float:
+        return sum(job.cost for job in self._pending)
+
+    def _retry_after(self, backlog: float, cost: float) -> float:
+        # Time until enough of the backlog has drained for this job to fit
+        excess = backlog + cost - self.max_backlog_cost
+        return max(1.0, min(excess, backlog) * self.seconds_per_cost / self.cpu_budget)
+
+    def _next_job(self) -> _Job:
+        now = time.monotonic()
+        job = min(self._pending, key=lambda j: (
+            j.cost * self.seconds_per_cost - self.priority_seconds * j.priority
+            - self.aging_rate * (now - j.submitted)))
+        self._pending.remove(job)
+        return job
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    return
+                job = self._next_job()
+                self._running += 1
+                self._running_cost += job.cost
+                self._stats['started'] += 1
+                self._stats['wait_seconds'] += time.monotonic() - job.submitted
+
+            if not job.future.set_running_or_notify_cancel():
+                self._finish(job, None)
+                continue
+            start = time.monotonic()
+            try:
+                result = job.fn(*job.args, **job.kwargs)
+            except BaseException as e:
+                self._finish(job, None)
+                job.future.set_exception(e)
+            else:
+                self._finish(job, time.monotonic() - start)
+                job.future.set_result(result)
+
+    def _finish(self, job: _Job, elapsed: Optional[float]) -> None:
+        with self._condition:
+            self._running -= 1
+            self._running_cost -= job.cost
+            if elapsed is None:
+                self._stats['failed'] += 1
+            else:
+                self._stats['completed'] += 1
+                if job.calibrate and job.cost >= 1:
+                    self.seconds_per_cost = 0.8 * self.seconds_per_cost + 0.2 * elapsed / job.cost
+        if elapsed is not None:
+            logger.info(f"Finished job {job.name} in {elapsed:.1f}s (cost {job.cost:.0f})")
@@ -0,0 +1,378 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks hold within one process only
+    fcntl = None
+
+from core.exceptions import FileSystemError
+
+logger = logging.getLogger(__name__)
+
+FRAMES_FILE = "frames.u8"
+INDEX_FILE = "index.json"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_LOCK_FILE = ".manifest.lock"
+
+# Access times only order eviction, so reads write them at most this often
+MANIFEST_SAVE_INTERVAL = 30.0
+
+
+class KeyframeSet:
+    """Read-only view over a cached set of downscaled keyframes."""
+
+    def __init__(self, frames: np.ndarray, index: Dict):
+        """
+        Initialize keyframe set.
+
+        Args:
+            frames: Memory-mapped uint8 array of shape (count, height, width, 3)
+            index: Index metadata (frame numbers, timestamps, video properties)
+        """
+        self.frames = frames
+        self.index = index
+        self.frame_numbers = index['frame_numbers']
+        self.timestamps = index['timestamps']
+
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+
+    def __iter__(self):
+        """Yield (frame_number, frame) pairs; frames are zero-copy views."""
+        for position, frame_number in enumerate(self.frame_numbers):
+            yield frame_number, self.frames[position]
+
+    def nearest(self, frame_time: float) -> Optional[np.ndarray]:
+        """
+        Get the cached keyframe closest to a timestamp.
+
+        Args:
+            frame_time: Time in seconds
+
+        Returns:
+            Keyframe view or None if the set is empty
+        """
+        if not self.timestamps:
+            return None
+        position = int(np.argmin(np.abs(np.asarray(self.timestamps) - frame_time)))
+        return self.frames[position]
+
+
+class KeyframeCache:
+    def __init__(self, cache_root: str, max_bytes: int = 2 * 1024 ** 3,
+                 max_dimension: int = 640):
+        """
+        Initialize on-disk keyframe cache.
+
+        Each cached video is a directory holding a single raw uint8 frame
+        array (read back with np.memmap) and a JSON index of frame numbers
+        and timestamps. Entries are evicted least-recently-used first once
+        the total size exceeds max_bytes; a video whose keyframes alone
+        exceed max_bytes is not cached.
+
+        The manifest of entry sizes and access times may be shared by
+        several processes. Each process merges its changes into the file
+        under a file lock instead of overwriting it, and access times are
+        written in batches rather than on every read.
+
+        Args:
+            cache_root: Root cache directory
+            max_bytes: Total size budget for cached frames
+            max_dimension: Longest side of stored keyframes in pixels
+        """
+        self.cache_root = Path(cache_root)
+        self.max_bytes = max_bytes
+        self.max_dimension = max_dimension
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._oversized = set()
+        self.cache_root.mkdir(parents=True, exist_ok=True)
+        self._manifest = self._load_manifest()
+        # Entries changed since the last save; None marks a removed entry
+        self._changes: Dict[str, Optional[Dict]] = {}
+        self._saved_at = time.time()
+
+    def get(self, video_path: str, interval: int) -> Optional[KeyframeSet]:
+        """
+        Load cached keyframes without decoding the video.
+
+        Args:
+            video_path: Path to source video
+            interval: Keyframe interval the cache was built with
+
+        Returns:
+            KeyframeSet or None if no valid entry exists
+        """
+        key = self._get_key(video_path, interval)
+        entry_dir = self.cache_root / key
+        try:
+            with open(entry_dir / INDEX_FILE) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not self._is_fresh(index, video_path):
+            logger.info(f"Discarding stale keyframe cache for {video_path}")
+            self._remove_entry(key)
+            return None
+
+        count = len(index['frame_numbers'])
+        if count == 0:
+            frames = np.empty((0, index['height'], index['width'], 3), dtype=np.uint8)
+        else:
+            frames = np.memmap(
+                entry_dir / FRAMES_FILE,
+                dtype=np.uint8,
+                mode='r',
+                shape=(count, index['height'], index['width'], 3)
+            )
+        self._touch(key)
+        return KeyframeSet(frames, index)
+
+    def get_or_build(self, video_path: str, interval: int) -> Optional[KeyframeSet]:
+        """
+        Load cached keyframes, decoding the video once if needed.
+
+        Args:
+            video_path: Path to source video
+            interval: Keep every Nth frame
+
+        Returns:
+            KeyframeSet for the video, or None if its keyframes do not fit
+            the cache budget
+
+        Raises:
+            FileSystemError: If the cache entry cannot be written
+        """
+        key = self._get_key(video_path, interval)
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+            if key in self._oversized:
+                return None
+
+        with build_lock:
+            keyframes = self.get(video_path, interval)
+            if keyframes is None:
+                if not self._build(video_path, interval, key):
+                    with self._lock:
+                        self._oversized.add(key)
+                    return None
+                keyframes = self.get(video_path, interval)
+        if keyframes is None:
+            raise FileSystemError(
+                operation="keyframe_cache_build",
+                path=video_path,
+                message="Keyframe cache entry missing after build",
+                error_code=5006
+            )
+        return keyframes
+
+    def invalidate(self, video_path: str) -> None:
+        """Remove every cache entry belonging to a video."""
+        prefix = f"{Path(video_path).stem}_i"
+        with self._lock:
+            keys = [k for k in self._manifest if k.startswith(prefix)]
+        for key in keys:
+            self._remove_entry(key)
+
+    def get_stats(self) -> Dict:
+        """Return cache size and entry count."""
+        with self._lock:
+            return {
+                'entries': len(self._manifest),
+                'total_bytes': sum(e['bytes'] for e in self._manifest.values()),
+                'max_bytes': self.max_bytes
+            }
+
+    def _build(self, video_path: str, interval: int, key: str) -> bool:
+        """Decode keyframes into a new cache entry; False if they exceed max_bytes."""
+        entry_dir = self.cache_root / key
+        # Unique, as another process may build the same entry
+        tmp_dir = self.cache_root / f".{key}.{uuid.uuid4().hex}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise FileSystemError(
+                operation="keyframe_cache_build",
+                path=video_path,
+                message="Could not open video file",
+                error_code=5006
+            )
+
+        frame_numbers: List[int] = []
+        timestamps: List[float] = []
+        target_size = None
+        frame_counter = 0
+        written = 0
+        reported_keyframes = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) // interval
+        try:
+            with open(tmp_dir / FRAMES_FILE, 'wb') as out:
+                frame = None
+                resized = None
+                # Skipped frames are grabbed without conversion; keyframes reuse one buffer
+                while cap.grab():
+                    frame_counter += 1
+                    if frame_counter % interval != 0:
+                        continue
+                    ret, frame = cap.retrieve(frame)
+                    if not ret:
+                        break
+
+                    if target_size is None:
+                        target_size = self._get_target_size(frame.shape[1], frame.shape[0])
+                    stored = frame
+                    if (frame.shape[1], frame.shape[0]) != target_size:
+                        resized = cv2.resize(frame, target_size, dst=resized, interpolation=cv2.INTER_AREA)
+                        stored = resized
+
+                    # Stop as soon as the entry is known not to fit
+                    written += stored.nbytes
+                    if max(written, reported_keyframes * stored.nbytes) > self.max_bytes:
+                        logger.info(f"Keyframes of {video_path} exceed the cache budget, not caching")
+                        shutil.rmtree(tmp_dir, ignore_errors=True)
+                        return False
+
+                    out.write(np.ascontiguousarray(stored).data)
+                    frame_numbers.append(frame_counter)
+                    timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+
+            width, height = target_size or (0, 0)
+            stat = os.stat(video_path)
+            index = {
+                'source': os.path.abspath(video_path),
+                'source_size': stat.st_size,
+                'source_mtime': stat.st_mtime,
+                'interval': interval,
+                'fps': cap.get(cv2.CAP_PROP_FPS),
+                'total_frames': frame_counter,
+                'width': width,
+                'height': height,
+                'frame_numbers': frame_numbers,
+                'timestamps': timestamps
+            }
+            with open(tmp_dir / INDEX_FILE, 'w') as f:
+                json.dump(index, f)
+        except Exception as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise FileSystemError(
+                operation="keyframe_cache_build",
+                path=video_path,
+                message=str(e),
+                error_code=5006
+            )
+        finally:
+            cap.release()
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+
+        size = (entry_dir / FRAMES_FILE).stat().st_size
+        with self._lock:
+            entry = self._manifest[key] = {'bytes': size, 'last_access': time.time()}
+            self._changes[key] = entry
+            self._save_manifest()
+        logger.info(f"Cached {len(frame_numbers)} keyframes for {video_path} ({size} bytes)")
+        self._evict(keep=key)
+        return True
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Evict least-recently-used entries until under the byte budget."""
+        with self._lock:
+            total = sum(e['bytes'] for e in self._manifest.values())
+            victims = []
+            for key, entry in sorted(self._manifest.items(), key=lambda kv: kv[1]['last_access']):
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                victims.append(key)
+                total -= entry['bytes']
+
+        for key in victims:
+            logger.debug(f"Evicting keyframe cache entry {key}")
+            self._remove_entry(key)
+
+    def _remove_entry(self, key: str) -> None:
+        shutil.rmtree(self.cache_root / key, ignore_errors=True)
+        with self._lock:
+            self._manifest.pop(key, None)
+            self._changes[key] = None
+            self._save_manifest()
+
+    def _touch(self, key: str) -> None:
+        now = time.time()
+        with self._lock:
+            entry = self._manifest.get(key)
+            if entry is None:
+                size = (self.cache_root / key / FRAMES_FILE).stat().st_size
+                entry = self._manifest[key] = {'bytes': size}
+            entry['last_access'] = now
+            self._changes[key] = entry
+            if now - self._saved_at >= MANIFEST_SAVE_INTERVAL:
+                self._save_manifest()
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.cache_root / MANIFEST_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        """Merge local changes into the shared manifest and persist it atomically. Caller must hold the lock."""
+        with self._manifest_lock():
+            manifest = self._load_manifest()
+            for key, entry in self._changes.items():
+                if entry is None:
+                    manifest.pop(key, None)
+                elif key in manifest or (self.cache_root / key).exists():
+                    # Entries removed by another process stay removed
+                    shared = manifest.get(key, {})
+                    manifest[key] = {'bytes': entry['bytes'],
+                                     'last_access': max(entry['last_access'], shared.get('last_access', 0))}
+            tmp_path = self.cache_root / f".{MANIFEST_FILE}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self.cache_root / MANIFEST_FILE)
+        self._manifest = manifest
+        self._changes = {}
+        self._saved_at = time.time()
+
+    @contextmanager
+    def _manifest_lock(self) -> Iterator[None]:
+        with open(self.cache_root / MANIFEST_LOCK_FILE, 'a') as lock_file:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _get_key(self, video_path: str, interval: int) -> str:
+        return f"{Path(video_path).stem}_i{interval}_d{self.max_dimension}"
+
+    def _get_target_size(self, width: int, height: int) -> tuple:
+        scale = min(1.0, self.max_dimension / max(width, height))
+        return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+    @staticmethod
+    def _is_fresh(index: Dict, video_path: str) -> bool:
+        try:
+            stat = os.stat(video_path)
+        except OSError:
+            return False
+        return (stat.st_size == index.get('source_size')
+                and stat.st_mtime == index.get('source_mtime'))
@@ -0,0 +1,301 @@
+import time
+import uuid
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.exceptions import AdmissionError
+from core.video_processor import AGGREGATED_KEYS
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSession:
+    """
+    One live proctoring stream sharing the detector pool.
+
+    A session holds at most one frame waiting for a worker: a newer frame
+    replaces a waiting one, so under overload a stream skips frames
+    instead of falling behind. Frames arriving sooner than the session's
+    allotted interval are dropped on arrival.
+
+    Sessions are updated by the scheduler's workers; read them through
+    LiveSessionScheduler.session_stats, which holds the scheduler lock.
+    """
+
+    def __init__(self, session_id: str, target_fps: float, min_fps: float, window: float):
+        self.session_id = session_id
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.allotted_fps = target_fps
+        self.window = window
+        self.created = time.time()
+        self.last_activity = time.monotonic()
+        self.results = defaultdict(int)
+        self.received_frames = 0
+        self.processed_frames = 0
+        self.sampling_dropped = 0
+        self.stale_dropped = 0
+        self.last_result: Optional[Dict] = None
+        self._pending: Optional[Tuple[int, np.ndarray, float]] = None
+        self._busy = False
+        self._closed = False
+        self._last_accepted: Optional[float] = None
+        self._completed: Deque[float] = deque()
+        self._latencies: Deque[float] = deque(maxlen=200)
+
+    def to_dict(self) -> Dict:
+        now = time.monotonic()
+        while self._completed and self._completed[0] < now - self.window:
+            self._completed.popleft()
+        latencies = sorted(self._latencies)
+        return {
+            'session_id': self.session_id,
+            'target_fps': self.target_fps,
+            'allotted_fps': round(self.allotted_fps, 3),
+            'effective_fps': round(len(self._completed) / self.window, 3),
+            'latency_p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+            'latency_p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+            'received_frames': self.received_frames,
+            'processed_frames': self.processed_frames,
+            'sampling_dropped': self.sampling_dropped,
+            'stale_dropped': self.stale_dropped
+        }
+
+
+class LiveSessionScheduler:
+    def __init__(self, cheating_detector, workers: int = 2, target_fps: float = 2.0,
+                 min_fps: float = 0.5, window: float = 10.0, max_idle_seconds: float = 300.0,
+                 seconds_per_frame: float = 0.1, retry_after: float = 60.0):
+        """
+        Initialize fair scheduling of many live sessions onto a detector pool.
+
+        Sessions with a waiting frame are served round-robin, one frame per
+        session per turn, so a fast stream cannot crowd out slow ones. Pool
+        capacity is estimated from the detector time of recent frames and
+        shared max-min fairly: every session gets up to its target rate,
+        and when the sum exceeds capacity the fastest sessions are cut back
+        first, never below min_fps. A session is only opened while the
+        minimum rates of all sessions fit the pool.
+
+        Args:
+            cheating_detector: Configured CheatingDetector
+            workers: Detector threads
+            target_fps: Default sampling rate of a session
+            min_fps: Guaranteed sampling rate of every session
+            window: Seconds over which effective fps is measured
+            max_idle_seconds: Sessions without frames for this long are closed
+            seconds_per_frame: Initial detector time per frame
+            retry_after: Seconds a rejected client is asked to wait
+        """
+        self.detector = cheating_detector
+        self.workers = workers
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.window = window
+        self.max_idle_seconds = max_idle_seconds
+        self.seconds_per_frame = seconds_per_frame
+        self.retry_after = retry_after
+        self._sessions: Dict[str, LiveSession] = {}
+        self._ready: Deque[LiveSession] = deque()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"live_{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def capacity_fps(self) -> float:
+        """Frames per second the pool can analyze at the current detector speed."""
+        return self.workers / self.seconds_per_frame
+
+    def open(self, target_fps: Optional[float] = None) -> Dict:
+        """
+        Open a live session.
+
+        Args:
+            target_fps: Requested sampling rate (default: the scheduler's)
+
+        Returns:
+            Dictionary with the new session's ID, rates and counters
+
+        Raises:
+            AdmissionError: If the pool cannot guarantee another session's
+                minimum rate
+        """
+        self.expire_idle()
+        target_fps = max(self.min_fps, target_fps or self.target_fps)
+        with self._condition:
+            reserved = self.min_fps * len(self._sessions)
+            if reserved + self.min_fps > self.capacity_fps:
+                raise AdmissionError(
+                    self.min_fps, reserved, self.retry_after,
+                    message=(f"Live capacity full ({len(self._sessions)} sessions at "
+                             f"{self.min_fps} fps minimum), retry in {self.retry_after:.0f}s"))
+            session = LiveSession(uuid.uuid4().hex, target_fps, self.min_fps, self.window)
+            self._sessions[session.session_id] = session
+            self._rebalance()
+            stats = session.to_dict()
+        logger.info(f"Opened live session {session.session_id} at {target_fps} fps "
+                    f"({len(self._sessions)} active)")
+        return stats
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        with self._condition:
+            return self._sessions.get(session_id)
+
+    def session_stats(self, session_id: str) -> Optional[Dict]:
+        """Return the rates and counters of a session, or None if it does not exist."""
+        with self._condition:
+            session = self._sessions.get(session_id)
+            return session.to_dict() if session is not None else None
+
+    def submit_frame(self, session_id: str, frame: np.ndarray) -> Dict:
+        """
+        Offer a frame of a live session for analysis.
+
+        Args:
+            session_id: Open session
+            frame: BGR frame
+
+        Returns:
+            Dictionary with whether the frame was accepted, the interval
+            the client should send frames at and the latest frame result
+
+        Raises:
+            KeyError: If the session does not exist
+        """
+        now = time.monotonic()
+        with self._condition:
+            session = self._sessions[session_id]
+            session.received_frames += 1
+            session.last_activity = now
+            interval = 1.0 / session.allotted_fps
+            # Small tolerance so a client sending exactly at the interval is not dropped
+            accepted = session._last_accepted is None or now - session._last_accepted >= 0.9 * interval
+            if not accepted:
+                session.sampling_dropped += 1
+            else:
+                session._last_accepted = now
+                if session._pending is not None:
+                    session.stale_dropped += 1
+                session._pending = (session.received_frames, frame, now)
+                if not session._busy and session not in self._ready:
+                    self._ready.append(session)
+                    self._condition.notify()
+            return {
+                'session_id': session_id,
+                'accepted': accepted,
+                'frame_number': session.received_frames,
+                'interval_ms': round(interval * 1000),
+                'last_result': session.last_result
+            }
+
+    def close(self, session_id: str) -> Tuple[bool, Dict]:
+        """
+        Close a session and compile its results.
+
+        Returns:
+            Tuple: (cheating_detected, analysis_details) over the frames analyzed
+
+        Raises:
+            KeyError: If the session does not exist
+        """
+        with self._condition:
+            session = self._sessions.pop(session_id)
+            session._closed = True
+            session._pending = None
+            if session in self._ready:
+                self._ready.remove(session)
+            self._rebalance()
+            results = dict(session.results)
+            results['total_frames'] = session.received_frames
+            results['processed_frames'] = session.processed_frames
+            stats = session.to_dict()
+        cheating_detected, details = self.detector.compile_results(results)
+        details['live'] = stats
+        logger.info(f"Closed live session {session_id} after {session.processed_frames} frames")
+        return cheating_detected, details
+
+    def expire_idle(self) -> None:
+        now = time.monotonic()
+        with self._condition:
+            idle = [sid for sid, s in self._sessions.items()
+                    if now - s.last_activity > self.max_idle_seconds]
+        for session_id in idle:
+            try:
+                self.close(session_id)
+            except KeyError:
+                pass
+
+    def get_stats(self) -> Dict:
+        with self._condition:
+            sessions = [s.to_dict() for s in self._sessions.values()]
+            return {
+                'workers': self.workers,
+                'capacity_fps': round(self.capacity_fps, 2),
+                'seconds_per_frame': round(self.seconds_per_frame, 4),
+                'waiting_sessions': len(self._ready),
+                'degraded_sessions': sum(1 for s in sessions if s['allotted_fps'] < s['target_fps']),
+                'sessions': sessions
+            }
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _rebalance(self) -> None:
+        """Share capacity max-min fairly across sessions; call with the lock held."""
+        sessions = sorted(self._sessions.values(), key=lambda s: s.target_fps)
+        remaining = self.capacity_fps
+        for i, session in enumerate(sessions):
+            share = remaining / (len(sessions) - i)
+            session.allotted_fps = max(session.min_fps, min(session.target_fps, share))
+            remaining -= session.allotted_fps
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._ready and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    return
+                session = self._ready.popleft()
+                frame_number, frame, received = session._pending
+                session._pending = None
+                session._busy = True
+
+            started = time.monotonic()
+            try:
+                frame_result = self.detector.analyze_frame(frame, frame_number)
+                summary = {k: frame_result.get(k, 0) for k in AGGREGATED_KEYS}
+                summary['frame_number'] = frame_number
+            except Exception as e:
+                logger.error(f"Live session {session.session_id} frame {frame_number} failed: {str(e)}")
+                summary = None
+            finished = time.monotonic()
+
+            with self._condition:
+                session._busy = False
+                self.seconds_per_frame = 0.9 * self.seconds_per_frame + 0.1 * (finished - started)
+                if summary is not None and not session._closed:
+                    for k in AGGREGATED_KEYS:
+                        session.results[k] += summary[k]
+                    session.processed_frames += 1
+                    session.last_result = summary
+                    session._completed.append(finished)
+                    session._latencies.append(finished - received)
+                # Back of the line: every other waiting session goes first
+                if session._pending is not None and not session._closed:
+                    self._ready.append(session)
+                    self._condition.notify()
+                self._rebalance()
@@ -0,0 +1,269 @@
+import os
+import re
+import bisect
+import logging
+import threading
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.exceptions import FileSystemError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_PATTERNS = ('cheating_detection_*.log', 'cheating_detection_*.log.*', 'app.log', 'app.log.*')
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+LEVEL_NAMES = {v: k for k, v in LEVELS.items()}
+
+# "2025-04-01 15:51:32,115 - INFO - msg" or "2025-04-01 15:51:32 - name - INFO - msg"
+_TEXT_RECORD = re.compile(
+    rb'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:,(\d{3}))? - (?:\S+ - )?'
+    rb'(DEBUG|INFO|WARNING|ERROR|CRITICAL) - '
+)
+# StructuredFormatter output
+_JSON_RECORD = re.compile(
+    rb'^\{"timestamp": "(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:,(\d{3}))?", "level": "(\w+)"'
+)
+# Upload file IDs: uuid4 hex or sha256 hex
+_VIDEO_ID = re.compile(rb'(?<![0-9a-f])([0-9a-f]{64}|[0-9a-f]{32})(?![0-9a-f])')
+
+
+class _FileIndex:
+    """Record start offsets, timestamps and levels of one log file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.indexed_size = 0
+        self.offsets = array('q')
+        self.timestamps = array('d')
+        self.levels = bytearray()
+
+    def reset(self) -> None:
+        self.indexed_size = 0
+        self.offsets = array('q')
+        self.timestamps = array('d')
+        self.levels = bytearray()
+
+    def record_end(self, position: int) -> int:
+        if position + 1 < len(self.offsets):
+            return self.offsets[position + 1]
+        return self.indexed_size
+
+
+class LogIndex:
+    def __init__(self, log_dirs: List[str], patterns: Tuple[str, ...] = DEFAULT_LOG_PATTERNS,
+                 max_record_bytes: int = 64 * 1024):
+        """
+        Initialize byte-offset index over log files.
+
+        Only record start offsets, timestamps, levels and video ID postings
+        are held in memory. Queries locate records through the index and
+        read them with a seek. Each refresh reads only the bytes appended
+        since the previous one; files are tracked by inode so rotated files
+        keep their index after being renamed.
+
+        Args:
+            log_dirs: Directories containing log files
+            patterns: Glob patterns of log files to index
+            max_record_bytes: Longest record text returned by a query
+        """
+        self.log_dirs = [Path(d) for d in log_dirs]
+        self.patterns = patterns
+        self.max_record_bytes = max_record_bytes
+        self._files: Dict[Tuple[int, int], _FileIndex] = {}
+        self._video_postings: Dict[str, List[Tuple[Tuple[int, int], int]]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """
+        Index records appended since the last refresh.
+
+        Returns:
+            Number of newly indexed records
+        """
+        added = 0
+        with self._lock:
+            seen = set()
+            for path in self._discover():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key = (stat.st_dev, stat.st_ino)
+                seen.add(key)
+                index = self._files.get(key)
+                if index is None:
+                    index = self._files[key] = _FileIndex(str(path))
+                index.path = str(path)
+                if stat.st_size < index.indexed_size:
+                    # Truncated or replaced in place: rebuild this file
+                    self._drop_postings(key)
+                    index.reset()
+                if stat.st_size > index.indexed_size:
+                    added += self._index_file(key, index)
+
+            for key in set(self._files) - seen:
+                self._drop_postings(key)
+                del self._files[key]
+        if added:
+            logger.debug(f"Indexed {added} new log records")
+        return added
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              level: Optional[str] = None, video_id: Optional[str] = None,
+              limit: int = 100, tail: bool = False) -> List[Dict]:
+        """
+        Find log records by time range, minimum level and video ID.
+
+        Args:
+            start: Earliest record time (inclusive)
+            end: Latest record time (inclusive)
+            level: Minimum level name, e.g. 'WARNING'
+            video_id: Only records mentioning this video ID
+            limit: Maximum records returned
+            tail: Return the newest matching records instead of the oldest
+
+        Returns:
+            Matching records in time order
+
+        Raises:
+            ValueError: If level is unknown
+        """
+        min_level = 0
+        if level:
+            if level.upper() not in LEVELS:
+                raise ValueError(f"Unknown log level: {level}")
+            min_level = LEVELS[level.upper()]
+        start_ts = start.timestamp() if start else float('-inf')
+        end_ts = end.timestamp() if end else float('inf')
+
+        self.refresh()
+        with self._lock:
+            if video_id:
+                candidates = self._video_candidates(video_id, start_ts, end_ts, min_level)
+            else:
+                candidates = self._range_candidates(start_ts, end_ts, min_level, limit, tail)
+            candidates.sort(key=lambda c: (c[0], c[1][1], c[2]))
+            selected = candidates[-limit:] if tail else candidates[:limit]
+            locations = [(self._files[key], pos) for _, key, pos in selected]
+
+        return [self._read_record(index, pos) for index, pos in locations]
+
+    def get_stats(self) -> Dict:
+        """Return indexed file and record counts."""
+        with self._lock:
+            return {
+                'files': len(self._files),
+                'records': sum(len(f.offsets) for f in self._files.values()),
+                'indexed_bytes': sum(f.indexed_size for f in self._files.values()),
+                'video_ids': len(self._video_postings)
+            }
+
+    def _discover(self) -> List[Path]:
+        paths = set()
+        for log_dir in self.log_dirs:
+            for pattern in self.patterns:
+                paths.update(p for p in log_dir.glob(pattern) if p.is_file())
+        return sorted(paths)
+
+    def _index_file(self, key: Tuple[int, int], index: _FileIndex) -> int:
+        """Parse complete lines appended after index.indexed_size."""
+        added = 0
+        last_ts = index.timestamps[-1] if index.timestamps else 0.0
+        try:
+            with open(index.path, 'rb') as f:
+                f.seek(index.indexed_size)
+                position = index.indexed_size
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Partial line still being written; pick it up next refresh
+                        break
+                    parsed = self._parse_line(line)
+                    if parsed is not None:
+                        timestamp, level_no = parsed
+                        # Keep timestamps sorted within a file for bisection
+                        last_ts = max(last_ts, timestamp)
+                        index.offsets.append(position)
+                        index.timestamps.append(last_ts)
+                        index.levels.append(level_no)
+                        added += 1
+                    if index.offsets:
+                        for match in set(_VIDEO_ID.findall(line)):
+                            postings = self._video_postings.setdefault(match.decode(), [])
+                            entry = (key, len(index.offsets) - 1)
+                            if not postings or postings[-1] != entry:
+                                postings.append(entry)
+                    position += len(line)
+                index.indexed_size = position
+        except OSError as e:
+            raise FileSystemError(
+                operation="log_index",
+                path=index.path,
+                message=str(e),
+                error_code=5008
+            )
+        return added
+
+    @staticmethod
+    def _parse_line(line: bytes) -> Optional[Tuple[float, int]]:
+        match = _TEXT_RECORD.match(line) or _JSON_RECORD.match(line)
+        if match is None:
+            return None
+        level_no = LEVELS.get(match.group(3).decode())
+        if level_no is None:
+            return None
+        stamp = datetime.strptime(match.group(1).decode(), '%Y-%m-%d %H:%M:%S').timestamp()
+        if match.group(2):
+            stamp += int(match.group(2)) / 1000.0
+        return stamp, level_no
+
+    def _range_candidates(self, start_ts: float, end_ts: float, min_level: int,
+                          limit: int, tail: bool) -> List[Tuple[float, Tuple[int, int], int]]:
+        """Bisect each file's timestamps and scan at most `limit` matches per file."""
+        candidates = []
+        for key, index in self._files.items():
+            lo = bisect.bisect_left(index.timestamps, start_ts)
+            hi = bisect.bisect_right(index.timestamps, end_ts)
+            positions = range(hi - 1, lo - 1, -1) if tail else range(lo, hi)
+            found = 0
+            for pos in positions:
+                if index.levels[pos] >= min_level:
+                    candidates.append((index.timestamps[pos], key, pos))
+                    found += 1
+                    if found >= limit:
+                        break
+        return candidates
+
+    def _video_candidates(self, video_id: str, start_ts: float, end_ts: float,
+                          min_level: int) -> List[Tuple[float, Tuple[int, int], int]]:
+        candidates = []
+        for key, pos in self._video_postings.get(video_id, []):
+            index = self._files[key]
+            timestamp = index.timestamps[pos]
+            if start_ts <= timestamp <= end_ts and index.levels[pos] >= min_level:
+                candidates.append((timestamp, key, pos))
+        return candidates
+
+    def _read_record(self, index: _FileIndex, pos: int) -> Dict:
+        offset = index.offsets[pos]
+        length = min(index.record_end(pos) - offset, self.max_record_bytes)
+        with open(index.path, 'rb') as f:
+            f.seek(offset)
+            text = f.read(length).decode('utf-8', errors='replace').rstrip('\r\n')
+        return {
+            'file': os.path.basename(index.path),
+            'offset': offset,
+            'timestamp': datetime.fromtimestamp(index.timestamps[pos]).isoformat(),
+            'level': LEVEL_NAMES[index.levels[pos]],
+            'text': text
+        }
+
+    def _drop_postings(self, key: Tuple[int, int]) -> None:
+        for video_id in list(self._video_postings):
+            remaining = [entry for entry in self._video_postings[video_id] if entry[0] != key]
+            if remaining:
+                self._video_postings[video_id] = remaining
+            else:
+                del self._video_postings[video_id]
@@ -1,15 +1,89 @@
 import logging
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, QueueHandler
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import sys
 import json
+import queue
+import time
+import atexit
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encode_str = json.encoder.encode_basestring_ascii
+_BASE_FIELDS = frozenset({'timestamp', 'level', 'message', 'module', 'function', 'line', 'exception'})
+
+def _dumps(obj) -> str:
+    """Serialize with orjson when installed, else the stdlib encoder."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, default=str)
 
 class StructuredFormatter(logging.Formatter):
-    """Formatter for JSON structured logs"""
+    """
+    Formatter for JSON structured logs.
+    
+    Fields that are fixed for a call site (level, module, function, line)
+    are encoded once and reused, and the timestamp prefix is reused within
+    the same second. Only the message, exception and context are encoded
+    per record.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._site_cache = {}
+        self._time_cache = (None, '')
+
     def format(self, record):
+        site_key = (record.pathname, record.lineno, record.levelno, record.funcName)
+        site = self._site_cache.get(site_key)
+        if site is None:
+            site = (
+                f', "level": {_encode_str(record.levelname)}, "message": ',
+                f', "module": {_encode_str(record.module)}, "function": {_encode_str(record.funcName)}, '
+                f'"line": {record.lineno}'
+            )
+            self._site_cache[site_key] = site
+            
+        context = getattr(record, 'context', None)
+        if context and not _BASE_FIELDS.isdisjoint(context):
+            return self._format_merged(record, context)
+            
+        parts = [
+            '{"timestamp": ', _encode_str(self.formatTime(record, self.datefmt)),
+            site[0], _encode_str(record.getMessage()), site[1]
+        ]
+        
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            parts.append(f', "exception": {_encode_str(record.exc_text)}')
+        
+        if context:
+            parts.append(', ')
+            parts.append(_dumps(context)[1:])
+        else:
+            parts.append('}')
+            
+        return ''.join(parts)
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, prefix = self._time_cache
+        if second != cached_second:
+            prefix = time.strftime(self.default_time_format, self.converter(record.created))
+            self._time_cache = (second, prefix)
+        return self.default_msec_format % (prefix, record.msecs)
+
+    def _format_merged(self, record, context):
+        """Slow path for context keys that override the base fields."""
         log_record = {
-            'timestamp': self.formatTime(record),
+            'timestamp': self.formatTime(record, self.datefmt),
             'level': record.levelname,
             'message': record.getMessage(),
             'module': record.module,
@@ -20,10 +94,210 @@ class StructuredFormatter(logging.Formatter):
         if record.exc_info:
             log_record['exception'] = self.formatException(record.exc_info)
         
-        if hasattr(record, 'context'):
-            log_record.update(record.context)
+        log_record.update(context)
+        return _dumps(log_record)
+
+class _DeferredFlushMixin:
+    """Handler mixin that skips the per-record flush so writers can batch."""
+    defer_flush = False
+
+    def flush(self):
+        if not self.defer_flush:
+            super().flush()
+
+    def flush_batch(self):
+        """Flush buffered output regardless of defer_flush."""
+        self.acquire()
+        try:
+            stream = getattr(self, 'stream', None)
+            if stream is not None and hasattr(stream, 'flush') and not getattr(stream, 'closed', False):
+                try:
+                    stream.flush()
+                except (OSError, ValueError):
+                    # Stream closed underneath us, e.g. stdout at interpreter exit
+                    pass
+        finally:
+            self.release()
+
+class BatchStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchRotatingFileHandler(_DeferredFlushMixin, RotatingFileHandler):
+    pass
+
+class BatchTimedRotatingFileHandler(_DeferredFlushMixin, TimedRotatingFileHandler):
+    pass
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token-bucket rate limit per call site for high-frequency messages.
+    
+    Records at or above max_level always pass, as do records of loggers
+    outside the throttled ones. Suppressed records are counted and the
+    count is appended to the next record that passes from the same call
+    site.
+    """
+    def __init__(self, rate: float, burst: int = 5, max_level: int = logging.INFO,
+                 loggers: Optional[Tuple[str, ...]] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        # None throttles every logger; otherwise these and their children
+        self.loggers = tuple(loggers) if loggers is not None else None
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        if self.loggers is not None and not any(
+                record.name == name or record.name.startswith(f"{name}.") for name in self.loggers):
+            return True
+        
+        # Several handlers may share this filter; decide once per record
+        decision = getattr(record, '_rate_limit_pass', None)
+        if decision is not None:
+            return decision
+        record._rate_limit_pass = self._allow(record)
+        return record._rate_limit_pass
+
+    def _allow(self, record) -> bool:
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last, dropped = self._buckets.get(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, dropped + 1)
+                self.suppressed += 1
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
             
-        return json.dumps(log_record)
+        if dropped and isinstance(record.msg, str):
+            record.msg = f"{record.msg} [{dropped} similar messages suppressed]"
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the writer thread.
+    
+    The caller only merges message arguments and enqueues. When the queue
+    is full, records below block_level are dropped and counted instead of
+    blocking the caller; records at or above it wait up to block_timeout
+    for room. The number of records dropped since the last one queued is
+    appended to the next record that gets through.
+    """
+    def __init__(self, log_queue: queue.Queue, block_level: int = logging.WARNING,
+                 block_timeout: float = 1.0):
+        super().__init__(log_queue)
+        self.block_level = block_level
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record):
+        # Only the writer thread consumes the record, so no defensive copy
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        # Runs under the handler lock, so the counters need no lock of their own
+        unreported = self.dropped - self._reported
+        if unreported:
+            record.msg = f"{record.msg} [{unreported} log records dropped]"
+        try:
+            if record.levelno >= self.block_level:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self._reported += unreported
+
+class BatchingQueueListener:
+    """Background writer draining the log queue and flushing once per batch."""
+    _SENTINEL = None
+
+    def __init__(self, log_queue: queue.Queue, handlers: List[logging.Handler],
+                 batch_size: int = 256, flush_interval: float = 0.5):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.records = 0
+
+    def start(self) -> None:
+        for handler in self.handlers:
+            if isinstance(handler, _DeferredFlushMixin):
+                handler.defer_flush = True
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write out everything queued so far and stop the writer thread."""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            self.queue.put(self._SENTINEL)
+            self._thread.join()
+        self._thread = None
+        for handler in self.handlers:
+            if isinstance(handler, _DeferredFlushMixin):
+                handler.defer_flush = False
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch = []
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not self._SENTINEL:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if self._SENTINEL in batch:
+                running = False
+                batch = [r for r in batch if r is not self._SENTINEL]
+                while True:
+                    try:
+                        record = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is not self._SENTINEL:
+                        batch.append(record)
+            try:
+                self._write(batch)
+            except (OSError, ValueError):
+                # A handler's stream was closed, e.g. stdout at interpreter exit;
+                # keep draining so callers blocked on a full queue are released
+                pass
+
+    def _write(self, batch: List[logging.LogRecord]) -> None:
+        for record in batch:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for handler in self.handlers:
+            if isinstance(handler, _DeferredFlushMixin):
+                handler.flush_batch()
+            else:
+                handler.flush()
+        self.batches += 1
+        self.records += len(batch)
 
 DEFAULT_LOGGING_CONFIG = {
     'log_dir': 'logs',
@@ -33,7 +307,15 @@ DEFAULT_LOGGING_CONFIG = {
     'backup_count': 5,
     'console_log': True,
     'file_log': True,
-    'structured_log': False
+    'structured_log': False,
+    'async_log': False,
+    'queue_size': 10000,
+    'block_timeout': 1.0,  # wait for queue room for WARNING and above
+    'batch_size': 256,
+    'flush_interval': 0.5,
+    'rate_limit_per_second': 0,  # 0 disables rate limiting
+    'rate_limit_burst': 5,
+    'rate_limit_loggers': None  # None limits all loggers
 }
 
 class LoggingService:
@@ -45,6 +327,9 @@ class LoggingService:
             config: Logging configuration dictionary
         """
         self.config = {**DEFAULT_LOGGING_CONFIG, **(config or {})}
+        self.listener: Optional[BatchingQueueListener] = None
+        self.queue_handler: Optional[NonBlockingQueueHandler] = None
+        self.rate_limiter: Optional[RateLimitFilter] = None
         self._setup_logging()
 
     def _setup_logging(self) -> None:
@@ -58,18 +343,50 @@ class LoggingService:
             logger.setLevel(self.config['log_level'])
             
             # Clear existing handlers
+            self.shutdown()
             logger.handlers.clear()
+            handlers = []
             
             # Add console handler
             if self.config['console_log']:
-                console_handler = logging.StreamHandler(sys.stdout)
+                stream_class = BatchStreamHandler if self.config['async_log'] else logging.StreamHandler
+                console_handler = stream_class(sys.stdout)
                 console_handler.setFormatter(self._get_formatter())
-                logger.addHandler(console_handler)
+                handlers.append(console_handler)
             
             # Add file handler
             if self.config['file_log']:
                 file_handler = self._get_file_handler()
-                logger.addHandler(file_handler)
+                handlers.append(file_handler)
+                
+            if self.config['rate_limit_per_second']:
+                self.rate_limiter = RateLimitFilter(
+                    self.config['rate_limit_per_second'],
+                    burst=self.config['rate_limit_burst'],
+                    loggers=self.config['rate_limit_loggers']
+                )
+            
+            if self.config['async_log']:
+                # Callers only enqueue; a background thread formats and writes
+                log_queue = queue.Queue(maxsize=self.config['queue_size'])
+                self.queue_handler = NonBlockingQueueHandler(
+                    log_queue, block_timeout=self.config['block_timeout'])
+                if self.rate_limiter:
+                    self.queue_handler.addFilter(self.rate_limiter)
+                logger.addHandler(self.queue_handler)
+                self.listener = BatchingQueueListener(
+                    log_queue,
+                    handlers,
+                    batch_size=self.config['batch_size'],
+                    flush_interval=self.config['flush_interval']
+                )
+                self.listener.start()
+                atexit.register(self.shutdown)
+            else:
+                for handler in handlers:
+                    if self.rate_limiter:
+                        handler.addFilter(self.rate_limiter)
+                    logger.addHandler(handler)
                 
         except Exception as e:
             print(f"CRITICAL: Logging setup failed: {str(e)}")
@@ -88,15 +405,18 @@ class LoggingService:
         """Create configured file handler."""
         log_file = Path(self.config['log_dir']) / self.config['log_file']
         
+        batched = self.config['async_log']
         if self.config.get('rotation') == 'time':
-            handler = TimedRotatingFileHandler(
+            handler_class = BatchTimedRotatingFileHandler if batched else TimedRotatingFileHandler
+            handler = handler_class(
                 filename=log_file,
                 when='midnight',
                 backupCount=self.config['backup_count'],
                 encoding='utf-8'
             )
         else:
-            handler = RotatingFileHandler(
+            handler_class = BatchRotatingFileHandler if batched else RotatingFileHandler
+            handler = handler_class(
                 filename=log_file,
                 maxBytes=self.config['max_bytes'],
                 backupCount=self.config['backup_count'],
@@ -106,6 +426,28 @@ class LoggingService:
         handler.setFormatter(self._get_formatter())
         return handler
 
+    def shutdown(self) -> None:
+        """Drain queued records and stop the background writer, if any."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            
+    def get_stats(self) -> Dict:
+        """
+        Get logging pipeline counters.
+        
+        Returns:
+            Dictionary with queue depth, dropped and suppressed record counts
+        """
+        return {
+            'async': self.listener is not None,
+            'queued': self.queue_handler.queue.qsize() if self.queue_handler else 0,
+            'dropped': self.queue_handler.dropped if self.queue_handler else 0,
+            'suppressed': self.rate_limiter.suppressed if self.rate_limiter else 0,
+            'batches_written': self.listener.batches if self.listener else 0,
+            'records_written': self.listener.records if self.listener else 0
+        }
+
     def get_logger(self, name: str = None) -> logging.Logger:
         """
         Get configured logger instance.
@@ -125,9 +467,18 @@ class LoggingService:
         
         Args:
             operation: Operation description
-            context: Additional context data
+            context: Additional context data, or a callable returning it
+                that is only invoked if the record will be emitted
             level: Log level
         """
         logger = self.get_logger(__name__)
-        log_method = getattr(logger, level.lower(), logger.info)
-        log_method(operation, extra={'context': context or {}})
\ No newline at end of file
+        level_no = logging.getLevelName(level.upper())
+        if not isinstance(level_no, int):
+            level_no = logging.INFO
+            
+        # Skip building context for records the level filter would drop
+        if not logger.isEnabledFor(level_no):
+            return
+        if callable(context):
+            context = context()
+        logger.log(level_no, operation, extra={'context': context or {}})
\ No newline at end of file
@@ -0,0 +1,156 @@
+import os
+import uuid
+import shutil
+import logging
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import cv2
+
+from services.file_service import FileService
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyService:
+    def __init__(self, file_service: FileService, ffmpeg_path: str = "ffmpeg",
+                 max_dimension: int = 640, gop: int = 60, crf: int = 28,
+                 preset: str = "veryfast", workers: int = 1, timeout: float = 3600.0):
+        """
+        Initialize background proxy transcoding.
+
+        Each upload is transcoded once into a low-resolution H.264 proxy
+        with a keyframe on every gop-th frame, stored next to the original
+        in the upload folder. Frame timing is passed through unchanged, so
+        frame numbers in the proxy match the original and analyses of
+        either can be compared. Until a proxy is ready the original is used.
+
+        Args:
+            file_service: FileService storing the uploads
+            ffmpeg_path: ffmpeg executable
+            max_dimension: Longest side of the proxy in pixels; smaller
+                videos keep their resolution
+            gop: Keyframe interval of the proxy in frames; the keyframes
+                fall on frames gop, 2 * gop, ... counted from 1, as taken by
+                VideoProcessor with the same keyframe interval
+            crf: x264 constant rate factor
+            preset: x264 speed preset
+            workers: Concurrent transcodes
+            timeout: Seconds after which a transcode is killed
+        """
+        self.file_service = file_service
+        self.ffmpeg_path = ffmpeg_path
+        self.max_dimension = max_dimension
+        self.gop = gop
+        self.crf = crf
+        self.preset = preset
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proxy")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {'transcoded': 0, 'failed': 0, 'source_bytes': 0, 'proxy_bytes': 0}
+
+    @property
+    def available(self) -> bool:
+        return shutil.which(self.ffmpeg_path) is not None
+
+    def submit(self, video_path: str) -> Optional[Future]:
+        """
+        Queue a proxy transcode of a stored upload.
+
+        Args:
+            video_path: Stored upload
+
+        Returns:
+            Future resolving to the proxy path (None on failure), or None
+            if a current proxy exists or ffmpeg is not installed
+        """
+        if self._is_current(video_path):
+            return None
+        if not self.available:
+            logger.warning("ffmpeg not found, analyzing uploads without a proxy")
+            return None
+        with self._lock:
+            future = self._pending.get(video_path)
+            if future is not None:
+                return future
+            # Released by _forget once the transcode is done
+            self.file_service.pin(video_path)
+            future = self._executor.submit(self._transcode, video_path)
+            self._pending[video_path] = future
+        # Outside the lock: runs immediately if the transcode already finished
+        future.add_done_callback(lambda _: self._forget(video_path))
+        return future
+
+    def resolve(self, video_path: str) -> str:
+        """Return the proxy of a stored upload if it is ready, else the upload itself."""
+        if self._is_current(video_path):
+            return self.file_service.proxy_path(video_path)
+        return video_path
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
+
+    def _is_current(self, video_path: str) -> bool:
+        proxy_path = self.file_service.proxy_path(video_path)
+        try:
+            return os.path.getmtime(proxy_path) >= os.path.getmtime(video_path)
+        except OSError:
+            return False
+
+    def _forget(self, video_path: str) -> None:
+        with self._lock:
+            self._pending.pop(video_path, None)
+        self.file_service.unpin(video_path)
+
+    def _transcode(self, video_path: str) -> Optional[str]:
+        tmp_path = self.file_service.incoming_path(f"{uuid.uuid4().hex}.proxy.mp4")
+        scale = f"min(1,{self.max_dimension}/max(iw,ih))"
+        command = [
+            self.ffmpeg_path, '-nostdin', '-v', 'error', '-y', '-i', video_path,
+            '-map', '0:v:0', '-an', '-sn',
+            '-vf', f"scale=w='trunc({scale}*iw/2)*2':h='trunc({scale}*ih/2)*2'",
+            '-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+            # Frame 0 is always an I-frame; the others sit on the sampled frames
+            '-force_key_frames', f"expr:eq(mod(n+1,{self.gop}),0)",
+            '-g', str(self.gop), '-sc_threshold', '0', '-bf', '0',
+            '-pix_fmt', 'yuv420p', '-vsync', 'passthrough', '-movflags', '+faststart', tmp_path
+        ]
+        try:
+            completed = subprocess.run(command, capture_output=True, timeout=self.timeout)
+            if completed.returncode != 0:
+                raise RuntimeError(completed.stderr.decode(errors='replace').strip())
+            if not self._is_decodable(tmp_path):
+                raise RuntimeError("Proxy has no decodable frames")
+            proxy_bytes = os.path.getsize(tmp_path)
+            proxy_path = self.file_service.attach_proxy(video_path, tmp_path)
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            # run() has already killed ffmpeg when it timed out
+            logger.error(f"Proxy transcode of {video_path} failed: {str(e)}")
+            with self._lock:
+                self._stats['failed'] += 1
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+        if proxy_path is not None:
+            source_bytes = os.path.getsize(video_path)
+            with self._lock:
+                self._stats['transcoded'] += 1
+                self._stats['source_bytes'] += source_bytes
+                self._stats['proxy_bytes'] += proxy_bytes
+            logger.info(f"Proxy of {video_path} ready ({source_bytes} -> {proxy_bytes} bytes)")
+        return proxy_path
+
+    @staticmethod
+    def _is_decodable(path: str) -> bool:
+        cap = cv2.VideoCapture(path)
+        try:
+            return cap.isOpened() and cap.grab()
+        finally:
+            cap.release()
@@ -0,0 +1,132 @@
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.detection import CheatingDetector
+from core.identity import IdentityTracker
+from services.feature_store import FeatureStore
+from core.exceptions import AnalysisServiceError
+
+logger = logging.getLogger(__name__)
+
+# Per-face lookaway rule of each stored feature, matching CheatingDetector
+LOOKAWAY_RULES = {
+    'eye_nose_ratios': lambda values, t: values < t['lookaway_eye_nose_ratio'],
+    'nose_symmetry_ratios': lambda values, t: values < t['lookaway_nose_symmetry'],
+    'gaze_offsets': lambda values, t: np.abs(values) > t['gaze_offset_threshold']
+}
+
+
+class RescoringService:
+    def __init__(self, cheating_detector: CheatingDetector, feature_store: FeatureStore,
+                 identity_reference_frames: int = 5, identity_min_change_frames: int = 3):
+        """
+        Initialize rescoring service.
+
+        Args:
+            cheating_detector: Detector whose compile_results rules are reapplied
+            feature_store: Store holding per-frame features of past analyses
+            identity_reference_frames: IdentityTracker setting used by the analyses
+            identity_min_change_frames: IdentityTracker setting used by the analyses
+        """
+        self.detector = cheating_detector
+        self.feature_store = feature_store
+        self.identity_reference_frames = identity_reference_frames
+        self.identity_min_change_frames = identity_min_change_frames
+
+    def rescore(self, thresholds: Optional[Dict] = None,
+                video_ids: Optional[List[str]] = None) -> Dict:
+        """
+        Recompute verdicts for stored analyses under new thresholds.
+
+        Per-video counts are aggregated for all stored videos at once with
+        NumPy; only the final verdict per video goes through
+        CheatingDetector.compile_results. Identity changes are found by
+        replaying IdentityTracker over each video's stored face descriptors.
+
+        Args:
+            thresholds: Threshold overrides (see DEFAULT_THRESHOLDS)
+            video_ids: Optional subset of videos to rescore
+
+        Returns:
+            Dictionary with per-video verdicts and a summary
+
+        Raises:
+            AnalysisServiceError: If rescoring fails
+        """
+        try:
+            thresholds = {**self.detector.thresholds, **(thresholds or {})}
+            counts = self._aggregate(thresholds)
+
+            results = {}
+            for index, video_id in enumerate(counts['video_ids']):
+                if video_ids is not None and video_id not in video_ids:
+                    continue
+                raw_results = {
+                    'total_frames': int(counts['total_frames'][index]),
+                    'processed_frames': int(counts['processed_frames'][index]),
+                    'face_detections': int(counts['face_detections'][index]),
+                    'lookaway_count': int(counts['lookaway_count'][index]),
+                    'multiple_faces': int(counts['multiple_faces'][index])
+                }
+                if counts['unusable_frames'][index]:
+                    raw_results['quality_skipped_frames'] = int(counts['unusable_frames'][index])
+                if counts['object_frames'][index]:
+                    raw_results['object_frames'] = int(counts['object_frames'][index])
+                raw_results.update(self._identity_results(video_id, thresholds))
+                cheating_detected, details = self.detector.compile_results(raw_results, thresholds)
+                results[video_id] = {'cheating_detected': cheating_detected, **details}
+
+            flagged = sum(1 for r in results.values() if r['cheating_detected'])
+            logger.info(f"Rescored {len(results)} analyses, {flagged} flagged")
+            return {
+                'thresholds': thresholds,
+                'results': results,
+                'summary': {
+                    'total_analyses': len(results),
+                    'cheating_detected': flagged
+                }
+            }
+        except Exception as e:
+            logger.error(f"Rescoring failed: {str(e)}")
+            raise AnalysisServiceError("rescore", "aggregation", str(e))
+
+    def _identity_results(self, video_id: str, thresholds: Dict) -> Dict:
+        """Identity statistics of a video under the thresholds; empty without descriptors."""
+        stored = self.feature_store.load_descriptors(video_id)
+        if stored is None:
+            return {}
+        frames, descriptors = stored
+        tracker = IdentityTracker(thresholds['identity_distance_threshold'],
+                                  self.identity_reference_frames,
+                                  self.identity_min_change_frames)
+        # Like the analysis pass, only keyframes with a single face are compared
+        numbers, starts, faces = np.unique(frames, return_index=True, return_counts=True)
+        for number, start in zip(numbers[faces == 1], starts[faces == 1]):
+            tracker.update({'frame_number': int(number), 'face_descriptors': [descriptors[start]]})
+        return tracker.get_stats()
+
+    def _aggregate(self, thresholds: Dict) -> Dict:
+        """Vectorized per-video counts from the concatenated feature arrays."""
+        data = self.feature_store.load_all()
+        n_videos = len(data['video_ids'])
+        frame_video = data['frame_video']
+
+        lookaway_count = np.zeros(n_videos, dtype=np.int64)
+        for key, (values, face_video) in data['face_features'].items():
+            lookaways = LOOKAWAY_RULES[key](values, thresholds)
+            lookaway_count += np.bincount(face_video[lookaways], minlength=n_videos)
+        multi = (data['dlib_faces'] > 1) | (data['opencv_faces'] > 1)
+
+        return {
+            'video_ids': data['video_ids'],
+            'total_frames': data['total_frames'],
+            'unusable_frames': data['unusable_frames'],
+            'object_frames': data['object_frames'],
+            'processed_frames': np.bincount(frame_video, minlength=n_videos),
+            'face_detections': np.bincount(
+                frame_video, weights=data['dlib_faces'], minlength=n_videos).astype(np.int64),
+            'lookaway_count': lookaway_count,
+            'multiple_faces': np.bincount(frame_video[multi], minlength=n_videos)
+        }
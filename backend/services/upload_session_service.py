@@ -0,0 +1,341 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+from core.exceptions import FileSystemError
+from services.file_service import FileService, CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+SESSION_EXT = ".session.json"
+
+
+class UploadOffsetError(Exception):
+    """A chunk did not start at the session's current offset."""
+
+    def __init__(self, session_id: str, expected: int, received: int):
+        self.session_id = session_id
+        self.expected = expected
+        self.received = received
+        super().__init__(f"Upload {session_id} is at offset {expected}, chunk starts at {received}")
+
+
+class UploadSession:
+    """
+    One in-progress chunked upload, readable while it is being written.
+
+    Chunks are appended to a partial file on the upload volume and hashed
+    as they arrive. Readers tailing the file wait on the session for more
+    data, completion or abort.
+    """
+
+    def __init__(self, session_id: str, filename: str, path: str,
+                 total_size: Optional[int] = None, created: Optional[float] = None,
+                 priority: int = 0):
+        self.session_id = session_id
+        self.filename = filename
+        self.path = path
+        self.total_size = total_size
+        self.priority = priority
+        self.created = created or time.time()
+        self.last_activity = time.time()
+        self.video_id: Optional[str] = None
+        self.analysis = None
+        self._offset = os.path.getsize(path) if os.path.exists(path) else 0
+        self._hash = None
+        self._hashed = 0
+        self._complete = False
+        self._aborted = False
+        self._condition = threading.Condition()
+
+    @property
+    def offset(self) -> int:
+        """Bytes received so far; the next chunk must start here."""
+        return self._offset
+
+    def is_complete(self) -> bool:
+        return self._complete
+
+    def is_aborted(self) -> bool:
+        return self._aborted
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last chunk arrived."""
+        return time.time() - self.last_activity
+
+    def wait_for_data(self, known_size: int, min_bytes: int = 0, timeout: float = 1.0) -> None:
+        """
+        Block until the file grew by min_bytes past known_size, or the
+        upload completed or was aborted, or timeout seconds passed.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: (self._complete or self._aborted
+                         or self._offset >= known_size + max(1, min_bytes)),
+                timeout=timeout)
+
+    def to_dict(self) -> Dict:
+        return {
+            'session_id': self.session_id,
+            'filename': self.filename,
+            'offset': self._offset,
+            'total_size': self.total_size,
+            'complete': self._complete,
+            'video_id': self.video_id
+        }
+
+    def _append(self, offset: int, chunk) -> int:
+        with self._condition:
+            if self._complete or self._aborted:
+                raise ValueError(f"Upload {self.session_id} is closed")
+            if offset != self._offset:
+                raise UploadOffsetError(self.session_id, self._offset, offset)
+            digest = self._digest()
+            with open(self.path, 'ab') as f:
+                while True:
+                    data = chunk.read(CHUNK_SIZE)
+                    if not data:
+                        break
+                    f.write(data)
+                    digest.update(data)
+                    self._offset += len(data)
+                    self._hashed = self._offset
+            self.last_activity = time.time()
+            self._condition.notify_all()
+            return self._offset
+
+    def _finish(self) -> str:
+        with self._condition:
+            if self.total_size is not None and self._offset != self.total_size:
+                raise ValueError(f"Upload {self.session_id} has {self._offset} of {self.total_size} bytes")
+            self.video_id = self._digest().hexdigest()
+            self._complete = True
+            self._condition.notify_all()
+            return self.video_id
+
+    def _abort(self) -> None:
+        with self._condition:
+            self._aborted = True
+            self._condition.notify_all()
+
+    def _digest(self):
+        """Running SHA-256, rebuilt from disk after a restart."""
+        if self._hash is None or self._hashed != self._offset:
+            self._hash = hashlib.sha256()
+            with open(self.path, 'ab+') as f:
+                f.seek(0)
+                for data in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    self._hash.update(data)
+            self._hashed = self._offset
+        return self._hash
+
+
+class UploadSessionService:
+    def __init__(self, file_service: FileService, max_idle_seconds: float = 24 * 3600,
+                 expiry_interval: Optional[float] = None):
+        """
+        Initialize resumable chunked upload service.
+
+        Partial files live next to stored uploads so a finished upload is
+        adopted into content-addressed storage with a rename. Session
+        metadata is written beside each partial file, so uploads survive
+        a server restart and resume at the offset already on disk.
+
+        Args:
+            file_service: FileService that stores finished uploads
+            max_idle_seconds: Sessions without a chunk for this long are discarded
+            expiry_interval: If set, idle sessions are expired by a
+                background thread this often, not only when a session opens
+        """
+        self.file_service = file_service
+        self.max_idle_seconds = max_idle_seconds
+        self._sessions: Dict[str, UploadSession] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._expiry_thread = None
+        if expiry_interval:
+            self._expiry_thread = threading.Thread(
+                target=self._expire_periodically, args=(expiry_interval,),
+                name="upload_expiry", daemon=True)
+            self._expiry_thread.start()
+
+    def create(self, filename: str, total_size: Optional[int] = None,
+               priority: int = 0) -> UploadSession:
+        """
+        Open a new upload session.
+
+        Args:
+            filename: Original filename, used for the extension
+            total_size: Expected size in bytes, checked on completion
+            priority: Scheduling priority of the upload's analysis
+
+        Returns:
+            New UploadSession
+
+        Raises:
+            FileSystemError: If the extension is not allowed
+        """
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in self.file_service.allowed_extensions:
+            raise FileSystemError(
+                operation="upload_session",
+                path=filename,
+                message=f"Extension {ext} not allowed",
+                error_code=5002
+            )
+        self.expire_idle()
+
+        session_id = uuid.uuid4().hex
+        path = self.file_service.incoming_path(f"{session_id}{ext}")
+        open(path, 'wb').close()
+        session = UploadSession(session_id, filename, path, total_size, priority=priority)
+        self._write_metadata(session)
+        with self._lock:
+            self._sessions[session_id] = session
+        logger.info(f"Opened upload session {session_id} for {filename}")
+        return session
+
+    def get(self, session_id: str) -> Optional[UploadSession]:
+        """Return a session, reloading it from disk after a restart."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None or not session_id.isalnum():
+                return session
+            metadata_path = self.file_service.incoming_path(f"{session_id}{SESSION_EXT}")
+            try:
+                with open(metadata_path) as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError):
+                return None
+            if not os.path.exists(metadata['path']):
+                return None
+            session = UploadSession(session_id, metadata['filename'], metadata['path'],
+                                    metadata.get('total_size'), metadata.get('created'),
+                                    metadata.get('priority', 0))
+            self._sessions[session_id] = session
+            logger.info(f"Restored upload session {session_id} at offset {session.offset}")
+            return session
+
+    def append(self, session_id: str, offset: int, chunk) -> int:
+        """
+        Append a chunk at offset.
+
+        Args:
+            session_id: Upload session ID
+            offset: Byte offset the chunk starts at
+            chunk: Readable binary stream with the chunk data
+
+        Returns:
+            New offset
+
+        Raises:
+            KeyError: If the session does not exist
+            UploadOffsetError: If offset is not the session's current offset
+        """
+        session = self._require(session_id)
+        try:
+            return session._append(offset, chunk)
+        except OSError as e:
+            raise FileSystemError(
+                operation="upload_append",
+                path=session.path,
+                message=str(e),
+                error_code=5010
+            )
+
+    def complete(self, session_id: str) -> UploadSession:
+        """
+        Mark an upload as fully received.
+
+        Readers tailing the file see the completion; the file itself is
+        moved into storage by finalize() once they are done with it.
+
+        Raises:
+            KeyError: If the session does not exist
+            ValueError: If fewer bytes than announced were received
+        """
+        session = self._require(session_id)
+        session._finish()
+        logger.info(f"Upload {session_id} complete ({session.offset} bytes)")
+        return session
+
+    def finalize(self, session_id: str) -> str:
+        """
+        Move a completed upload into content-addressed storage.
+
+        Returns:
+            Path of the stored file
+        """
+        session = self._require(session_id)
+        if not session.is_complete():
+            raise ValueError(f"Upload {session_id} is not complete")
+        stored_path = self.file_service.adopt_file(session.path, session.filename, session.video_id)
+        self._forget(session)
+        return stored_path
+
+    def abort(self, session_id: str) -> None:
+        """Cancel an upload and delete its partial file."""
+        session = self._require(session_id)
+        session._abort()
+        self._forget(session)
+        if os.path.exists(session.path):
+            os.remove(session.path)
+        logger.info(f"Upload {session_id} aborted")
+
+    def expire_idle(self) -> int:
+        """Abort sessions idle for longer than max_idle_seconds."""
+        cutoff = time.time() - self.max_idle_seconds
+        with self._lock:
+            idle = [s.session_id for s in self._sessions.values()
+                    if s.last_activity < cutoff and not s.is_complete()]
+        for session_id in idle:
+            try:
+                self.abort(session_id)
+            except KeyError:
+                # Finished or aborted by a request meanwhile
+                pass
+        if idle:
+            logger.info(f"Expired {len(idle)} idle upload sessions")
+        return len(idle)
+
+    def close(self) -> None:
+        """Stop the background expiry thread."""
+        self._stop.set()
+        if self._expiry_thread is not None:
+            self._expiry_thread.join()
+
+    def _expire_periodically(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.expire_idle()
+            except Exception as e:
+                logger.error(f"Upload session expiry failed: {str(e)}")
+
+    def _require(self, session_id: str) -> UploadSession:
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def _forget(self, session: UploadSession) -> None:
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+        metadata_path = self.file_service.incoming_path(f"{session.session_id}{SESSION_EXT}")
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+
+    def _write_metadata(self, session: UploadSession) -> None:
+        metadata_path = self.file_service.incoming_path(f"{session.session_id}{SESSION_EXT}")
+        with open(metadata_path, 'w') as f:
+            json.dump({
+                'filename': session.filename,
+                'path': session.path,
+                'total_size': session.total_size,
+                'created': session.created,
+                'priority': session.priority
+            }, f)
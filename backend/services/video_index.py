@@ -0,0 +1,228 @@
+import os
+import json
+import bisect
+import shutil
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_EXT = ".index.json"
+INDEX_VERSION = 1
+
+
+class VideoIndex:
+    """Presentation timestamps of every frame and of the decodable keyframes."""
+
+    def __init__(self, timestamps: List[float], keyframe_times: List[float], source: Optional[Dict] = None):
+        """
+        Args:
+            timestamps: Frame presentation times in seconds
+            keyframe_times: Presentation times of keyframes (I-frames); empty
+                when the container does not say which frames are keyframes
+            source: Size and mtime of the indexed file
+        """
+        self.timestamps = sorted(timestamps)
+        self.keyframe_times = sorted(keyframe_times)
+        self.source = source or {}
+        self._keyframe_frames = [self.frame_at(t) for t in self.keyframe_times]
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def start_time(self) -> float:
+        return self.timestamps[0] if self.timestamps else 0.0
+
+    @property
+    def end_time(self) -> float:
+        return self.timestamps[-1] if self.timestamps else 0.0
+
+    @property
+    def average_fps(self) -> float:
+        span = self.end_time - self.start_time
+        return (self.frame_count - 1) / span if span > 0 else 30.0
+
+    def is_variable_frame_rate(self, tolerance: float = 0.2, max_outliers: float = 0.05) -> bool:
+        """
+        True if more than max_outliers of the frame durations differ from
+        the median duration by more than tolerance.
+        """
+        if self.frame_count < 3:
+            return False
+        durations = np.diff(np.asarray(self.timestamps, dtype=np.float64))
+        median = float(np.median(durations))
+        if median <= 0:
+            return True
+        outliers = np.abs(durations - median) > tolerance * median
+        return float(outliers.mean()) > max_outliers
+
+    def frame_at(self, time_seconds: float) -> int:
+        """Index of the first frame shown at or after time_seconds, clamped to the last frame."""
+        return min(bisect.bisect_left(self.timestamps, time_seconds - 1e-6), self.frame_count - 1)
+
+    def nearest_frame(self, time_seconds: float) -> int:
+        """Index of the frame whose timestamp is closest to time_seconds."""
+        position = bisect.bisect_left(self.timestamps, time_seconds)
+        if position == 0:
+            return 0
+        if position >= self.frame_count:
+            return self.frame_count - 1
+        before, after = self.timestamps[position - 1], self.timestamps[position]
+        return position if after - time_seconds < time_seconds - before else position - 1
+
+    def keyframe_before(self, frame: int) -> Optional[int]:
+        """Index of the last keyframe at or before frame, or None if unknown."""
+        position = bisect.bisect_right(self._keyframe_frames, frame)
+        return self._keyframe_frames[position - 1] if position else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': INDEX_VERSION,
+            'source': self.source,
+            'timestamps': self.timestamps,
+            'keyframe_times': self.keyframe_times
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'VideoIndex':
+        return cls(data['timestamps'], data['keyframe_times'], data.get('source'))
+
+
+class VideoIndexService:
+    def __init__(self, cache_root: str, ffprobe_path: str = "ffprobe", memory_entries: int = 32):
+        """
+        Initialize per-file frame timestamp and keyframe index.
+
+        Each file is probed once: ffprobe lists every video packet's
+        presentation timestamp and keyframe flag without decoding. When
+        ffprobe is missing, timestamps are collected with an OpenCV pass
+        instead and keyframes are left unknown. Indexes are kept on disk
+        next to the keyframe cache and in a small in-memory LRU.
+
+        Args:
+            cache_root: Directory for index files
+            ffprobe_path: ffprobe executable
+            memory_entries: Indexes kept in memory
+        """
+        self.cache_root = Path(cache_root)
+        self.cache_root.mkdir(parents=True, exist_ok=True)
+        self.ffprobe_path = ffprobe_path
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, VideoIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def probe_available(self) -> bool:
+        """True if files can be indexed with ffprobe, without decoding frames."""
+        return shutil.which(self.ffprobe_path) is not None
+
+    def get(self, video_path: str) -> VideoIndex:
+        """
+        Return the index of a file, probing it on first use.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            VideoIndex of the file
+        """
+        key = Path(video_path).stem
+        source = self._fingerprint(video_path)
+        with self._lock:
+            index = self._memory.get(key)
+            if index is not None and index.source == source:
+                self._memory.move_to_end(key)
+                return index
+
+        index = self._load(key, source)
+        if index is None:
+            index = self._probe(video_path, source)
+            self._save(key, index)
+
+        with self._lock:
+            self._memory[key] = index
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+        return index
+
+    def _probe(self, video_path: str, source: Dict) -> VideoIndex:
+        if self.probe_available:
+            index = self._probe_ffprobe(video_path, source)
+            if index is not None:
+                return index
+        return self._probe_opencv(video_path, source)
+
+    def _probe_ffprobe(self, video_path: str, source: Dict) -> Optional[VideoIndex]:
+        command = [
+            self.ffprobe_path, '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path
+        ]
+        try:
+            output = subprocess.run(command, capture_output=True, check=True, timeout=300).stdout
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"ffprobe failed for {video_path}: {str(e)}")
+            return None
+
+        timestamps = []
+        keyframe_times = []
+        for line in output.decode(errors='replace').splitlines():
+            pts, _, flags = line.partition(',')
+            try:
+                pts_time = float(pts)
+            except ValueError:
+                # Packets without a presentation timestamp
+                continue
+            timestamps.append(pts_time)
+            if 'K' in flags:
+                keyframe_times.append(pts_time)
+        if not timestamps:
+            return None
+        logger.info(f"Probed {video_path}: {len(timestamps)} frames, {len(keyframe_times)} keyframes")
+        return VideoIndex(timestamps, keyframe_times, source)
+
+    def _probe_opencv(self, video_path: str, source: Dict) -> VideoIndex:
+        cap = cv2.VideoCapture(video_path)
+        timestamps = []
+        try:
+            while cap.grab():
+                timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+        finally:
+            cap.release()
+        logger.info(f"Indexed {video_path} by decoding: {len(timestamps)} frames")
+        return VideoIndex(timestamps, [], source)
+
+    def _load(self, key: str, source: Dict) -> Optional[VideoIndex]:
+        path = self.cache_root / f"{key}{INDEX_EXT}"
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION or data.get('source') != source:
+            return None
+        return VideoIndex.from_dict(data)
+
+    def _save(self, key: str, index: VideoIndex) -> None:
+        path = self.cache_root / f"{key}{INDEX_EXT}"
+        tmp_path = self.cache_root / f".{key}{INDEX_EXT}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(index.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not store video index for {key}: {str(e)}")
+
+    @staticmethod
+    def _fingerprint(video_path: str) -> Dict:
+        stat = os.stat(video_path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
@@ -0,0 +1,59 @@
+import stat
+import sys
+import threading
+from concurrent.futures import Future
+
+from core.audio_analyzer import AudioAnalyzer, collect_audio_results, merge_audio_results
+
+TALKING = {'available': True, 'speech_ratio': 0.5, 'talking_detected': True,
+           'multiple_speakers_suspected': False}
+
+
+def fake_ffmpeg(tmp_path, stderr_bytes: int, pcm_bytes: int) -> str:
+    # Writes more to stderr than a pipe buffer holds before any audio
+    script = tmp_path / "ffmpeg"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"sys.stderr.write('w' * {stderr_bytes})\n"
+        "sys.stderr.flush()\n"
+        f"sys.stdout.buffer.write(b'\\x00\\x01' * {pcm_bytes // 2})\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_noisy_ffmpeg_stderr_does_not_block(tmp_path):
+    analyzer = AudioAnalyzer(ffmpeg_path=fake_ffmpeg(tmp_path, 1 << 20, 64000))
+    results = []
+    thread = threading.Thread(target=lambda: results.append(analyzer.analyze("exam.mp4")), daemon=True)
+    thread.start()
+    thread.join(30)
+
+    assert not thread.is_alive()
+    assert results[0]['available']
+    assert results[0]['duration'] > 1.9
+
+
+def test_audio_is_reported_without_changing_the_verdict():
+    details = {'reasons': ["No cheating detected"]}
+    cheating_detected, merged = merge_audio_results(False, details, TALKING)
+
+    assert not cheating_detected
+    assert merged['audio'] == TALKING
+    assert merged['reasons'] == ["No cheating detected"]
+
+
+def test_audio_can_flag_the_video():
+    details = {'reasons': ["No cheating detected"]}
+    cheating_detected, merged = merge_audio_results(False, details, TALKING, affects_verdict=True)
+
+    assert cheating_detected
+    assert merged['reasons'] == ["Talking detected (50.0% of audio)"]
+
+
+def test_failed_audio_analysis_is_dropped():
+    future = Future()
+    future.set_exception(RuntimeError("ffmpeg crashed"))
+
+    assert collect_audio_results(future) is None
+    assert collect_audio_results(None) is None
@@ -0,0 +1,90 @@
+import time
+import threading
+
+import numpy as np
+
+from services.checkpoint_store import CheckpointStore
+from services.feature_store import FrameFeatureRecorder
+
+
+def test_checkpoint_round_trip(tmp_path):
+    video = tmp_path / "exam.mp4"
+    video.write_bytes(b"frames")
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+
+    store.save("exam", str(video), {'frame_counter': 60})
+    assert store.load("exam", str(video)) == {'frame_counter': 60}
+    assert store.list_videos() == ["exam"]
+
+    video.write_bytes(b"other frames")
+    assert store.load("exam", str(video)) is None
+
+
+def test_concurrent_saves_leave_a_complete_checkpoint(tmp_path):
+    video = tmp_path / "exam.mp4"
+    video.write_bytes(b"frames")
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+
+    def save_many(writer):
+        for i in range(50):
+            store.save("exam", str(video), {'frame_counter': i, 'writer': writer})
+
+    threads = [threading.Thread(target=save_many, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.load("exam", str(video))['frame_counter'] == 49
+    assert not list((tmp_path / "checkpoints").glob("*.tmp"))
+
+
+def test_lock_admits_one_analysis_per_video(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    events = []
+
+    def analyze(name):
+        with store.lock("exam"):
+            events.append(f"{name} start")
+            time.sleep(0.05)
+            events.append(f"{name} end")
+
+    threads = [threading.Thread(target=analyze, args=(n,)) for n in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert events[0][0] == events[1][0]
+    assert events[2][0] == events[3][0]
+
+
+def test_row_files_append_and_drop_rows_past_the_checkpoint(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    first = np.arange(6, dtype=np.float32).reshape(2, 3)
+    offset = store.append_rows("exam", "descriptors", first, 0)
+    # Rows written before a crash, but never covered by a checkpoint
+    store.append_rows("exam", "descriptors", np.full((4, 3), -1, np.float32), offset)
+
+    offset = store.append_rows("exam", "descriptors", np.ones((1, 3), np.float32), offset)
+    rows = store.load_rows("exam", "descriptors", np.float32, offset, 3)
+    assert offset == 3
+    assert rows.tolist() == first.tolist() + [[1.0, 1.0, 1.0]]
+    assert store.load_rows("exam", "descriptors", np.float32, 4, 3) is None
+
+    store.delete("exam")
+    assert not list((tmp_path / "checkpoints").glob("*.rows"))
+
+
+def test_recorder_checkpoint_leaves_descriptors_out():
+    recorder = FrameFeatureRecorder()
+    for frame_number in (30, 60):
+        recorder.add({'frame_number': frame_number, 'face_detections': 1,
+                      'face_descriptors': [[0.5] * 128]})
+
+    state = recorder.get_state(include_descriptors=False)
+    assert 'descriptors' not in state
+    assert state['descriptor_count'] == 2 and state['descriptor_width'] == 128
+    frames, descriptors = recorder.descriptors_since(1)
+    assert frames.tolist() == [60]
+    assert descriptors.shape == (1, 128)
@@ -0,0 +1,30 @@
+import cv2
+import numpy as np
+
+from core.deduplication import FrameDeduplicator
+
+
+def exam_frame(seed: int) -> np.ndarray:
+    frame = np.full((1080, 1920, 3), 120, dtype=np.uint8)
+    cv2.rectangle(frame, (800, 300), (1100, 700), (180, 150, 130), -1)
+    noise = np.random.default_rng(seed).normal(0, 4, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def test_sensor_noise_is_a_duplicate():
+    deduplicator = FrameDeduplicator(0.98)
+    assert deduplicator.lookup(exam_frame(0), 0) is None
+    deduplicator.update({'frame_number': 0})
+
+    assert deduplicator.lookup(exam_frame(1), 60) == {'frame_number': 60}
+
+
+def test_small_second_face_is_not_a_duplicate():
+    deduplicator = FrameDeduplicator(0.98)
+    deduplicator.lookup(exam_frame(0), 0)
+    deduplicator.update({'frame_number': 0})
+    frame = exam_frame(1)
+    cv2.circle(frame, (1750, 150), 35, (200, 170, 150), -1)
+
+    assert deduplicator.lookup(frame, 60) is None
+    assert deduplicator.duplicate_frames == 0
@@ -0,0 +1,29 @@
+import numpy as np
+
+from core.objects import EscalationPolicy
+
+# Light skin tone, (R, G, B) = (224, 172, 140), in OpenCV's BGR order
+SKIN_BGR = (140, 172, 224)
+FACE_BOX = (280, 120, 360, 220)
+
+
+def frame_with_hands(color) -> np.ndarray:
+    frame = np.full((480, 640, 3), 40, dtype=np.uint8)
+    x1, y1, x2, y2 = FACE_BOX
+    # Hands filling the band beside and below the face
+    frame[y1:y2 + 100, x1 - 80:x2 + 80] = color
+    return frame
+
+
+def test_hands_fire_on_bgr_skin():
+    policy = EscalationPolicy(triggers=('hands',))
+    fired = policy.evaluate(frame_with_hands(SKIN_BGR), {'face_boxes': [FACE_BOX]})
+
+    assert fired == ['hands']
+
+
+def test_hands_do_not_fire_on_non_skin():
+    policy = EscalationPolicy(triggers=('hands',))
+    fired = policy.evaluate(frame_with_hands((200, 120, 40)), {'face_boxes': [FACE_BOX]})
+
+    assert fired == []
@@ -0,0 +1,92 @@
+import io
+import os
+
+import pytest
+
+from services.file_service import FileService
+
+
+@pytest.fixture
+def file_service(tmp_path):
+    # Room for two of the 100-byte test files
+    return FileService(str(tmp_path / "uploads"), max_bytes=250)
+
+
+def save(file_service, content: bytes, **kwargs) -> str:
+    return file_service.save_uploaded_file(io.BytesIO(content * 100), "exam.mp4", **kwargs)
+
+
+def test_quota_evicts_least_recently_used(file_service):
+    first = save(file_service, b"a")
+    second = save(file_service, b"b")
+    third = save(file_service, b"c")
+
+    assert not os.path.exists(first)
+    assert os.path.exists(second) and os.path.exists(third)
+
+
+def test_pinned_files_are_not_evicted(file_service):
+    first = save(file_service, b"a", pin=True)
+    second = save(file_service, b"b")
+    third = save(file_service, b"c")
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+
+    file_service.unpin(first)
+    save(file_service, b"d")
+    assert not os.path.exists(first)
+    assert os.path.exists(third)
+
+
+def test_pin_sources_protect_files_of_queued_jobs(file_service):
+    first = save(file_service, b"a")
+    queued = [first]
+    file_service.add_pin_source(lambda: queued)
+    second = save(file_service, b"b")
+    save(file_service, b"c")
+
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+
+
+def test_attached_proxy_counts_against_quota(file_service):
+    first = save(file_service, b"a")
+    second = save(file_service, b"b")
+    tmp_path = os.path.join(file_service.upload_root, "proxy.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(b"p" * 80)
+
+    proxy = file_service.attach_proxy(second, tmp_path)
+
+    assert os.path.exists(proxy) and os.path.exists(second)
+    assert not os.path.exists(first)
+
+
+def test_processes_sharing_uploads_keep_each_others_references(tmp_path):
+    api = FileService(str(tmp_path / "uploads"))
+    worker = FileService(str(tmp_path / "uploads"))
+    path = save(api, b"a")
+    assert save(worker, b"a") == path
+    other = save(worker, b"b")
+
+    api.delete_file(path)
+    assert os.path.exists(path)
+    worker.delete_file(path)
+    assert not os.path.exists(path)
+    assert api.get_stats()['files'] == 1
+    assert os.path.exists(other)
+
+
+def test_delete_and_cleanup_keep_files_in_use(file_service):
+    pinned = save(file_service, b"a", pin=True)
+    queued = save(file_service, b"b")
+    file_service.add_pin_source(lambda: [queued])
+
+    file_service.delete_file(pinned)
+    file_service.delete_file(queued)
+    assert file_service.cleanup_old_files(max_age_days=0) == (0, 2)
+    assert os.path.exists(pinned) and os.path.exists(queued)
+
+    file_service.unpin(pinned)
+    assert file_service.cleanup_old_files(max_age_days=7) == (1, 1)
+    assert not os.path.exists(pinned)
@@ -0,0 +1,84 @@
+import time
+import threading
+
+import pytest
+
+from services.job_queue import JobBroker, SQLiteJobBroker
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queue" / "jobs.db")
+
+
+def test_broker_interface_is_abstract():
+    with pytest.raises(TypeError):
+        JobBroker()
+
+
+def test_each_job_is_claimed_once(db_path):
+    broker = SQLiteJobBroker(db_path)
+    job_ids = {broker.enqueue(f"/videos/{i}.mp4", cost=i) for i in range(30)}
+    claimed = []
+    lock = threading.Lock()
+
+    def claim_all(worker_id):
+        # Every worker opens the queue on its own, like separate processes
+        worker_broker = SQLiteJobBroker(db_path)
+        while True:
+            job = worker_broker.claim(worker_id, 60)
+            if job is None:
+                return
+            with lock:
+                claimed.append(job.job_id)
+
+    threads = [threading.Thread(target=claim_all, args=(f"worker-{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(job_ids)
+    assert broker.get_stats()['running'] == 30
+
+
+def test_expired_lease_is_retried_then_failed(db_path):
+    broker = SQLiteJobBroker(db_path, max_attempts=2, retry_delay=0)
+    job_id = broker.enqueue("/videos/a.mp4")
+
+    first = broker.claim("worker-1", 0.01)
+    time.sleep(0.05)
+    second = broker.claim("worker-2", 0.01)
+    assert second.job_id == first.job_id == job_id
+    assert second.attempts == 2
+    assert not broker.heartbeat(job_id, "worker-1", 60)
+
+    time.sleep(0.05)
+    assert broker.claim("worker-3", 60) is None
+    job = broker.get(job_id)
+    assert job.state == 'failed'
+    assert job.error == "Worker lease expired"
+
+
+def test_result_of_lost_lease_is_discarded(db_path):
+    broker = SQLiteJobBroker(db_path, retry_delay=0)
+    job_id = broker.enqueue("/videos/a.mp4")
+    broker.claim("worker-1", 0.01)
+    time.sleep(0.05)
+    broker.claim("worker-2", 60)
+
+    assert not broker.complete(job_id, "worker-1", {'cheating_detected': True})
+    assert broker.complete(job_id, "worker-2", {'cheating_detected': False})
+    job = broker.get(job_id)
+    assert job.worker_id == "worker-2"
+    assert job.result == {'cheating_detected': False}
+
+
+def test_failed_job_waits_before_retry(db_path):
+    broker = SQLiteJobBroker(db_path, retry_delay=60)
+    job_id = broker.enqueue("/videos/a.mp4")
+    broker.claim("worker-1", 60)
+
+    assert broker.fail(job_id, "worker-1", "Decoder crashed")
+    assert broker.claim("worker-2", 60) is None
+    assert broker.get(job_id).state == 'queued'
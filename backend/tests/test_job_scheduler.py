@@ -0,0 +1,52 @@
+import threading
+
+from services.job_scheduler import JobScheduler
+
+
+def blocked_scheduler(**kwargs):
+    # One worker held by a job that waits on the returned event
+    scheduler = JobScheduler(cpu_budget=1, seconds_per_cost=1.0, **kwargs)
+    release = threading.Event()
+    started = threading.Event()
+    scheduler.submit(lambda: (started.set(), release.wait()), cost=1, name="blocker")
+    started.wait(5)
+    return scheduler, release
+
+
+def test_higher_priority_runs_first():
+    scheduler, release = blocked_scheduler(priority_seconds=100.0, aging_rate=0.0)
+    order = []
+    low = scheduler.submit(order.append, "low", cost=10, priority=0)
+    high = scheduler.submit(order.append, "high", cost=10, priority=1)
+    release.set()
+    low.result(5)
+    high.result(5)
+    assert order == ["high", "low"]
+    scheduler.shutdown()
+
+
+def test_waiting_low_priority_job_overtakes_new_high_priority_job():
+    scheduler, release = blocked_scheduler(priority_seconds=100.0, aging_rate=1.0)
+    order = []
+    low = scheduler.submit(order.append, "low", cost=10, priority=0)
+    high = scheduler.submit(order.append, "high", cost=10, priority=1)
+    with scheduler._condition:
+        # The low-priority job has waited longer than a priority level is worth
+        scheduler._pending[0].submitted -= 200
+    release.set()
+    low.result(5)
+    high.result(5)
+    assert order == ["low", "high"]
+    scheduler.shutdown()
+
+
+def test_files_without_frame_count_are_estimated_from_size():
+    scheduler = JobScheduler(cpu_budget=1, keyframe_interval=30, cost_per_byte=1e-5)
+    # 900 frames of 640x480 in 1 MB calibrate the cost per byte
+    known = scheduler.estimate_cost({'frame_count': 900, 'width': 640, 'height': 480}, 1_000_000)
+    webm = scheduler.estimate_cost({'frame_count': 0, 'width': 640, 'height': 480}, 1_000_000)
+
+    assert known == 30
+    assert webm == scheduler.estimate_cost_from_size(1_000_000)
+    assert 10 < webm < 30
+    scheduler.shutdown()
@@ -0,0 +1,57 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from services.keyframe_cache import KeyframeCache, MANIFEST_FILE
+
+
+def write_video(path, frames: int = 20, size=(64, 48)) -> str:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return str(path)
+
+
+@pytest.fixture
+def videos(tmp_path):
+    return [write_video(tmp_path / f"{name}.avi") for name in ("first", "second")]
+
+
+def read_manifest(cache_root) -> dict:
+    with open(cache_root / MANIFEST_FILE) as f:
+        return json.load(f)
+
+
+def test_processes_sharing_the_cache_keep_each_others_entries(tmp_path, videos):
+    cache_root = tmp_path / "keyframes"
+    api, worker = KeyframeCache(str(cache_root)), KeyframeCache(str(cache_root))
+
+    assert len(api.get_or_build(videos[0], 5)) == 4
+    assert len(worker.get_or_build(videos[1], 5)) == 4
+
+    assert len(read_manifest(cache_root)) == 2
+    assert api.get(videos[1], 5) is not None
+
+
+def test_reads_do_not_rewrite_the_manifest(tmp_path, videos):
+    cache_root = tmp_path / "keyframes"
+    cache = KeyframeCache(str(cache_root))
+    cache.get_or_build(videos[0], 5)
+    saved = read_manifest(cache_root)
+
+    cache.get(videos[0], 5)
+
+    assert read_manifest(cache_root) == saved
+
+
+def test_videos_over_the_budget_are_not_cached(tmp_path, videos):
+    cache_root = tmp_path / "keyframes"
+    # Room for three of the four 64x48 keyframes
+    cache = KeyframeCache(str(cache_root), max_bytes=3 * 64 * 48 * 3)
+
+    assert cache.get_or_build(videos[0], 5) is None
+    assert cache.get(videos[0], 5) is None
+    assert cache.get_stats()['entries'] == 0
@@ -0,0 +1,42 @@
+import time
+
+import numpy as np
+import pytest
+
+from services.live_session_service import LiveSessionScheduler
+
+
+class StubDetector:
+    def analyze_frame(self, frame, frame_number):
+        return {'frame_number': frame_number, 'face_detections': 1,
+                'lookaway_count': 0, 'multiple_faces': 0}
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = LiveSessionScheduler(StubDetector(), workers=1)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def test_open_returns_session_stats(scheduler):
+    stats = scheduler.open(target_fps=1.0)
+
+    assert stats['target_fps'] == 1.0
+    assert stats['received_frames'] == 0
+    assert scheduler.session_stats(stats['session_id']) == stats
+
+
+def test_session_stats_count_frames(scheduler):
+    session_id = scheduler.open()['session_id']
+    scheduler.submit_frame(session_id, np.zeros((8, 8, 3), dtype=np.uint8))
+
+    assert scheduler.session_stats(session_id)['received_frames'] == 1
+    deadline = time.time() + 5
+    while scheduler.session_stats(session_id)['processed_frames'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert scheduler.session_stats(session_id)['processed_frames'] == 1
+
+
+def test_session_stats_of_unknown_session(scheduler):
+    assert scheduler.session_stats("missing") is None
@@ -0,0 +1,47 @@
+import io
+import logging
+import queue
+
+from services.logging_service import BatchStreamHandler, NonBlockingQueueHandler, RateLimitFilter
+
+
+def record(name: str, lineno: int = 10, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name, level, "detector.py", lineno, "Frame analyzed", None, None)
+
+
+def test_call_site_is_throttled_after_burst():
+    rate_limiter = RateLimitFilter(rate=0.001, burst=2)
+    passed = [rate_limiter.filter(record("frames")) for _ in range(5)]
+
+    assert passed == [True, True, False, False, False]
+    assert rate_limiter.filter(record("frames", level=logging.WARNING))
+
+
+def test_only_listed_loggers_are_throttled():
+    rate_limiter = RateLimitFilter(rate=0.001, burst=1, loggers=("frames",))
+
+    assert all(rate_limiter.filter(record("services.job_scheduler")) for _ in range(5))
+    assert rate_limiter.filter(record("frames.live"))
+    assert not rate_limiter.filter(record("frames.live"))
+
+
+def test_full_queue_drops_only_records_below_warning():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue, block_timeout=0.01)
+    handler.handle(record("frames"))
+    handler.handle(record("frames"))
+    handler.handle(record("frames", level=logging.ERROR))
+    assert handler.dropped == 2
+
+    # Blocked errors get through once the writer makes room
+    log_queue.get_nowait()
+    handler.handle(record("frames", level=logging.ERROR))
+    assert log_queue.get_nowait().getMessage() == "Frame analyzed [2 log records dropped]"
+
+
+def test_flush_tolerates_closed_stream():
+    stream = io.StringIO()
+    handler = BatchStreamHandler(stream)
+    stream.close()
+
+    handler.flush_batch()
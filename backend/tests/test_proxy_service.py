@@ -0,0 +1,27 @@
+import io
+import os
+import subprocess
+
+from services.file_service import FileService
+from services.proxy_service import ProxyService
+
+
+def test_transcode_timeout_counts_as_failure(tmp_path, monkeypatch):
+    file_service = FileService(str(tmp_path / "uploads"))
+    video_path = file_service.save_uploaded_file(io.BytesIO(b"a" * 100), "exam.mp4")
+    proxy_service = ProxyService(file_service, gop=30, timeout=5)
+    commands = []
+
+    def run(command, **kwargs):
+        commands.append(command)
+        with open(command[-1], 'wb') as f:
+            f.write(b"partial")
+        raise subprocess.TimeoutExpired(command, kwargs['timeout'])
+
+    monkeypatch.setattr(subprocess, "run", run)
+
+    assert proxy_service._transcode(video_path) is None
+    assert proxy_service.get_stats()['failed'] == 1
+    assert not os.path.exists(commands[0][-1])
+    # Keyframes on 0-based frames 29, 59, ...: the 30th, 60th, ... frames sampled
+    assert "expr:eq(mod(n+1,30),0)" in commands[0]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from core.detection import CheatingDetector
+from services.feature_store import FeatureStore
+from services.rescoring_service import RescoringService
+
+
+def frame_result(frame_number: int, descriptor) -> dict:
+    return {'frame_number': frame_number, 'face_detections': 1, 'opencv_faces': 1,
+            'face_descriptors': [list(descriptor)]}
+
+
+@pytest.fixture
+def rescoring(tmp_path):
+    feature_store = FeatureStore(str(tmp_path / "features"))
+    recorder = feature_store.create_recorder()
+    student, impostor = np.zeros(128), np.full(128, 0.09)  # 1.02 apart
+    for number in range(1, 9):
+        recorder.add(frame_result(number * 30, student if number <= 5 else impostor))
+    feature_store.save("exam", recorder, total_frames=240)
+    detector = CheatingDetector(None, None, None)
+    return RescoringService(detector, feature_store, identity_reference_frames=5,
+                            identity_min_change_frames=3)
+
+
+def test_rescoring_keeps_identity_changes(rescoring):
+    result = rescoring.rescore()['results']['exam']
+
+    assert result['cheating_detected']
+    assert "Face identity changed (frame 180)" in result['reasons']
+
+
+def test_identity_threshold_override_applies(rescoring):
+    result = rescoring.rescore({'identity_distance_threshold': 1.5})['results']['exam']
+
+    assert not any("identity" in reason for reason in result['reasons'])
@@ -0,0 +1,137 @@
+import io
+import os
+import time
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from core.exceptions import UploadStalledError
+from core.video_processor import VideoProcessor
+from services.file_service import FileService
+from services.upload_session_service import UploadSessionService, UploadOffsetError
+
+
+@pytest.fixture
+def file_service(tmp_path):
+    return FileService(str(tmp_path / "uploads"))
+
+
+@pytest.fixture
+def uploads(file_service):
+    service = UploadSessionService(file_service)
+    yield service
+    service.close()
+
+
+def test_append_rejects_offset_mismatch(uploads):
+    session = uploads.create("exam.mp4", 6)
+    assert uploads.append(session.session_id, 0, io.BytesIO(b"abc")) == 3
+
+    with pytest.raises(UploadOffsetError) as error:
+        uploads.append(session.session_id, 0, io.BytesIO(b"abc"))
+    assert error.value.expected == 3
+    assert session.offset == 3
+
+
+def test_session_resumes_after_restart(file_service, uploads):
+    session = uploads.create("exam.mp4", 6)
+    uploads.append(session.session_id, 0, io.BytesIO(b"abc"))
+
+    restarted = UploadSessionService(file_service)
+    restored = restarted.get(session.session_id)
+    assert restored is not None
+    assert restored.offset == 3
+    assert restarted.append(session.session_id, 3, io.BytesIO(b"def")) == 6
+    restarted.complete(session.session_id)
+    with open(restarted.finalize(session.session_id), 'rb') as f:
+        assert f.read() == b"abcdef"
+
+
+def test_abort_removes_partial_file(uploads):
+    session = uploads.create("exam.mp4")
+    uploads.append(session.session_id, 0, io.BytesIO(b"abc"))
+
+    uploads.abort(session.session_id)
+    assert session.is_aborted()
+    assert not os.path.exists(session.path)
+    assert uploads.get(session.session_id) is None
+    with pytest.raises(KeyError):
+        uploads.append(session.session_id, 3, io.BytesIO(b"def"))
+
+
+def test_idle_sessions_expire_in_background(file_service):
+    uploads = UploadSessionService(file_service, max_idle_seconds=0.1, expiry_interval=0.05)
+    try:
+        session = uploads.create("exam.mp4")
+        deadline = time.time() + 5
+        while not session.is_aborted() and time.time() < deadline:
+            time.sleep(0.05)
+        assert session.is_aborted()
+        assert not os.path.exists(session.path)
+        assert uploads.get(session.session_id) is None
+    finally:
+        uploads.close()
+
+
+def test_analysis_of_stalled_upload_gives_up(uploads):
+    session = uploads.create("exam.mp4")
+    session.last_activity -= 10
+    processor = VideoProcessor(None, {'growing_stall_seconds': 1.0, 'growing_poll_interval': 0.01})
+
+    with pytest.raises(UploadStalledError):
+        list(processor._iter_growing_keyframes(session.path, session, {}))
+
+
+def test_analysis_of_arriving_upload_decodes_each_frame_about_once(tmp_path, uploads, monkeypatch):
+    source = str(tmp_path / "exam.mkv")
+    writer = cv2.VideoWriter(source, cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+    for i in range(300):
+        writer.write(np.full((120, 160, 3), i % 250, dtype=np.uint8))
+    writer.release()
+    with open(source, 'rb') as f:
+        data = f.read()
+
+    # Grabs of the whole analysis; decoding every frame once is 300
+    grabs = []
+    capture = cv2.VideoCapture
+
+    class CountingCapture:
+        def __init__(self, path):
+            self._cap = capture(path)
+
+        def grab(self):
+            grabs.append(1)
+            return self._cap.grab()
+
+        def set(self, prop, value):
+            # Frame-number seeks are inexact, as in VFR WebM
+            if prop == cv2.CAP_PROP_POS_FRAMES and value > 0:
+                return False
+            return self._cap.set(prop, value)
+
+        def __getattr__(self, name):
+            return getattr(self._cap, name)
+
+    monkeypatch.setattr(cv2, "VideoCapture", CountingCapture)
+    session = uploads.create("exam.mkv", len(data))
+    processor = VideoProcessor(None, {'keyframe_interval': 30, 'growing_min_bytes': 1,
+                                      'growing_poll_interval': 0.01})
+    chunk = len(data) // 10 + 1
+
+    def upload():
+        for offset in range(0, len(data), chunk):
+            uploads.append(session.session_id, offset, io.BytesIO(data[offset:offset + chunk]))
+            time.sleep(0.05)
+        uploads.complete(session.session_id)
+
+    uploader = threading.Thread(target=upload)
+    uploader.start()
+    progress = {}
+    keyframes = [n for n, _ in processor._iter_growing_keyframes(session.path, session, progress)]
+    uploader.join()
+
+    assert keyframes == list(range(30, 301, 30))
+    assert progress['frames'] == 300
+    assert len(grabs) < 1.5 * 300
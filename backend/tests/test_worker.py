@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from core.exceptions import VideoValidationError
+from services.job_queue import SQLiteJobBroker
+from worker import Worker
+
+
+class FakeProcessor:
+    def __init__(self, run=None):
+        self.run = run
+        self.videos = []
+
+    def process_video(self, video_path):
+        self.videos.append(video_path)
+        if self.run is not None:
+            self.run(video_path)
+        return False, {'reasons': []}
+
+
+@pytest.fixture
+def broker(tmp_path):
+    return SQLiteJobBroker(str(tmp_path / "jobs.db"), retry_delay=0)
+
+
+def test_worker_stores_results(broker):
+    job_id = broker.enqueue("/videos/a.mp4")
+    processor = FakeProcessor()
+
+    assert Worker(broker, processor, "worker-1", poll_seconds=0).run(once=True) == 1
+    job = broker.get(job_id)
+    assert job.state == 'done'
+    assert job.result == {'cheating_detected': False, 'details': {'reasons': []}}
+    assert processor.videos == ["/videos/a.mp4"]
+
+
+def test_invalid_video_is_not_retried(broker):
+    job_id = broker.enqueue("/videos/a.mp4")
+
+    def reject(video_path):
+        raise VideoValidationError(video_path, "Could not open video file")
+
+    Worker(broker, FakeProcessor(reject), "worker-1", poll_seconds=0).run(once=True)
+    job = broker.get(job_id)
+    assert job.state == 'failed'
+    assert job.attempts == 1
+
+
+def test_worker_discards_result_after_losing_lease(broker, monkeypatch):
+    job_id = broker.enqueue("/videos/a.mp4")
+    # A worker that stops heartbeating, e.g. paused or partitioned
+    monkeypatch.setattr(Worker, "_heartbeat", lambda self, job, done: done.wait())
+
+    def stall(video_path):
+        time.sleep(0.1)
+        assert broker.claim("worker-2", 60).job_id == job_id
+
+    Worker(broker, FakeProcessor(stall), "worker-1", lease_seconds=0.01, poll_seconds=0).run(once=True)
+    job = broker.get(job_id)
+    assert job.state == 'running'
+    assert job.worker_id == "worker-2"
+    assert job.result is None
@@ -2,7 +2,7 @@
 Utility functions package for cheating detection system.
 """
 
-from .frame_utils import validate_and_convert_frame, extract_face_region
+from .frame_utils import FrameBuffers, validate_and_convert_frame, extract_face_region
 from .validation import validate_video_file, validate_config
 from .video_utils import (
     extract_keyframes,
@@ -11,6 +11,7 @@ from .video_utils import (
 )
 
 __all__ = [
+    'FrameBuffers',
     'validate_and_convert_frame',
     'extract_face_region',
     'validate_video_file',
@@ -5,12 +5,53 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def validate_and_convert_frame(frame: np.ndarray) -> Optional[np.ndarray]:
+class FrameBuffers:
+    """
+    Named, reusable arrays for per-frame work in a processing loop.
+    
+    A buffer is allocated the first time it is requested and reused as
+    long as later requests ask for the same shape and dtype, so a loop over
+    same-sized frames allocates only on its first iteration. Not thread
+    safe: each processing loop owns its own instance.
+    """
+    
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+        self.allocations = 0
+        
+    def get(self, name: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Return the buffer called name, reallocating it if shape or dtype changed.
+        
+        Args:
+            name: Buffer name, e.g. 'frame' or 'gray'
+            shape: Required array shape
+            dtype: Required array dtype
+            
+        Returns:
+            Uninitialized array of the requested shape and dtype
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = self._buffers[name] = np.empty(shape, dtype=dtype)
+            self.allocations += 1
+        return buffer
+        
+    def adopt(self, name: str, array: np.ndarray) -> np.ndarray:
+        """Keep an array returned by an OpenCV call as the buffer called name."""
+        if self._buffers.get(name) is not array:
+            self._buffers[name] = array
+            self.allocations += 1
+        return array
+
+def validate_and_convert_frame(frame: np.ndarray, dst: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
     """
     Ensure frame is in correct format for analysis.
     
     Args:
         frame: Input frame to validate
+        dst: Optional (height, width, 3) uint8 array receiving the converted
+            frame; a new array is allocated if its shape does not match
         
     Returns:
         Validated frame in RGB format or None if invalid
@@ -23,15 +64,18 @@ def validate_and_convert_frame(frame: np.ndarray) -> Optional[np.ndarray]:
         if frame.dtype != np.uint8:
             frame = frame.astype(np.uint8)
             
+        if dst is not None and (dst.shape != frame.shape[:2] + (3,) or dst.dtype != np.uint8):
+            dst = None
+            
         if len(frame.shape) == 2:
-            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB, dst=dst)
         elif len(frame.shape) == 3:
             if frame.shape[2] == 1:
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB, dst=dst)
             elif frame.shape[2] == 3:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst)
             elif frame.shape[2] == 4:
-                frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB)
+                frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2RGB, dst=dst)
                 
         return frame
     except Exception as e:
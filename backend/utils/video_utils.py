@@ -91,7 +91,8 @@ def calculate_video_metrics(video_path: str) -> Dict:
         return {'error': str(e)}
 
 def generate_video_thumbnail(video_path: str, output_path: Optional[str] = None, 
-                           frame_time: float = 1.0) -> Optional[np.ndarray]:
+                           frame_time: float = 1.0, keyframe_cache=None,
+                           interval: int = 30) -> Optional[np.ndarray]:
     """
     Generate thumbnail from video at specified time.
     
@@ -99,24 +100,34 @@ def generate_video_thumbnail(video_path: str, output_path: Optional[str] = None,
         video_path: Path to video file
         output_path: Optional path to save thumbnail
         frame_time: Time in seconds to capture thumbnail
+        keyframe_cache: Optional KeyframeCache; the nearest cached keyframe
+            is used instead of decoding when an entry exists
+        interval: Keyframe interval of the cache entry to look up
         
     Returns:
         Thumbnail image as numpy array or None if failed
     """
     try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return None
+        frame = None
+        if keyframe_cache is not None:
+            keyframes = keyframe_cache.get(video_path, interval)
+            if keyframes is not None:
+                frame = keyframes.nearest(frame_time)
+                
+        if frame is None:
+            cap = cv2.VideoCapture(video_path)
+            if not cap.isOpened():
+                return None
+                
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frame_pos = int(fps * frame_time)
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
             
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_pos = int(fps * frame_time)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
-        
-        ret, frame = cap.read()
-        cap.release()
-        
-        if not ret:
-            return None
+            ret, frame = cap.read()
+            cap.release()
+            
+            if not ret:
+                return None
             
         thumbnail = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         
@@ -0,0 +1,162 @@
+"""
+Standalone analysis worker.
+
+Usage: python worker.py [--worker-id ID] [--once]
+
+Pulls analysis jobs from the job queue the API process fills when
+JOB_QUEUE_ENABLED is set, runs them with the same VideoProcessor setup as
+the API and stores the results in the queue. Start any number of workers
+on any machine that sees the shared queue, uploads, features and
+checkpoints; the API process needs no change or restart.
+
+While a job runs, a heartbeat thread renews its lease. If the worker
+dies, the lease runs out and another worker picks the job up, resuming
+from the last analysis checkpoint. SIGTERM and SIGINT finish the current
+job before exiting.
+"""
+import os
+import signal
+import socket
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from core.audio_analyzer import AudioAnalyzer, collect_audio_results, merge_audio_results
+from core.exceptions import VideoValidationError
+from main import create_analysis_pipeline, create_broker, create_logging_service
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    def __init__(self, broker, video_processor, worker_id: str, lease_seconds: float = 60.0,
+                 poll_seconds: float = 2.0, audio_analyzer=None, audio_affects_verdict: bool = False):
+        """
+        Initialize queue worker.
+
+        Args:
+            broker: JobBroker shared with the API process
+            video_processor: Configured VideoProcessor
+            worker_id: Unique name of this worker
+            lease_seconds: Lease of a claimed job, renewed every third of it
+            poll_seconds: Wait between claims while the queue is empty
+            audio_analyzer: Optional AudioAnalyzer run alongside each video
+            audio_affects_verdict: Let audio findings flag a video
+        """
+        self.broker = broker
+        self.video_processor = video_processor
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.audio_analyzer = audio_analyzer
+        self.audio_affects_verdict = audio_affects_verdict
+        self._audio_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+        self._stop = threading.Event()
+
+    def stop(self, *_) -> None:
+        """Finish the current job, then exit."""
+        if not self._stop.is_set():
+            logger.info(f"Worker {self.worker_id} stopping after the current job")
+        self._stop.set()
+
+    def run(self, once: bool = False) -> int:
+        """
+        Process jobs until stopped.
+
+        Args:
+            once: Exit when the queue is empty
+
+        Returns:
+            Number of jobs processed
+        """
+        processed = 0
+        logger.info(f"Worker {self.worker_id} started")
+        while not self._stop.is_set():
+            job = self.broker.claim(self.worker_id, self.lease_seconds)
+            if job is None:
+                if once:
+                    break
+                self._stop.wait(self.poll_seconds)
+                continue
+            self.process(job)
+            processed += 1
+        self._audio_executor.shutdown()
+        logger.info(f"Worker {self.worker_id} stopped after {processed} jobs")
+        return processed
+
+    def process(self, job) -> None:
+        """Run one claimed job and report its outcome to the broker."""
+        logger.info(f"Worker {self.worker_id} running job {job.job_id} "
+                    f"(attempt {job.attempts}) for {job.video_path}")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, done), daemon=True)
+        heartbeat.start()
+        try:
+            audio_future = None
+            if self.audio_analyzer is not None:
+                audio_future = self._audio_executor.submit(self.audio_analyzer.analyze, job.video_path)
+            cheating_detected, details = self.video_processor.process_video(job.video_path)
+            cheating_detected, details = merge_audio_results(
+                cheating_detected, details, collect_audio_results(audio_future),
+                self.audio_affects_verdict)
+        except VideoValidationError as e:
+            # A broken file fails the same way on every worker
+            self.broker.fail(job.job_id, self.worker_id, str(e), retry=False)
+            return
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {str(e)}")
+            self.broker.fail(job.job_id, self.worker_id, str(e))
+            return
+        finally:
+            done.set()
+            heartbeat.join()
+
+        stored = self.broker.complete(job.job_id, self.worker_id, {
+            'cheating_detected': cheating_detected,
+            'details': details
+        })
+        if not stored:
+            logger.warning(f"Lease of job {job.job_id} was lost; result of {self.worker_id} discarded")
+
+    def _heartbeat(self, job, done: threading.Event) -> None:
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                if not self.broker.heartbeat(job.job_id, self.worker_id, self.lease_seconds):
+                    logger.warning(f"Worker {self.worker_id} no longer holds job {job.job_id}")
+                    return
+            except Exception as e:
+                # Shared storage hiccup; the lease survives until it runs out
+                logger.warning(f"Heartbeat of job {job.job_id} failed: {str(e)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+    args = parser.parse_args()
+
+    config = Config()
+    create_logging_service(config, 'worker')
+    pipeline = create_analysis_pipeline(config)
+    audio_analyzer = None
+    if config.AUDIO_ANALYSIS_ENABLED:
+        audio_analyzer = AudioAnalyzer(
+            ffmpeg_path=config.FFMPEG_PATH,
+            speech_ratio_threshold=config.AUDIO_SPEECH_RATIO_THRESHOLD
+        )
+    broker = create_broker(config)
+    pipeline['file_service'].add_pin_source(broker.active_video_paths)
+    worker = Worker(broker, pipeline['video_processor'], args.worker_id,
+                    lease_seconds=config.JOB_LEASE_SECONDS,
+                    poll_seconds=config.WORKER_POLL_SECONDS,
+                    audio_analyzer=audio_analyzer,
+                    audio_affects_verdict=config.AUDIO_AFFECTS_VERDICT)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()